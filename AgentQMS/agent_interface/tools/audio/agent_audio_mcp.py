@@ -7,30 +7,40 @@ It wraps the play_audio.py utility for MCP protocol compatibility.
 """
 
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Any
 
+from AgentQMS.agent_tools.utils.mcp_server import serve_stdio
 from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
 
 PROJECT_ROOT = ensure_project_root_on_sys_path()
-PLAY_AUDIO_PATH = PROJECT_ROOT / "AgentQMS" / "agent_scripts" / "utilities" / "play_audio.py"
+UTILITIES_DIR = PROJECT_ROOT / "AgentQMS" / "agent_scripts" / "utilities"
+PLAY_AUDIO_PATH = UTILITIES_DIR / "play_audio.py"
+TTS_PATH = UTILITIES_DIR / "elevenlabs_tts.py"
 
-if PLAY_AUDIO_PATH.exists():
+
+def _load_script(name: str, path: Path) -> Any:
+    if not path.exists():
+        raise ImportError(f"Could not find {name} at {path}")
     import importlib.util
 
-    spec = importlib.util.spec_from_file_location("play_audio", PLAY_AUDIO_PATH)
-    if spec and spec.loader:
-        play_audio_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(play_audio_module)
-        play_audio = play_audio_module.play_audio
-    else:
-        raise ImportError(f"Failed to load play_audio from {PLAY_AUDIO_PATH}")
-else:
-    raise ImportError(f"Could not find play_audio at {PLAY_AUDIO_PATH}")
-
-# Import message templates (this should work as agent.tools.audio is a package)
-from agent.tools.audio.message_templates import (
+    spec = importlib.util.spec_from_file_location(name, path)
+    if not (spec and spec.loader):
+        raise ImportError(f"Failed to load {name} from {path}")
+    module = importlib.util.module_from_spec(spec)
+    # Registered before exec so dataclasses can resolve the module
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+play_audio_module = _load_script("play_audio", PLAY_AUDIO_PATH)
+get_playback_queue = play_audio_module.get_playback_queue
+elevenlabs_tts = _load_script("elevenlabs_tts", TTS_PATH)
+
+from AgentQMS.agent_interface.tools.audio.message_templates import (
     get_message,
     get_random_message,
     list_categories,
@@ -51,7 +61,7 @@ class AudioMCPServer:
         self.tools = {
             "play_audio": {
                 "name": "play_audio",
-                "description": "Play an audio file using the PulseAudio bridge to Windows speakers. Supports MP3, WAV, and other common audio formats. Automatically detects WSL environment and configures PulseAudio connection.",
+                "description": "Queue an audio file for playback through the PulseAudio bridge to Windows speakers and return a job id immediately (see playback_status). Supports MP3, WAV, and other common audio formats. Duplicate requests for a file already queued or playing are merged. Automatically detects WSL environment and configures PulseAudio connection.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -64,13 +74,41 @@ class AudioMCPServer:
                             "description": "If true, prefer ffplay over paplay (default: false, prefers paplay for better PulseAudio integration)",
                             "default": False,
                         },
+                        "priority": {
+                            "type": "integer",
+                            "description": "Queue priority; lower plays sooner (default: 5)",
+                            "default": 5,
+                        },
+                        "wait": {
+                            "type": "boolean",
+                            "description": "Block until playback finishes (default: false)",
+                            "default": False,
+                        },
                     },
                     "required": ["audio_file"],
                 },
             },
+            "playback_status": {
+                "name": "playback_status",
+                "description": "Status of a play_audio job (queued, playing, done, failed, cancelled), or the whole playback queue when job_id is omitted.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "job_id": {
+                            "type": "string",
+                            "description": "Job id returned by play_audio",
+                        },
+                        "cancel": {
+                            "type": "boolean",
+                            "description": "Cancel the job if it has not started playing",
+                            "default": False,
+                        },
+                    },
+                },
+            },
             "get_audio_message": {
                 "name": "get_audio_message",
-                "description": "Get a pre-generated audio message from a category or suggest one based on event type. Returns message text that can be used with ElevenLabs TTS.",
+                "description": "Get a pre-generated audio message from a category or suggest one based on event type. Returns the message text and, when the audio is cached (see elevenlabs_tts.py --warm) or can be synthesized, a ready-to-play audio_file path.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -86,6 +124,11 @@ class AudioMCPServer:
                             "type": "integer",
                             "description": "Optional index to select specific message from category (default: random)",
                         },
+                        "synthesize": {
+                            "type": "boolean",
+                            "description": "Synthesize uncached audio when ELEVENLABS_API_KEY is set; each synthesis is a billed API request (default: false, cached audio only)",
+                            "default": False,
+                        },
                     },
                 },
             },
@@ -124,6 +167,23 @@ class AudioMCPServer:
             },
         }
 
+    def _audio_for(self, message: str, synthesize: bool) -> str | None:
+        """Cached audio for *message*; synthesized into the cache if allowed."""
+        cached = elevenlabs_tts.cached_audio_path(message)
+        if cached is not None:
+            return str(cached)
+        api_key = os.environ.get("ELEVENLABS_API_KEY")
+        if not (synthesize and api_key):
+            return None
+        try:
+            path = elevenlabs_tts.synthesize_speech(
+                message, api_key, cache=elevenlabs_tts.AudioCache()
+            )
+        except (elevenlabs_tts.ElevenLabsError, OSError):
+            # The text alone is still a valid answer
+            return None
+        return str(path)
+
     def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
         """Handle MCP protocol request (JSON-RPC format)."""
         request_id = request.get("id")
@@ -167,21 +227,7 @@ class AudioMCPServer:
                     if not audio_path.is_absolute():
                         audio_path = self.project_root / audio_path
 
-                    # Play the audio
-                    success = play_audio(audio_path, prefer_pulse=not prefer_ffplay)
-
-                    if success:
-                        return make_response(
-                            {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"Successfully played audio file: {audio_path}",
-                                    }
-                                ]
-                            }
-                        )
-                    else:
+                    if not audio_path.exists():
                         return make_response(
                             error={
                                 "code": -32603,
@@ -189,6 +235,46 @@ class AudioMCPServer:
                             }
                         )
 
+                    # Queue the audio; the playback thread plays it
+                    queue = get_playback_queue()
+                    job_id = queue.enqueue(
+                        audio_path,
+                        priority=int(arguments.get("priority", 5)),
+                        prefer_pulse=not prefer_ffplay,
+                    )
+                    if arguments.get("wait", False):
+                        status = queue.wait(job_id)
+                        if status["status"] != "done":
+                            return make_response(
+                                error={
+                                    "code": -32603,
+                                    "message": f"Failed to play audio file: {audio_path}. {status.get('error') or ''}".strip(),
+                                }
+                            )
+                    else:
+                        status = queue.status(job_id)
+                    return make_response(
+                        {
+                            "content": [
+                                {"type": "text", "text": json.dumps(status, indent=2)}
+                            ]
+                        }
+                    )
+
+                elif tool_name == "playback_status":
+                    queue = get_playback_queue()
+                    job_id = arguments.get("job_id")
+                    if job_id and arguments.get("cancel", False):
+                        queue.cancel(job_id)
+                    status = queue.status(job_id)
+                    return make_response(
+                        {
+                            "content": [
+                                {"type": "text", "text": json.dumps(status, indent=2)}
+                            ]
+                        }
+                    )
+
                 elif tool_name == "get_audio_message":
                     event_type = arguments.get("event_type")
                     category = arguments.get("category")
@@ -201,16 +287,16 @@ class AudioMCPServer:
                     else:
                         message = get_random_message()
 
-                    return make_response(
-                        {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": message,
-                                }
-                            ]
-                        }
-                    )
+                    content = [{"type": "text", "text": message}]
+                    audio_file = self._audio_for(message, arguments.get("synthesize", False))
+                    if audio_file:
+                        content.append(
+                            {
+                                "type": "text",
+                                "text": json.dumps({"message": message, "audio_file": audio_file}),
+                            }
+                        )
+                    return make_response({"content": content})
 
                 elif tool_name == "list_audio_categories":
                     categories = list_categories()
@@ -277,32 +363,9 @@ def main():
     server = AudioMCPServer()
 
     # Read from stdin (MCP protocol uses JSON-RPC over stdio)
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
-
-        try:
-            request = json.loads(line)
-            response = server.handle_request(request)
-            print(json.dumps(response))
-            sys.stdout.flush()
-        except json.JSONDecodeError as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {"code": -32700, "message": f"Parse error: {e!s}"},
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {"code": -32603, "message": f"Internal error: {e!s}"},
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+    # play_audio only queues (the playback thread keeps sounds from
+    # overlapping); tool threads are for on-demand synthesis and wait=true
+    serve_stdio(server.handle_request, max_workers=2)
 
 
 if __name__ == "__main__":
@@ -7,15 +7,16 @@ It wraps the existing puppeteer_wrapper.py utility for MCP protocol compatibilit
 """
 
 import json
-import sys
 from typing import Any
 
+from AgentQMS.agent_tools.utils.mcp_server import serve_stdio
 from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
 
 ensure_project_root_on_sys_path()
 
 from AgentQMS.agent_tools.utilities.puppeteer_wrapper import (
     capture_page,
+    get_browser_pool,
     run_puppeteer_script,
     verify_page,
 )
@@ -83,6 +84,11 @@ class PuppeteerMCPServer:
                     "required": ["script_path"],
                 },
             },
+            "puppeteer_pool_status": {
+                "name": "puppeteer_pool_status",
+                "description": "Show the shared browser pool's page slots and reuse counters",
+                "inputSchema": {"type": "object", "properties": {}},
+            },
         }
 
     def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
@@ -143,6 +149,16 @@ class PuppeteerMCPServer:
                         }
                     )
 
+                elif tool_name == "puppeteer_pool_status":
+                    result = get_browser_pool().status()
+                    return make_response(
+                        {
+                            "content": [
+                                {"type": "text", "text": json.dumps(result, indent=2)}
+                            ]
+                        }
+                    )
+
                 elif tool_name == "puppeteer_run_script":
                     script_path = arguments.get("script_path")
                     args = arguments.get("args", [])
@@ -177,34 +193,9 @@ def main():
     server = PuppeteerMCPServer()
 
     # Read from stdin (MCP protocol uses JSON-RPC over stdio)
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
-
-        try:
-            request = json.loads(line)
-            response = server.handle_request(request)
-            print(json.dumps(response))
-            sys.stdout.flush()
-        except json.JSONDecodeError as e:
-            # Invalid JSON - send error response
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {"code": -32700, "message": f"Parse error: {e!s}"},
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
-        except Exception as e:
-            # Unexpected error
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {"code": -32603, "message": f"Internal error: {e!s}"},
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+    # One tool thread per browser page slot, so concurrent captures share
+    # the pooled browser without blocking tools/list
+    serve_stdio(server.handle_request, max_workers=get_browser_pool().max_pages)
 
 
 if __name__ == "__main__":
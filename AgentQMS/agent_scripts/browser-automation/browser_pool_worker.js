@@ -0,0 +1,220 @@
+// Long-lived Puppeteer worker: one browser, up to N concurrent pages.
+//
+// Speaks line-delimited JSON over stdio so callers pay Node start-up and
+// browser launch once instead of per page:
+//
+//   -> {"id": 1, "op": "capture", "url": "http://...", "timeout": 30, "settle_ms": 3000}
+//   <- {"id": 1, "ok": true, "result": {...}}
+//
+// Ops: capture, verify (capture + error pattern scan), ping, shutdown.
+// Usage: node browser_pool_worker.js [--max-pages N]
+const readline = require('readline');
+const puppeteer = require('puppeteer');
+
+const maxPagesArg = process.argv.indexOf('--max-pages');
+const MAX_PAGES = maxPagesArg > -1 ? Math.max(1, parseInt(process.argv[maxPagesArg + 1], 10) || 1) : 4;
+
+// Same patterns verify_fixes.js checks for
+const CRITICAL_ERRORS = [
+  'AttributeError',
+  'KeyError',
+  'TypeError',
+  'Traceback',
+  'ValidationError',
+  'has no attribute',
+  'object has no attribute',
+  'single is not in iterable'
+];
+const FIXED_ERRORS = [
+  'get_about_content',
+  'get_default_experiment_name',
+  'component.props',
+  'Invalid prompt type'
+];
+const UNEXPECTED_ERRORS = [
+  'Failed to resolve metric value',
+  'Failed to resolve content_source',
+  'Error in resolving markdown',
+  'Failed to resolve data source'
+];
+
+let browserPromise = null;
+const idleContexts = [];
+let activePages = 0;
+const waiting = [];
+const stats = { launches: 0, requests: 0, contexts_created: 0, contexts_reused: 0 };
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function getBrowser() {
+  if (!browserPromise) {
+    stats.launches += 1;
+    browserPromise = puppeteer.launch({
+      headless: 'new',
+      args: ['--no-sandbox', '--disable-setuid-sandbox']
+    }).then(browser => {
+      browser.on('disconnected', () => {
+        // Relaunch lazily on the next request
+        browserPromise = null;
+        idleContexts.length = 0;
+      });
+      return browser;
+    }, error => {
+      browserPromise = null;
+      throw error;
+    });
+  }
+  return browserPromise;
+}
+
+async function acquireSlot() {
+  if (activePages < MAX_PAGES) {
+    activePages += 1;
+    return;
+  }
+  await new Promise(resolve => waiting.push(resolve));
+}
+
+function releaseSlot() {
+  const next = waiting.shift();
+  if (next) {
+    next();
+  } else {
+    activePages -= 1;
+  }
+}
+
+async function acquireContext(browser, fresh) {
+  if (!fresh && idleContexts.length) {
+    stats.contexts_reused += 1;
+    return idleContexts.pop();
+  }
+  stats.contexts_created += 1;
+  // Puppeteer >= 22 renamed createIncognitoBrowserContext
+  return browser.createBrowserContext
+    ? browser.createBrowserContext()
+    : browser.createIncognitoBrowserContext();
+}
+
+async function releaseContext(context, fresh) {
+  if (fresh || idleContexts.length >= MAX_PAGES) {
+    await context.close().catch(() => {});
+  } else {
+    idleContexts.push(context);
+  }
+}
+
+async function withPage(request, fn) {
+  await acquireSlot();
+  let context = null;
+  let page = null;
+  try {
+    const browser = await getBrowser();
+    context = await acquireContext(browser, request.fresh_context);
+    page = await context.newPage();
+    return await fn(page);
+  } finally {
+    if (page) await page.close().catch(() => {});
+    if (context) await releaseContext(context, request.fresh_context);
+    releaseSlot();
+  }
+}
+
+async function capture(request) {
+  return withPage(request, async page => {
+    const consoleMessages = [];
+    const pageErrors = [];
+    page.on('console', msg => consoleMessages.push({ type: msg.type(), text: msg.text() }));
+    page.on('pageerror', error => pageErrors.push(error.message));
+
+    const started = Date.now();
+    const response = await page.goto(request.url, {
+      waitUntil: 'networkidle2',
+      timeout: (request.timeout || 30) * 1000
+    });
+    // Give Streamlit-style apps time to render after the network settles
+    const settle = request.settle_ms === undefined ? 3000 : request.settle_ms;
+    if (settle > 0) await new Promise(resolve => setTimeout(resolve, settle));
+
+    const content = await page.evaluate(() => document.body ? document.body.innerText : '');
+    const errorElements = await page.evaluate(() =>
+      Array.from(document.querySelectorAll('[data-testid="stException"], .stException, [class*="error"]'))
+        .map(el => el.innerText)
+        .filter(text => text.length > 0)
+    );
+    return {
+      url: request.url,
+      status: response ? response.status() : null,
+      content,
+      console: consoleMessages,
+      page_errors: pageErrors,
+      error_elements: errorElements,
+      elapsed_ms: Date.now() - started
+    };
+  });
+}
+
+async function verify(request) {
+  const result = await capture(request);
+  const critical = CRITICAL_ERRORS.filter(p => result.content.includes(p));
+  const fixed = FIXED_ERRORS.filter(p => result.content.includes(p));
+  const unexpected = UNEXPECTED_ERRORS.filter(p => result.content.includes(p));
+  result.page_name = request.page_name || '';
+  result.critical_errors = critical;
+  result.fixed_errors = fixed;
+  result.unexpected_errors = unexpected;
+  result.passed = critical.length === 0 && fixed.length === 0 && unexpected.length === 0;
+  return result;
+}
+
+async function handle(request) {
+  stats.requests += 1;
+  switch (request.op) {
+    case 'capture':
+      return capture(request);
+    case 'verify':
+      return verify(request);
+    case 'ping':
+      return { pong: true, max_pages: MAX_PAGES, active_pages: activePages, queued: waiting.length, ...stats };
+    default:
+      throw new Error(`Unknown op: ${request.op}`);
+  }
+}
+
+async function shutdown(code) {
+  try {
+    if (browserPromise) {
+      const browser = await browserPromise;
+      await browser.close();
+    }
+  } catch (error) {
+    // Browser already gone
+  }
+  process.exit(code);
+}
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+rl.on('line', line => {
+  if (!line.trim()) return;
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (error) {
+    send({ id: null, ok: false, error: `Invalid JSON: ${error.message}` });
+    return;
+  }
+  if (request.op === 'shutdown') {
+    send({ id: request.id, ok: true, result: {} });
+    shutdown(0);
+    return;
+  }
+  // Requests run concurrently; the page slots bound the parallelism
+  handle(request).then(
+    result => send({ id: request.id, ok: true, result }),
+    error => send({ id: request.id, ok: false, error: error.message })
+  );
+});
+rl.on('close', () => shutdown(0));
+process.on('SIGTERM', () => shutdown(0));
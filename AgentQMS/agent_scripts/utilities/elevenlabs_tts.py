@@ -6,15 +6,34 @@ from the terminal without running the full MCP server. It relies on
 the `ELEVENLABS_API_KEY` environment variable and produces an audio file
 on disk (MP3 by default). Optionally, it can attempt to play the audio
 using `ffplay` if available.
+
+Synthesized audio is cached under `.agentqms/audio_cache/`, keyed by a hash
+of the text, voice, model and voice settings, so a repeated phrase never
+hits the API twice. The cache is size-bounded with least-recently-used
+eviction. `--warm` pre-synthesizes every agent message template in a
+parallel, rate-limited batch so notifications play without network latency.
+Set `ELEVENLABS_API_URL` to point the client at another server (e.g. a
+local stub); `--selftest` does exactly that to exercise caching, warming and
+retries without an API key.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import hashlib
 import json
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
@@ -23,11 +42,156 @@ ELEVENLABS_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
 DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel (ElevenLabs default demo voice)
 DEFAULT_MODEL_ID = "eleven_multilingual_v2"
 DEFAULT_OUTPUT_DIR = Path.cwd() / "outputs" / "elevenlabs"
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".agentqms" / "audio_cache"
+DEFAULT_CACHE_MAX_MB = 100
 
 
 class ElevenLabsError(RuntimeError):
     """Raised when the ElevenLabs API returns an error response."""
 
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _voice_settings(
+    stability: float | None, similarity_boost: float | None, style: float | None
+) -> dict[str, float]:
+    voice_settings: dict[str, float] = {}
+    if stability is not None:
+        voice_settings["stability"] = float(stability)
+    if similarity_boost is not None:
+        voice_settings["similarity_boost"] = float(similarity_boost)
+    if style is not None:
+        voice_settings["style"] = float(style)
+    return voice_settings
+
+
+def cache_key(
+    text: str,
+    voice_id: str = DEFAULT_VOICE_ID,
+    model_id: str = DEFAULT_MODEL_ID,
+    voice_settings: dict[str, float] | None = None,
+) -> str:
+    """Hash of everything that determines the synthesized audio."""
+    payload = json.dumps(
+        {
+            "text": text,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings or {},
+            "format": "audio/mpeg",
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed audio blobs with LRU size eviction.
+
+    Blobs live at ``<root>/<key[:2]>/<key>.mp3``. A hit refreshes the blob's
+    mtime, and eviction removes the oldest mtimes first once the cache grows
+    past ``max_bytes``. Inserts keep a running byte total, so the directory
+    is only scanned when that total crosses the limit; eviction then trims
+    to ``EVICT_TARGET`` of the limit so the next scan is many inserts away.
+    """
+
+    EVICT_TARGET = 0.9
+
+    def __init__(self, root: Path | str | None = None, max_bytes: int | None = None):
+        self.root = Path(root or os.environ.get("AGENTQMS_AUDIO_CACHE") or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_mb = float(os.environ.get("AGENTQMS_AUDIO_CACHE_MB", DEFAULT_CACHE_MAX_MB))
+            max_bytes = int(max_mb * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: int | None = None
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.mp3"
+
+    def get(self, key: str) -> Path | None:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, audio_bytes: bytes) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(audio_bytes)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self.entries())
+            else:
+                self._total += len(audio_bytes) - replaced
+            over_limit = self._total > self.max_bytes
+        if over_limit:
+            self.evict(int(self.max_bytes * self.EVICT_TARGET))
+        return path
+
+    def entries(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) of every blob, oldest first."""
+        entries = []
+        for path in self.root.glob("*/*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """Drop least recently used blobs until under the size limit."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total = total
+        return removed
+
+    def stats(self) -> dict[str, object]:
+        entries = self.entries()
+        return {
+            "root": str(self.root),
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+def cached_audio_path(
+    text: str,
+    *,
+    voice_id: str = DEFAULT_VOICE_ID,
+    model_id: str = DEFAULT_MODEL_ID,
+    voice_settings: dict[str, float] | None = None,
+    cache: AudioCache | None = None,
+) -> Path | None:
+    """Path of already synthesized audio for *text*, without any network call."""
+    cache = cache or AudioCache()
+    return cache.get(cache_key(text, voice_id, model_id, voice_settings))
+
 
 def synthesize_speech(
     text: str,
@@ -38,12 +202,28 @@ def synthesize_speech(
     stability: float | None = None,
     similarity_boost: float | None = None,
     style: float | None = None,
-    output_path: Path,
+    output_path: Path | None = None,
+    cache: AudioCache | None = None,
 ) -> Path:
     """Send a synthesis request and write the resulting audio to *output_path*.
 
+    With a *cache*, audio already synthesized for the same text, voice,
+    model and settings is reused without calling the API, and new audio is
+    stored in it. Without an *output_path* the cached file itself is
+    returned.
+
     Returns the path to the file on success.
     """
+    if output_path is None and cache is None:
+        raise ValueError("output_path is required when no cache is given")
+
+    voice_settings = _voice_settings(stability, similarity_boost, style)
+    key = cache_key(text, voice_id, model_id, voice_settings) if cache else None
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return _deliver(cached, output_path)
 
     headers = {
         "accept": "audio/mpeg",
@@ -51,14 +231,6 @@ def synthesize_speech(
         "xi-api-key": api_key,
     }
 
-    voice_settings: dict[str, float] = {}
-    if stability is not None:
-        voice_settings["stability"] = float(stability)
-    if similarity_boost is not None:
-        voice_settings["similarity_boost"] = float(similarity_boost)
-    if style is not None:
-        voice_settings["style"] = float(style)
-
     payload: dict[str, object] = {
         "text": text,
         "model_id": model_id,
@@ -67,6 +239,9 @@ def synthesize_speech(
         payload["voice_settings"] = voice_settings
 
     url = ELEVENLABS_TTS_URL.format(voice_id=voice_id)
+    base_url = os.environ.get("ELEVENLABS_API_URL")
+    if base_url:
+        url = f"{base_url.rstrip('/')}/v1/text-to-speech/{voice_id}"
 
     request = Request(
         url,
@@ -86,16 +261,211 @@ def synthesize_speech(
         except json.JSONDecodeError:
             pass
         raise ElevenLabsError(
-            f"ElevenLabs API returned status {exc.code}: {message.strip()}"
+            f"ElevenLabs API returned status {exc.code}: {message.strip()}",
+            status=exc.code,
         ) from exc
     except URLError as exc:
         raise ElevenLabsError(f"Failed to reach ElevenLabs API: {exc.reason}") from exc
 
+    if cache is not None:
+        return _deliver(cache.put(key, audio_bytes), output_path)
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_bytes(audio_bytes)
     return output_path
 
 
+def _deliver(cached: Path, output_path: Path | None) -> Path:
+    """Return the cached blob, copying it to *output_path* if one was asked for."""
+    if output_path is None:
+        return cached
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(cached, output_path)
+    return output_path
+
+
+class RateLimiter:
+    """Spaces call starts at least ``1 / rate`` seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def template_messages() -> list[str]:
+    """Every distinct agent message template, in template order."""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    from AgentQMS.agent_interface.tools.audio.message_templates import ALL_MESSAGES
+
+    return list(dict.fromkeys(ALL_MESSAGES))
+
+
+def warm_cache(
+    texts: Iterable[str],
+    api_key: str,
+    *,
+    cache: AudioCache | None = None,
+    concurrency: int = 4,
+    rate: float = 2.0,
+    retries: int = 3,
+    **synth_options: object,
+) -> dict[str, object]:
+    """Synthesize every uncached text in parallel, at most *rate* requests/s.
+
+    Rate-limited (HTTP 429) and server errors are retried with backoff.
+    Returns counts of cached, synthesized and failed texts.
+    """
+    cache = cache or AudioCache()
+    settings = _voice_settings(
+        synth_options.pop("stability", None),
+        synth_options.pop("similarity_boost", None),
+        synth_options.pop("style", None),
+    )
+    voice_id = str(synth_options.get("voice_id", DEFAULT_VOICE_ID))
+    model_id = str(synth_options.get("model_id", DEFAULT_MODEL_ID))
+    texts = list(dict.fromkeys(texts))
+    missing = [
+        text for text in texts if cache.get(cache_key(text, voice_id, model_id, settings)) is None
+    ]
+    limiter = RateLimiter(rate)
+    failures: dict[str, str] = {}
+
+    def synthesize(text: str) -> None:
+        for attempt in range(retries):
+            limiter.wait()
+            try:
+                synthesize_speech(
+                    text, api_key, cache=cache, voice_id=voice_id, model_id=model_id, **settings
+                )
+                return
+            except ElevenLabsError as exc:
+                retryable = exc.status is None or exc.status == 429 or exc.status >= 500
+                if not retryable or attempt == retries - 1:
+                    failures[text] = str(exc)
+                    return
+                time.sleep(2**attempt)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        list(executor.map(synthesize, missing))
+
+    return {
+        "total": len(texts),
+        "cached": len(texts) - len(missing),
+        "synthesized": len(missing) - len(failures),
+        "failed": failures,
+    }
+
+
+class _StubTTSHandler(BaseHTTPRequestHandler):
+    """Fake text-to-speech endpoint for :func:`selftest`.
+
+    Audio is ``ID3`` plus a hash of the text. Texts starting with
+    ``rate-limited`` get one 429 before succeeding; texts starting with
+    ``invalid`` always get a 400.
+    """
+
+    requests: Counter[str]
+    lock: threading.Lock
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("content-length") or 0)
+        text = json.loads(self.rfile.read(length) or b"{}").get("text", "")
+        with self.lock:
+            self.requests[text] += 1
+            seen = self.requests[text]
+        if text.startswith("invalid"):
+            self._reply(400, json.dumps({"detail": "invalid text"}).encode(), "application/json")
+        elif text.startswith("rate-limited") and seen == 1:
+            self._reply(429, json.dumps({"detail": "too many requests"}).encode(), "application/json")
+        else:
+            self._reply(200, _stub_audio(text), "audio/mpeg")
+
+    def _reply(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def _stub_audio(text: str) -> bytes:
+    return b"ID3" + hashlib.sha256(text.encode("utf-8")).digest()
+
+
+@contextlib.contextmanager
+def stub_server() -> Iterator[Counter[str]]:
+    """Point ``ELEVENLABS_API_URL`` at a local stub; yields per-text request counts."""
+    handler = type(
+        "StubTTSHandler", (_StubTTSHandler,), {"requests": Counter(), "lock": threading.Lock()}
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    previous = os.environ.get("ELEVENLABS_API_URL")
+    os.environ["ELEVENLABS_API_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield handler.requests
+    finally:
+        if previous is None:
+            os.environ.pop("ELEVENLABS_API_URL", None)
+        else:
+            os.environ["ELEVENLABS_API_URL"] = previous
+        server.shutdown()
+        server.server_close()
+
+
+def selftest() -> dict[str, object]:
+    """Exercise the cache, warming and retry logic against a local stub server.
+
+    No API key or network access is needed. Returns the individual checks
+    and whether all of them passed.
+    """
+    with tempfile.TemporaryDirectory() as tmp, stub_server() as requests:
+        cache = AudioCache(Path(tmp) / "cache", max_bytes=10 * 1024 * 1024)
+        checks: dict[str, bool] = {}
+
+        first = synthesize_speech("hello", "stub-key", cache=cache)
+        second = synthesize_speech("hello", "stub-key", cache=cache)
+        checks["miss_synthesizes"] = first.read_bytes() == _stub_audio("hello")
+        checks["hit_skips_api"] = second == first and requests["hello"] == 1
+        checks["cached_lookup"] = cached_audio_path("hello", cache=cache) == first
+
+        copy = synthesize_speech("hello", "stub-key", cache=cache, output_path=Path(tmp) / "out.mp3")
+        checks["copy_to_output"] = copy.read_bytes() == first.read_bytes() and requests["hello"] == 1
+
+        report = warm_cache(
+            ["hello", "rate-limited greeting", "goodbye", "invalid text"],
+            "stub-key",
+            cache=cache,
+            concurrency=2,
+            rate=50.0,
+        )
+        checks["warm_counts"] = (
+            report["cached"] == 1 and report["synthesized"] == 2 and len(report["failed"]) == 1
+        )
+        checks["retry_429"] = requests["rate-limited greeting"] == 2
+        checks["no_retry_4xx"] = requests["invalid text"] == 1
+        checks["warm_fills_cache"] = cached_audio_path("goodbye", cache=cache) is not None
+
+        cache.evict(max_bytes=0)
+        checks["evict"] = cached_audio_path("hello", cache=cache) is None
+
+    return {"passed": all(checks.values()), "checks": checks, "requests": dict(requests)}
+
+
 def attempt_playback(audio_path: Path) -> None:
     """Attempt to play the synthesized audio using the integrated audio player."""
 
@@ -121,7 +491,7 @@ def attempt_playback(audio_path: Path) -> None:
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("text", help="Text to synthesize (wrap in quotes)")
+    parser.add_argument("text", nargs="?", help="Text to synthesize (wrap in quotes)")
     parser.add_argument(
         "-v",
         "--voice-id",
@@ -164,18 +534,84 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Attempt to play the resulting audio with ffplay",
     )
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Pre-synthesize every agent message template into the audio cache",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Parallel requests for --warm (default: 4)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="Maximum requests per second for --warm (default: 2)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the API and do not store the result in the audio cache",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print audio cache size and exit",
+    )
+    parser.add_argument(
+        "--selftest",
+        action="store_true",
+        help="Exercise caching, warming and retries against a local stub server",
+    )
 
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if not (args.text or args.warm or args.cache_stats or args.selftest):
+        parser.error("text is required unless --warm, --cache-stats or --selftest is given")
+    return args
 
 
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv)
+    cache = None if args.no_cache else AudioCache()
+
+    if args.cache_stats:
+        print(json.dumps((cache or AudioCache()).stats(), indent=2))
+        return 0
+
+    if args.selftest:
+        result = selftest()
+        print(json.dumps(result, indent=2))
+        return 0 if result["passed"] else 1
 
     api_key = os.environ.get("ELEVENLABS_API_KEY")
     if not api_key:
         print("ELEVENLABS_API_KEY environment variable is required.", file=sys.stderr)
         return 1
 
+    if args.warm:
+        report = warm_cache(
+            template_messages(),
+            api_key,
+            cache=cache or AudioCache(),
+            concurrency=args.concurrency,
+            rate=args.rate,
+            voice_id=args.voice_id,
+            model_id=args.model_id,
+            stability=args.stability,
+            similarity_boost=args.similarity_boost,
+            style=args.style,
+        )
+        print(
+            f"Warmed {report['total']} messages: {report['cached']} already cached, "
+            f"{report['synthesized']} synthesized, {len(report['failed'])} failed"
+        )
+        for text, error in report["failed"].items():
+            print(f"  {text!r}: {error}", file=sys.stderr)
+        return 2 if report["failed"] else 0
+
     output_path = args.output
     if output_path is None:
         DEFAULT_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -193,6 +629,7 @@ def main(argv: list[str] | None = None) -> int:
             similarity_boost=args.similarity_boost,
             style=args.style,
             output_path=output_path,
+            cache=cache,
         )
     except ElevenLabsError as exc:
         print(f"Error: {exc}", file=sys.stderr)
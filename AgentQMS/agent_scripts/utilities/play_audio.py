@@ -3,15 +3,32 @@
 
 This utility plays audio files using the PulseAudio bridge to Windows,
 automatically setting up the required environment variables.
+
+Long-running callers (the audio MCP server) use ``get_playback_queue()``
+instead of ``play_audio``. It is a daemon thread that plays queued files
+in priority order and merges duplicate requests. It drives a persistent
+``mpv`` process when one is installed. ``enqueue`` returns a job id
+immediately and ``status`` reports progress. The PulseAudio environment
+(and the WSL host IP behind it) is computed once per process.
 """
 
 from __future__ import annotations
 
 import argparse
+import heapq
+import itertools
+import json
 import os
 import shutil
+import socket
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
 
@@ -35,8 +52,25 @@ def get_windows_host_ip() -> str | None:
     return None
 
 
-def setup_pulseaudio_env() -> dict[str, str]:
-    """Set up PulseAudio environment variables for WSL bridge."""
+_pulse_env: dict[str, str] | None = None
+_pulse_env_lock = threading.Lock()
+
+
+def setup_pulseaudio_env(refresh: bool = False) -> dict[str, str]:
+    """Set up PulseAudio environment variables for WSL bridge.
+
+    The result is cached per process (reading /proc/version and
+    /etc/resolv.conf on every sound is wasted work); ``refresh=True``
+    recomputes it, e.g. after the WSL host IP changed. Returns a copy.
+    """
+    global _pulse_env
+    with _pulse_env_lock:
+        if _pulse_env is None or refresh:
+            _pulse_env = _compute_pulseaudio_env()
+        return dict(_pulse_env)
+
+
+def _compute_pulseaudio_env() -> dict[str, str]:
     env = os.environ.copy()
 
     # If PULSE_SERVER is already set (e.g., from .bashrc), use it
@@ -138,6 +172,301 @@ def play_audio(audio_path: Path, prefer_pulse: bool = True) -> bool:
     return False
 
 
+class MpvPlayer:
+    """One idle ``mpv`` process fed files over its JSON IPC socket.
+
+    Saves a player start-up per sound. ``play`` blocks until the file ends
+    and returns False if mpv is missing, fails or exits.
+    """
+
+    def __init__(self, prefer_pulse: bool = True):
+        self.prefer_pulse = prefer_pulse
+        self.socket_path = Path(tempfile.gettempdir()) / f"agentqms-mpv-{os.getpid()}.sock"
+        self._process: subprocess.Popen | None = None
+        self._socket: socket.socket | None = None
+        self._buffer = b""
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("mpv") is not None
+
+    def _ensure_running(self) -> bool:
+        if self._process is not None and self._process.poll() is None and self._socket:
+            return True
+        self.close()
+        mpv = shutil.which("mpv")
+        if not mpv:
+            return False
+        command = [
+            mpv,
+            "--idle=yes",
+            "--no-video",
+            "--no-terminal",
+            f"--input-ipc-server={self.socket_path}",
+        ]
+        if self.prefer_pulse:
+            command.append("--ao=pulse,")
+        try:
+            self._process = subprocess.Popen(
+                command,
+                env=setup_pulseaudio_env(),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        deadline = time.monotonic() + 3.0
+        while time.monotonic() < deadline:
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(str(self.socket_path))
+                self._socket = sock
+                self._buffer = b""
+                return True
+            except OSError:
+                time.sleep(0.05)
+        self.close()
+        return False
+
+    def _events(self):
+        while True:
+            while b"\n" in self._buffer:
+                line, self._buffer = self._buffer.split(b"\n", 1)
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+            chunk = self._socket.recv(65536)
+            if not chunk:
+                return
+            self._buffer += chunk
+
+    def play(self, audio_path: Path) -> bool:
+        if not self._ensure_running():
+            return False
+        try:
+            command = {"command": ["loadfile", str(audio_path), "replace"], "request_id": 1}
+            self._socket.sendall(json.dumps(command).encode("utf-8") + b"\n")
+            for event in self._events():
+                if event.get("request_id") == 1 and event.get("error") not in (None, "success"):
+                    return False
+                if event.get("event") == "end-file":
+                    return event.get("reason", "eof") == "eof"
+        except OSError:
+            pass
+        self.close()
+        return False
+
+    def close(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.sendall(b'{"command": ["quit"]}\n')
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        if self._process is not None and self._process.poll() is None:
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+@dataclass
+class PlaybackJob:
+    """One queued sound. Lower ``priority`` plays sooner."""
+
+    job_id: str
+    audio_file: str
+    priority: int
+    prefer_pulse: bool = True
+    status: str = "queued"  # queued, playing, done, failed, cancelled
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    # Later requests for the same file that were merged into this job
+    coalesced: int = 0
+
+
+class PlaybackQueue:
+    """Priority queue of sounds played one at a time by a daemon thread.
+
+    Enqueueing a file that is already queued or playing returns the
+    existing job (raising its priority if needed) instead of playing the
+    same notification twice.
+    """
+
+    def __init__(
+        self,
+        play_func: Callable[[Path, bool], bool] | None = None,
+        history: int = 200,
+    ):
+        self._play_func = play_func
+        self._mpv: MpvPlayer | None = None
+        self._heap: list[tuple[int, int, str]] = []
+        self._jobs: OrderedDict[str, PlaybackJob] = OrderedDict()
+        self._history = history
+        self._sequence = itertools.count()
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._current: PlaybackJob | None = None
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def enqueue(self, audio_path: Path | str, priority: int = 5, prefer_pulse: bool = True) -> str:
+        """Queue *audio_path*; returns the job id without waiting."""
+        audio_file = str(Path(audio_path).resolve())
+        with self._condition:
+            for job in self._active_jobs():
+                if job.audio_file == audio_file:
+                    job.coalesced += 1
+                    if job.status == "queued" and priority < job.priority:
+                        job.priority = priority
+                        heapq.heappush(self._heap, (priority, next(self._sequence), job.job_id))
+                    return job.job_id
+
+            job = PlaybackJob(f"play-{next(self._ids)}", audio_file, priority, prefer_pulse)
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._heap, (priority, next(self._sequence), job.job_id))
+            self._trim_history()
+            self._ensure_worker()
+            self._condition.notify()
+            return job.job_id
+
+    def status(self, job_id: str | None = None) -> dict[str, object]:
+        """One job's state (with its queue position), or a queue overview."""
+        with self._condition:
+            queued = self._queued_in_order()
+            if job_id is None:
+                return {
+                    "playing": asdict(self._current) if self._current else None,
+                    "queued": [asdict(job) for job in queued],
+                    "recent": [
+                        asdict(job) for job in list(self._jobs.values())[-10:]
+                        if job.status not in ("queued", "playing")
+                    ],
+                }
+            job = self._jobs.get(job_id)
+            if job is None:
+                return {"job_id": job_id, "status": "unknown"}
+            result = asdict(job)
+            if job.status == "queued":
+                result["position"] = queued.index(job) + 1
+            return result
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job (a sound already playing finishes)."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return False
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            # Wake wait() callers blocked on this job
+            self._condition.notify_all()
+            return True
+
+    def wait(self, job_id: str, timeout: float | None = None) -> dict[str, object]:
+        """Block until the job finishes (or *timeout*); returns its status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.status not in ("queued", "playing"):
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+        return self.status(job_id)
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _active_jobs(self) -> list[PlaybackJob]:
+        return [job for job in self._jobs.values() if job.status in ("queued", "playing")]
+
+    def _queued_in_order(self) -> list[PlaybackJob]:
+        queued = [job for job in self._jobs.values() if job.status == "queued"]
+        return sorted(queued, key=lambda job: (job.priority, job.submitted_at))
+
+    def _trim_history(self) -> None:
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status not in ("queued", "playing")
+        ]
+        for job_id in finished[: max(0, len(self._jobs) - self._history)]:
+            del self._jobs[job_id]
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audio-playback", daemon=True)
+            self._thread.start()
+
+    def _next_job(self) -> PlaybackJob:
+        with self._condition:
+            while True:
+                while self._heap:
+                    priority, _, job_id = heapq.heappop(self._heap)
+                    job = self._jobs.get(job_id)
+                    # Skip stale entries (cancelled, or re-pushed at a better priority)
+                    if job is not None and job.status == "queued" and job.priority == priority:
+                        job.status = "playing"
+                        job.started_at = time.time()
+                        self._current = job
+                        return job
+                self._condition.wait()
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            try:
+                ok = self._play(Path(job.audio_file), job.prefer_pulse)
+                error = None if ok else "No audio player could play the file"
+            except Exception as e:
+                ok, error = False, str(e)
+            with self._condition:
+                job.status = "done" if ok else "failed"
+                job.error = error
+                job.finished_at = time.time()
+                self._current = None
+                self._condition.notify_all()
+
+    def _play(self, audio_path: Path, prefer_pulse: bool) -> bool:
+        if self._play_func is not None:
+            return self._play_func(audio_path, prefer_pulse)
+        if not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        if MpvPlayer.available():
+            if self._mpv is None:
+                self._mpv = MpvPlayer(prefer_pulse=True)
+            if self._mpv.play(audio_path):
+                return True
+        return play_audio(audio_path, prefer_pulse=prefer_pulse)
+
+
+_playback_queue: PlaybackQueue | None = None
+_playback_queue_lock = threading.Lock()
+
+
+def get_playback_queue() -> PlaybackQueue:
+    """Return the process-wide playback queue."""
+    global _playback_queue
+    with _playback_queue_lock:
+        if _playback_queue is None:
+            _playback_queue = PlaybackQueue()
+        return _playback_queue
+
+
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=__doc__,
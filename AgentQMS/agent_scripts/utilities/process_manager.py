@@ -4,10 +4,21 @@ Streamlit Process Manager for Korean Grammar Correction
 
 This script provides proper process management for the Korean Grammar Correction Streamlit application
 to prevent zombie processes and ensure clean startup/shutdown.
+
+Managed processes are recorded in a PID/port registry
+(``.grammar_correction_apps.json``) together with each process's creation
+time, so a recycled PID is never mistaken for the app. ``status``, ``stop``
+and ``start`` trust a registry entry once that check passes, and scan the
+process table only when a port is busy but unregistered. Readiness is an
+HTTP health probe (Streamlit's ``/_stcore/health``) polled with adaptive
+backoff. ``supervise`` keeps several ports running and restarts crashed
+apps.
 """
 
 import argparse
 import contextlib
+import fcntl
+import json
 import os
 import re
 import shutil
@@ -16,7 +27,10 @@ import socket
 import subprocess
 import sys
 import time
+from collections.abc import Iterator
 from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
 
 import psutil
 
@@ -24,6 +38,8 @@ from AgentQMS.agent_scripts.utilities import path_utils
 
 path_utils.setup_project_paths()
 
+HEALTH_PATHS = ("/_stcore/health", "/healthz")
+
 
 class GrammarCorrectionProcessManager:
     """Manages the Korean Grammar Correction Streamlit process with proper lifecycle handling."""
@@ -41,11 +57,91 @@ class GrammarCorrectionProcessManager:
         """Get the PID file path for the Streamlit process."""
         return Path(self.project_root) / f".grammar_correction_app_{port}.pid"
 
+    def _get_registry_file(self) -> Path:
+        """Get the PID/port registry path."""
+        return Path(self.project_root) / ".grammar_correction_apps.json"
+
+    @contextlib.contextmanager
+    def _registry(self) -> Iterator[dict[str, dict]]:
+        """Locked read-modify-write access to the registry (port -> entry)."""
+        registry_file = self._get_registry_file()
+        lock_file = registry_file.with_suffix(".lock")
+        with open(lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._load_registry()
+                before = json.dumps(entries, sort_keys=True)
+                yield entries
+                if json.dumps(entries, sort_keys=True) != before:
+                    tmp_file = registry_file.with_suffix(".json.tmp")
+                    tmp_file.write_text(json.dumps(entries, indent=2, sort_keys=True))
+                    os.replace(tmp_file, registry_file)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_registry(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self._get_registry_file().read_text())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _register(self, port: int, pid: int) -> None:
+        """Record a managed process with its creation time."""
+        try:
+            create_time = psutil.Process(pid).create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        with self._registry() as entries:
+            entries[str(port)] = {
+                "pid": pid,
+                "create_time": create_time,
+                "registered_at": time.time(),
+            }
+
+    def _registered_pid(self, port: int) -> int | None:
+        """PID registered for *port*, if that exact process is still alive.
+
+        O(1): one registry read and one process lookup. A dead process or a
+        recycled PID (different creation time) drops the entry.
+        """
+        entry = self._load_registry().get(str(port))
+        if not entry:
+            return self._migrate_pid_file(port)
+        try:
+            proc = psutil.Process(entry["pid"])
+            alive = (
+                abs(proc.create_time() - entry["create_time"]) < 0.01
+                and proc.status() != psutil.STATUS_ZOMBIE
+            )
+        except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError, TypeError):
+            alive = False
+        if alive:
+            return int(entry["pid"])
+        self._remove_pid_file(port)
+        return None
+
+    def _migrate_pid_file(self, port: int) -> int | None:
+        """Register a process known only from a PID file written by older versions."""
+        pid = self._read_pid_file(port)
+        if pid is None:
+            return None
+        try:
+            is_app = "streamlit" in " ".join(psutil.Process(pid).cmdline())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            is_app = False
+        if not is_app:
+            self._remove_pid_file(port)
+            return None
+        self._register(port, pid)
+        return pid
+
     def _write_pid_file(self, port: int, pid: int) -> None:
-        """Write the PID file."""
+        """Write the PID file (and the registry entry)."""
         pid_file = self._get_pid_file(port)
         with open(pid_file, "w") as f:
             f.write(str(pid))
+        self._register(port, pid)
 
     def _read_pid_file(self, port: int) -> int | None:
         """Read the PID file."""
@@ -71,6 +167,8 @@ class GrammarCorrectionProcessManager:
         pid_file = self._get_pid_file(port)
         if pid_file.exists():
             pid_file.unlink()
+        with self._registry() as entries:
+            entries.pop(str(port), None)
 
     def _is_process_running(self, pid: int) -> bool:
         """Check if a process is running."""
@@ -87,6 +185,47 @@ class GrammarCorrectionProcessManager:
         except Exception:
             return True  # Assume available if we can't check
 
+    def _probe_health(self, port: int, timeout: float = 1.0) -> bool:
+        """HTTP health check against Streamlit's health endpoint."""
+        for path in HEALTH_PATHS:
+            try:
+                with urlopen(f"http://localhost:{port}{path}", timeout=timeout) as response:
+                    return 200 <= response.status < 300
+            except HTTPError as e:
+                if e.code == 404:
+                    continue  # Older Streamlit: try the next endpoint
+                return False
+            except (URLError, OSError):
+                return False
+        # Serving HTTP, but without a known health endpoint
+        return True
+
+    def wait_until_healthy(
+        self,
+        port: int,
+        pid: int | None = None,
+        timeout: float = 15.0,
+        initial_delay: float = 0.01,
+        max_delay: float = 0.25,
+    ) -> bool:
+        """Poll the health probe with adaptive backoff until the app is ready.
+
+        Starts at ``initial_delay`` and grows by 1.5x up to ``max_delay``, so
+        a fast start is detected within milliseconds and a slow one costs
+        few probes. Gives up early if *pid* exits.
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while time.monotonic() < deadline:
+            # Cheap TCP check first; HTTP only once something is listening
+            if not self._is_port_available(port) and self._probe_health(port):
+                return True
+            if pid is not None and not self._is_process_running(pid):
+                return False
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 1.5, max_delay)
+        return False
+
     def _find_project_processes(self) -> list[psutil.Process]:
         """Find all Streamlit processes related to this project."""
         project_processes = []
@@ -134,9 +273,24 @@ class GrammarCorrectionProcessManager:
                     continue
         return None
 
+    def _managed_pids(self) -> set[int]:
+        """Registered PIDs and their descendants (uv runs streamlit as a child)."""
+        pids: set[int] = set()
+        for port in list(self._load_registry()):
+            pid = self._registered_pid(int(port))
+            if pid is None:
+                continue
+            pids.add(pid)
+            with contextlib.suppress(psutil.NoSuchProcess, psutil.AccessDenied):
+                pids.update(child.pid for child in psutil.Process(pid).children(recursive=True))
+        return pids
+
     def _cleanup_orphaned_processes(self) -> None:
-        """Clean up any orphaned Streamlit processes related to this project."""
+        """Clean up Streamlit processes of this project that no registry entry owns."""
+        managed = self._managed_pids()
         for proc in self._find_project_processes():
+            if proc.pid in managed:
+                continue
             print(f"Found orphaned Streamlit process (PID: {proc.pid})... terminating.")
             try:
                 proc.terminate()
@@ -157,49 +311,26 @@ class GrammarCorrectionProcessManager:
         """Start the Korean Grammar Correction Streamlit process."""
         app_path = self._get_main_app_path()
 
-        # First, check for existing Streamlit processes
-        existing_processes = self._find_existing_streamlit_processes()
-        if existing_processes:
-            for pid, actual_port in existing_processes:
-                if actual_port == port:
-                    if restart:
-                        print(
-                            f"Restarting Korean Grammar Correction app on port {port} (stopping PID: {pid})...",
-                        )
-                        self.stop(port)
-                    else:
-                        print(
-                            f"Korean Grammar Correction app is already running on port {port} (PID: {pid})",
-                        )
-                        # Create PID file for the existing process
-                        self._write_pid_file(port, pid)
-                        return pid
-                else:
-                    print(
-                        f"Found existing Streamlit process on port {actual_port} (PID: {pid}). "
-                        f"Requested port {port} may be different."
-                    )
+        # Trust the registry first; it is validated against the live process
+        existing_pid = self._registered_pid(port)
+        if existing_pid is None and not self._is_port_available(port):
+            # Busy but unregistered: only now scan for an app to adopt
+            existing_pid = self._adopt_unregistered(port)
 
-        # Check if already running via PID file
-        existing_pid = self._read_pid_file(port)
         if existing_pid:
-            if self._is_process_running(existing_pid):
-                if restart:
-                    print(
-                        f"Restarting Korean Grammar Correction app on port {port} (stopping PID: {existing_pid})...",
-                    )
-                    self.stop(port)
-                else:
-                    print(
-                        f"Korean Grammar Correction app is already running on port {port} (PID: {existing_pid})",
-                    )
-                    return existing_pid
+            if restart:
+                print(
+                    f"Restarting Korean Grammar Correction app on port {port} (stopping PID: {existing_pid})...",
+                )
+                self.stop(port)
             else:
-                # Clean up stale PID file
-                self._remove_pid_file(port)
-
-        # Clean up any orphaned Streamlit processes
-        self._cleanup_orphaned_processes()
+                print(
+                    f"Korean Grammar Correction app is already running on port {port} (PID: {existing_pid})",
+                )
+                return existing_pid
+        else:
+            # Clean up stale PID file
+            self._remove_pid_file(port)
 
         # Check if port is available
         if not self._is_port_available(port):
@@ -273,25 +404,18 @@ class GrammarCorrectionProcessManager:
                     env=env,
                 )
 
-            # Poll for startup instead of fixed sleep
+            # Health probe with adaptive backoff instead of fixed sleeps
             print("Waiting for app to start...")
-            start_time = time.time()
-            timeout = 15
-            is_up = False
-            while time.time() - start_time < timeout:
-                if not self._is_port_available(port):
-                    is_up = True
-                    break
-                if not self._is_process_running(process.pid):
-                    print("Process terminated unexpectedly during startup.")
-                    is_up = False
-                    break
-                time.sleep(0.5)
+            start_time = time.monotonic()
+            is_up = self.wait_until_healthy(port, pid=process.pid, timeout=15)
+            if not is_up and process.poll() is not None:
+                print("Process terminated unexpectedly during startup.")
 
             if is_up:
                 self._write_pid_file(port, process.pid)
                 print(
-                    f"Started Korean Grammar Correction app (PID: {process.pid}) on port {port}"
+                    f"Started Korean Grammar Correction app (PID: {process.pid}) on port {port} "
+                    f"in {time.monotonic() - start_time:.2f}s"
                 )
                 return process.pid
             else:
@@ -311,12 +435,12 @@ class GrammarCorrectionProcessManager:
 
     def stop(self, port: int = 8501) -> bool:
         """Stop the Korean Grammar Correction Streamlit process."""
-        pid = self._read_pid_file(port)
+        pid = self._registered_pid(port)
+        if pid is None and not self._is_port_available(port):
+            pid = self._adopt_unregistered(port)
 
-        if not pid or not self._is_process_running(pid):
-            # ... (your existing logic for no PID or not running) ...
-            # Make sure to run cleanup here
-            self._cleanup_orphaned_processes()
+        if not pid:
+            self._remove_pid_file(port)
             return True
 
         print(f"Stopping Korean Grammar Correction app (PID: {pid})...")
@@ -330,7 +454,7 @@ class GrammarCorrectionProcessManager:
             os.killpg(pgid, signal.SIGTERM)
 
             # Wait for it to die
-            time.sleep(3)
+            self._wait_for_exit(pid, timeout=3.0)
 
             if not self._is_process_running(pid):
                 print("Process group terminated gracefully.")
@@ -340,7 +464,7 @@ class GrammarCorrectionProcessManager:
                     f"Process {pid} still running. Sending SIGKILL to process group {pgid}..."
                 )
                 os.killpg(pgid, signal.SIGKILL)
-                time.sleep(1)
+                self._wait_for_exit(pid, timeout=1.0)
 
             # 3. Final check
             if self._is_process_running(pid):
@@ -349,8 +473,6 @@ class GrammarCorrectionProcessManager:
             else:
                 print("Stopped Korean Grammar Correction app.")
                 self._remove_pid_file(port)
-                # Also run general cleanup just in case
-                self._cleanup_orphaned_processes()
                 return True
 
         except (OSError, ProcessLookupError) as e:
@@ -360,37 +482,138 @@ class GrammarCorrectionProcessManager:
                 return True
             return False
 
-    def status(self, port: int = 8501) -> bool:
-        """Check the status of the Korean Grammar Correction Streamlit process."""
-        # First check for existing processes
-        existing_processes = self._find_existing_streamlit_processes()
-        if existing_processes:
-            print("Found existing Streamlit processes:")
-            for pid, actual_port in existing_processes:
-                status = "Running" if self._is_process_running(pid) else "Stopped"
-                print(f"  PID: {pid}, Port: {actual_port}, Status: {status}")
-
-            # Check if any match the requested port
-            for pid, actual_port in existing_processes:
-                if actual_port == port and self._is_process_running(pid):
-                    print(
-                        f"Korean Grammar Correction app: Running (PID: {pid}, Port: {port})"
-                    )
-                    return True
+    def _wait_for_exit(self, pid: int, timeout: float) -> None:
+        with contextlib.suppress(psutil.NoSuchProcess, psutil.TimeoutExpired):
+            psutil.Process(pid).wait(timeout=timeout)
+
+    def _adopt_unregistered(self, port: int) -> int | None:
+        """Full process scan for an unregistered app on *port*; registers it."""
+        candidates = {
+            pid for pid, actual_port in self._find_existing_streamlit_processes()
+            if actual_port == port
+        }
+        for pid in sorted(candidates):
+            # `uv run streamlit` matches twice; register the outermost process
+            with contextlib.suppress(psutil.NoSuchProcess, psutil.AccessDenied):
+                if psutil.Process(pid).ppid() in candidates:
+                    continue
+            self._write_pid_file(port, pid)
+            return pid
+        return None
 
-        # Check PID file
-        pid = self._read_pid_file(port)  # type: ignore[assignment]
+    def status(self, port: int = 8501, scan: bool = False) -> bool:
+        """Check the status of the Korean Grammar Correction Streamlit process.
+
+        Uses the registry and one health probe; ``scan=True`` also lists every
+        Streamlit process of this project (a full process table walk).
+        """
+        if scan:
+            existing_processes = self._find_existing_streamlit_processes()
+            if existing_processes:
+                print("Found existing Streamlit processes:")
+                for pid, actual_port in existing_processes:
+                    status = "Running" if self._is_process_running(pid) else "Stopped"
+                    print(f"  PID: {pid}, Port: {actual_port}, Status: {status}")
+            if self._registered_pid(port) is None:
+                self._adopt_unregistered(port)
+
+        pid = self._registered_pid(port)
         if not pid:
-            print("Korean Grammar Correction app: Not managed (no PID file)")
+            if not self._is_port_available(port):
+                print(
+                    f"Korean Grammar Correction app: Not managed (port {port} in use by an "
+                    "unregistered process; run status --scan to adopt it)"
+                )
+            else:
+                print("Korean Grammar Correction app: Not managed (no PID file)")
             return False
 
-        if self._is_process_running(pid):
-            print(f"Korean Grammar Correction app: Running (PID: {pid}, Port: {port})")
-            return True
-        else:
-            print(f"Korean Grammar Correction app: Stopped (stale PID file: {pid})")
-            self._remove_pid_file(port)
-            return False
+        health = "healthy" if self._probe_health(port) else "not responding"
+        print(f"Korean Grammar Correction app: Running (PID: {pid}, Port: {port}, {health})")
+        return True
+
+    def supervise(
+        self,
+        ports: list[int],
+        interval: float = 2.0,
+        failure_threshold: int = 3,
+        max_restarts: int = 5,
+        restart_window: float = 300.0,
+        enable_logging: bool = True,
+    ) -> None:
+        """Keep an app running on each port, restarting it when it crashes.
+
+        A port is restarted when its process exits or its health probe fails
+        ``failure_threshold`` times in a row. Restarts back off exponentially
+        (1 s, 2 s, 4 s, ... capped at 60 s); after ``max_restarts`` within
+        ``restart_window`` seconds the port is given up. SIGINT/SIGTERM stop
+        every supervised app.
+        """
+        stopping = False
+
+        def request_stop(signum: int, frame: object) -> None:
+            nonlocal stopping
+            stopping = True
+
+        previous_handlers = {
+            sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+        state = {
+            port: {
+                "failures": 0,
+                "restarts": [],
+                "next_start": 0.0,
+                "backing_off": False,
+                "gave_up": False,
+            }
+            for port in ports
+        }
+        print(f"Supervising ports: {', '.join(str(p) for p in ports)} (Ctrl+C to stop)")
+        try:
+            while not stopping:
+                now = time.monotonic()
+                for port, info in state.items():
+                    if info["gave_up"] or now < info["next_start"]:
+                        continue
+                    pid = self._registered_pid(port)
+                    if pid is not None and self._probe_health(port):
+                        info["failures"] = 0
+                        info["backing_off"] = False
+                        continue
+                    if pid is not None:
+                        info["failures"] += 1
+                        if info["failures"] < failure_threshold:
+                            continue
+                        print(f"[supervise] Port {port} unhealthy; restarting (PID: {pid})")
+                        self.stop(port)
+
+                    info["restarts"] = [t for t in info["restarts"] if now - t < restart_window]
+                    if len(info["restarts"]) >= max_restarts:
+                        print(
+                            f"[supervise] Port {port} restarted {max_restarts} times in "
+                            f"{restart_window:.0f}s; giving up"
+                        )
+                        info["gave_up"] = True
+                        continue
+                    if info["restarts"] and not info["backing_off"]:
+                        # Every restart (not the initial start) waits out the backoff
+                        backoff = min(60.0, 2.0 ** (len(info["restarts"]) - 1))
+                        print(f"[supervise] Port {port} is down; restarting in {backoff:.0f}s")
+                        info["next_start"] = now + backoff
+                        info["backing_off"] = True
+                        continue
+                    info["backing_off"] = False
+                    info["restarts"].append(now)
+                    info["failures"] = 0
+                    self.start(port, background=True, enable_logging=enable_logging)
+                if all(info["gave_up"] for info in state.values()):
+                    break
+                time.sleep(interval)
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            for port in ports:
+                self.stop(port)
 
     def view_logs(
         self,
@@ -454,7 +677,7 @@ def main() -> None:
     )
     parser.add_argument(
         "action",
-        choices=["start", "stop", "status", "logs", "clear-logs", "cleanup"],
+        choices=["start", "stop", "status", "logs", "clear-logs", "cleanup", "supervise"],
         help="Action to perform",
     )
     parser.add_argument(
@@ -463,6 +686,17 @@ def main() -> None:
         default=8501,
         help="Port number (default: 8501)",
     )
+    parser.add_argument(
+        "--ports",
+        type=int,
+        nargs="+",
+        help="Ports to manage (only for supervise action; default: --port)",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Also scan all processes for unregistered apps (only for status action)",
+    )
     parser.add_argument(
         "--foreground",
         action="store_true",
@@ -503,7 +737,7 @@ def main() -> None:
         manager.stop(args.port)
 
     elif args.action == "status":
-        manager.status(args.port)
+        manager.status(args.port, scan=args.scan)
 
     elif args.action == "logs":
         manager.view_logs(args.port, args.lines, args.follow)
@@ -511,6 +745,9 @@ def main() -> None:
     elif args.action == "clear-logs":
         manager.clear_logs(args.port)
 
+    elif args.action == "supervise":
+        manager.supervise(args.ports or [args.port], enable_logging=not args.no_logging)
+
     elif args.action == "cleanup":
         print("Cleaning up orphaned Streamlit processes...")
         manager._cleanup_orphaned_processes()
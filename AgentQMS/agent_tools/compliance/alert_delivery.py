@@ -0,0 +1,458 @@
+"""
+Asynchronous Alert Delivery Engine
+
+Delivery backend used by the compliance alert system:
+- Concurrent fan-out to every channel with per-channel timeouts
+- Retries with exponential backoff and jitter
+- Persistent SQLite outbox so undelivered alerts survive crashes
+- Per-attempt delivery latency metrics
+
+Channel senders are plain blocking callables; the engine runs them in worker
+threads so a slow SMTP or webhook endpoint only delays its own channel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass, field
+from typing import Any
+
+# Sender signature: (payload, channel, timeout_seconds) -> delivered?
+ChannelSender = Callable[[dict[str, Any], str, float], bool]
+
+OUTBOX_PENDING = "pending"
+OUTBOX_DELIVERED = "delivered"
+OUTBOX_DEAD = "dead"
+
+
+@dataclass
+class DeliveryPolicy:
+    """Timeout and retry settings for alert delivery"""
+
+    timeout_seconds: float = 30.0
+    channel_timeouts: dict[str, float] = field(default_factory=dict)
+    max_attempts: int = 3
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 30.0
+    # Outbox rows are retried on later drains until this many attempts
+    max_outbox_attempts: int = 10
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any] | None) -> DeliveryPolicy:
+        """Build a policy from the ``delivery`` section of the alert config"""
+        config = config or {}
+        known = {k: v for k, v in config.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+    def timeout_for(self, channel: str) -> float:
+        return float(self.channel_timeouts.get(channel, self.timeout_seconds))
+
+    def lease_seconds(self, channel: str) -> float:
+        """How long a claimed outbox row stays invisible to other drains"""
+        return self.timeout_for(channel) * self.max_attempts + self.backoff_max_seconds
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with "equal jitter" for the given attempt (1-based)"""
+        ceiling = min(
+            self.backoff_max_seconds,
+            self.backoff_base_seconds * (2 ** max(attempt - 1, 0)),
+        )
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class AlertDeliveryEngine:
+    """Concurrent, retrying alert delivery backed by a persistent outbox"""
+
+    def __init__(
+        self,
+        db_path: str,
+        sender: ChannelSender,
+        policy: DeliveryPolicy | None = None,
+    ):
+        self.db_path = db_path
+        self.sender = sender
+        self.policy = policy or DeliveryPolicy()
+        self._init_tables()
+
+    def _init_tables(self):
+        """Create outbox and metrics tables"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS alert_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                alert_id TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                delivered_at TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_alert_outbox_status
+            ON alert_outbox (status, next_attempt_at)
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS alert_delivery_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                alert_id TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                attempt INTEGER NOT NULL,
+                success BOOLEAN NOT NULL,
+                latency_ms REAL NOT NULL,
+                error_message TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Outbox
+    # ------------------------------------------------------------------
+    def enqueue(
+        self, alert_id: str, payload: dict[str, Any], channels: list[str]
+    ) -> dict[str, int]:
+        """Persist one outbox row per channel before any delivery is attempted"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        outbox_ids = {}
+        body = json.dumps(payload)
+        for channel in channels:
+            # Lease the row for the in-process attempt so a concurrent drain
+            # does not pick it up; after a crash it becomes due again.
+            cursor.execute(
+                """
+                INSERT INTO alert_outbox (alert_id, channel, payload, next_attempt_at)
+                VALUES (?, ?, ?, ?)
+            """,
+                (alert_id, channel, body, time.time() + self.policy.lease_seconds(channel)),
+            )
+            outbox_ids[channel] = cursor.lastrowid
+
+        conn.commit()
+        conn.close()
+        return outbox_ids
+
+    def _mark_delivered(self, outbox_id: int, attempts: int):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            UPDATE alert_outbox
+            SET status = ?, attempts = attempts + ?, delivered_at = datetime('now'),
+                last_error = NULL
+            WHERE id = ?
+        """,
+            (OUTBOX_DELIVERED, attempts, outbox_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def _mark_failed(self, outbox_id: int, attempts: int, error: str | None):
+        """Leave the row pending for a later drain, or bury it once exhausted
+
+        Rows already marked delivered (e.g. by a late success from an
+        abandoned attempt) are left alone.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            UPDATE alert_outbox
+            SET attempts = attempts + ?,
+                status = CASE WHEN attempts + ? >= ? THEN ? ELSE ? END,
+                last_error = ?,
+                next_attempt_at = ?
+            WHERE id = ? AND status = ?
+        """,
+            (
+                attempts,
+                attempts,
+                self.policy.max_outbox_attempts,
+                OUTBOX_DEAD,
+                OUTBOX_PENDING,
+                error,
+                time.time() + self.policy.backoff_delay(attempts),
+                outbox_id,
+                OUTBOX_PENDING,
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    def pending(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Claim and return outbox rows that are due for another delivery attempt
+
+        The rows are leased by pushing ``next_attempt_at`` forward inside a
+        ``BEGIN IMMEDIATE`` transaction, so a concurrent drain (or a drain
+        racing a fresh delivery) never picks up the same row twice. A claim
+        that is never resolved (crash) simply expires and the row is due again.
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            cursor.execute(
+                """
+                SELECT id, alert_id, channel, payload, attempts FROM alert_outbox
+                WHERE status = ? AND next_attempt_at <= ?
+                ORDER BY id
+                LIMIT ?
+            """,
+                (OUTBOX_PENDING, now, limit),
+            )
+            rows = [
+                {
+                    "outbox_id": row[0],
+                    "alert_id": row[1],
+                    "channel": row[2],
+                    "payload": json.loads(row[3]),
+                    "attempts": row[4],
+                }
+                for row in cursor.fetchall()
+            ]
+            cursor.executemany(
+                "UPDATE alert_outbox SET next_attempt_at = ? WHERE id = ?",
+                [
+                    (now + self.policy.lease_seconds(row["channel"]), row["outbox_id"])
+                    for row in rows
+                ],
+            )
+            cursor.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return rows
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+    def _record_attempt(
+        self,
+        alert_id: str,
+        channel: str,
+        attempt: int,
+        success: bool,
+        latency_ms: float,
+        error: str | None,
+    ):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            INSERT INTO alert_delivery_metrics
+            (alert_id, channel, attempt, success, latency_ms, error_message)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            (alert_id, channel, attempt, success, latency_ms, error),
+        )
+        conn.commit()
+        conn.close()
+
+    def _send(
+        self,
+        outbox_id: int,
+        alert_id: str,
+        channel: str,
+        payload: dict[str, Any],
+        timeout: float,
+        attempt: int,
+        state: dict[str, Any],
+    ) -> bool:
+        """Run the sender in a worker thread, recording a success that lands late
+
+        ``asyncio.wait_for`` cannot stop the thread, so an attempt abandoned on
+        timeout may still deliver. When that happens the row is marked
+        delivered here rather than being retried.
+        """
+        started = time.perf_counter()
+        success = False
+        try:
+            success = bool(self.sender(payload, channel, timeout))
+        finally:
+            with state["lock"]:
+                state["finished"] = True
+                abandoned = state["abandoned"]
+        if abandoned and success:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._record_attempt(alert_id, channel, attempt, True, latency_ms, "late success")
+            self._mark_delivered(outbox_id, 0)
+            state["late_success"].set()
+        return success
+
+    async def _deliver_channel(
+        self, outbox_id: int, alert_id: str, channel: str, payload: dict[str, Any]
+    ) -> tuple[bool, str | None]:
+        """Deliver to one channel, retrying with backoff until success or exhaustion"""
+        timeout = self.policy.timeout_for(channel)
+        error: str | None = None
+        late_success = threading.Event()
+
+        for attempt in range(1, self.policy.max_attempts + 1):
+            if late_success.is_set():
+                return True, None
+
+            state = {
+                "lock": threading.Lock(),
+                "finished": False,
+                "abandoned": False,
+                "late_success": late_success,
+            }
+            worker = asyncio.ensure_future(
+                asyncio.to_thread(
+                    self._send, outbox_id, alert_id, channel, payload, timeout, attempt, state
+                )
+            )
+            # Errors of an abandoned worker are not awaited; consume them here
+            worker.add_done_callback(lambda f: f.cancelled() or f.exception())
+            started = time.perf_counter()
+            try:
+                success = await asyncio.wait_for(asyncio.shield(worker), timeout=timeout)
+                error = None if success else "channel reported failure"
+            except asyncio.TimeoutError:
+                with state["lock"]:
+                    finished = state["finished"]
+                    state["abandoned"] = not finished
+                if finished:
+                    # The sender returned right at the deadline; keep its result
+                    success = await worker
+                    error = None if success else "channel reported failure"
+                else:
+                    success = False
+                    error = f"timed out after {timeout:.1f}s"
+            except Exception as e:
+                success = False
+                error = str(e)
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._record_attempt(alert_id, channel, attempt, success, latency_ms, error)
+
+            if success:
+                self._mark_delivered(outbox_id, attempt)
+                return True, None
+
+            if attempt < self.policy.max_attempts:
+                await asyncio.sleep(self.policy.backoff_delay(attempt))
+
+        if late_success.is_set():
+            return True, None
+        self._mark_failed(outbox_id, self.policy.max_attempts, error)
+        return False, error
+
+    async def deliver_async(
+        self, alert_id: str, payload: dict[str, Any], channels: list[str]
+    ) -> dict[str, tuple[bool, str | None]]:
+        """Enqueue and deliver an alert to all channels concurrently"""
+        outbox_ids = self.enqueue(alert_id, payload, channels)
+        outcomes = await asyncio.gather(
+            *(
+                self._deliver_channel(outbox_ids[channel], alert_id, channel, payload)
+                for channel in channels
+            )
+        )
+        return dict(zip(channels, outcomes))
+
+    def deliver(
+        self, alert_id: str, payload: dict[str, Any], channels: list[str]
+    ) -> dict[str, tuple[bool, str | None]]:
+        """Blocking wrapper around :meth:`deliver_async`"""
+        return run_blocking(self.deliver_async(alert_id, payload, channels), "deliver_async")
+
+    async def drain_async(self, limit: int = 100) -> dict[str, int]:
+        """Retry every due outbox row concurrently"""
+        rows = self.pending(limit)
+        outcomes = await asyncio.gather(
+            *(
+                self._deliver_channel(
+                    row["outbox_id"], row["alert_id"], row["channel"], row["payload"]
+                )
+                for row in rows
+            )
+        )
+        delivered = sum(1 for success, _ in outcomes if success)
+        return {"attempted": len(rows), "delivered": delivered}
+
+    def drain(self, limit: int = 100) -> dict[str, int]:
+        """Blocking wrapper around :meth:`drain_async`"""
+        return run_blocking(self.drain_async(limit), "drain_async")
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def get_latency_metrics(self, days: int = 7) -> dict[str, dict[str, Any]]:
+        """Summarize delivery latency and success rate per channel"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT channel, success, latency_ms FROM alert_delivery_metrics
+            WHERE timestamp >= datetime('now', ?)
+            ORDER BY channel, latency_ms
+        """,
+            (f"-{int(days)} days",),
+        )
+
+        samples: dict[str, list[tuple[bool, float]]] = {}
+        for channel, success, latency_ms in cursor.fetchall():
+            samples.setdefault(channel, []).append((bool(success), latency_ms))
+        conn.close()
+
+        metrics = {}
+        for channel, rows in samples.items():
+            latencies = [latency for _, latency in rows]
+            metrics[channel] = {
+                "attempts": len(rows),
+                "success_rate": sum(1 for ok, _ in rows if ok) / len(rows),
+                "p50_ms": _percentile(latencies, 0.50),
+                "p95_ms": _percentile(latencies, 0.95),
+                "max_ms": latencies[-1],
+            }
+        return metrics
+
+    def get_outbox_counts(self) -> dict[str, int]:
+        """Return the number of outbox rows per status"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM alert_outbox GROUP BY status")
+        counts = dict(cursor.fetchall())
+        conn.close()
+        return counts
+
+
+def run_blocking(coro: Coroutine[Any, Any, Any], async_name: str) -> Any:
+    """Run *coro* to completion for a blocking wrapper.
+
+    Inside a running event loop ``asyncio.run`` cannot be used, so the
+    coroutine is discarded and a RuntimeError names the method to await.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    coro.close()
+    raise RuntimeError(f"Called from a running event loop; await {async_name}() instead")
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
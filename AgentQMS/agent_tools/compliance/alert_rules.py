@@ -0,0 +1,259 @@
+"""
+Alert Rule Expression Engine
+
+Compiles alert rule expressions once and evaluates whole rule sets in a
+single pass:
+
+    compliance_rate < 0.8 and trend_7day < -0.05
+    issues_by_type['Naming'] > 10
+    total_issues > 100 or abs(trend_30day) >= 0.1
+
+Expressions are parsed with ``ast`` and restricted to comparisons, boolean
+logic, arithmetic, constants, metric names, subscripts and a few safe
+functions. Unknown metrics and missing subscript keys evaluate to 0 so a
+sparse snapshot never raises.
+
+All rules of a ``RuleSet`` are compiled into one code object, so evaluating a
+snapshot (or every snapshot of a historical series for backtesting) costs one
+``eval`` per snapshot rather than one interpretation per rule. If that pass
+raises (e.g. a division by a missing metric), the snapshot is re-evaluated
+rule by rule so only the failing rules are reported as errors.
+"""
+
+from __future__ import annotations
+
+import ast
+import copy
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+# Legacy AlertRule.condition -> metric name
+LEGACY_CONDITION_METRICS = {
+    "compliance_rate": "compliance_rate",
+    "total_issues": "total_issues",
+    "trend_decline": "trend_7day",
+}
+
+# Legacy AlertRule.operator -> comparison operator
+LEGACY_OPERATORS = {
+    "lt": "<",
+    "gt": ">",
+    "eq": "==",
+    "gte": ">=",
+    "lte": "<=",
+}
+
+SAFE_FUNCTIONS = {"abs": abs, "min": min, "max": max, "len": len, "round": round}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Compare,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Eq,
+    ast.NotEq,
+    ast.In,
+    ast.NotIn,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Subscript,
+    ast.Tuple,
+    ast.List,
+    ast.Call,
+)
+
+
+class RuleExpressionError(ValueError):
+    """Raised when an alert rule expression is invalid or unsafe."""
+
+
+def _lookup(snapshot: Mapping[str, Any], name: str) -> Any:
+    return snapshot.get(name, 0)
+
+
+def _item(container: Any, key: Any) -> Any:
+    if isinstance(container, Mapping):
+        return container.get(key, 0)
+    try:
+        return container[key]
+    except (IndexError, KeyError, TypeError):
+        return 0
+
+
+_EVAL_GLOBALS = {
+    "__builtins__": {},
+    "_lookup": _lookup,
+    "_item": _item,
+    **SAFE_FUNCTIONS,
+}
+
+
+class _RewriteLookups(ast.NodeTransformer):
+    """Turn metric names and subscripts into default-0 lookups on ``_s``."""
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in SAFE_FUNCTIONS:
+            return node
+        return ast.copy_location(
+            ast.Call(
+                func=ast.Name(id="_lookup", ctx=ast.Load()),
+                args=[ast.Name(id="_s", ctx=ast.Load()), ast.Constant(node.id)],
+                keywords=[],
+            ),
+            node,
+        )
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        self.generic_visit(node)
+        return ast.copy_location(
+            ast.Call(
+                func=ast.Name(id="_item", ctx=ast.Load()),
+                args=[node.value, node.slice],
+                keywords=[],
+            ),
+            node,
+        )
+
+
+def parse_expression(expression: str) -> ast.expr:
+    """Parse and validate an expression, returning its (unrewritten) AST body."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise RuleExpressionError(f"Invalid rule expression {expression!r}: {e.msg}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleExpressionError(
+                f"Unsupported syntax in rule expression {expression!r}: "
+                f"{type(node).__name__}"
+            )
+        if isinstance(node, ast.Name) and node.id.startswith("_"):
+            raise RuleExpressionError(
+                f"Private names are not allowed in rule expressions: {node.id}"
+            )
+        if isinstance(node, ast.Call) and not (
+            isinstance(node.func, ast.Name)
+            and node.func.id in SAFE_FUNCTIONS
+            and not node.keywords
+        ):
+            raise RuleExpressionError(
+                f"Only {', '.join(sorted(SAFE_FUNCTIONS))} may be called in rule expressions"
+            )
+    return tree.body
+
+
+def _value_expression(body: ast.expr) -> ast.expr:
+    """The "current value" of a rule: left operand of its first comparison."""
+    for node in ast.walk(body):
+        if isinstance(node, ast.Compare):
+            return copy.deepcopy(node.left)
+    return copy.deepcopy(body)
+
+
+def legacy_expression(condition: str, operator: str, threshold: float) -> str:
+    """Translate a condition/operator/threshold rule into an expression."""
+    metric = LEGACY_CONDITION_METRICS.get(condition)
+    symbol = LEGACY_OPERATORS.get(operator)
+    if metric is None or symbol is None:
+        return "False"
+    return f"{metric} {symbol} {threshold!r}"
+
+
+@dataclass(frozen=True)
+class RuleResult:
+    """Outcome of evaluating one rule against one snapshot"""
+
+    name: str
+    triggered: bool
+    value: float
+    # Set when the rule raised during evaluation; it then never triggers
+    error: str | None = None
+
+
+class RuleSet:
+    """A batch of named rule expressions compiled into one code object."""
+
+    def __init__(self, rules: Iterable[tuple[str, str]]):
+        self.names: list[str] = []
+        self.expressions: list[str] = []
+        pairs = []
+        for name, expression in rules:
+            body = parse_expression(expression)
+            pairs.append(ast.Tuple(elts=[body, _value_expression(body)], ctx=ast.Load()))
+            self.names.append(name)
+            self.expressions.append(expression)
+
+        # Fallback used only when the combined pass raises
+        self._rule_codes = [
+            _compile(copy.deepcopy(pair), f"<alert-rule {name}>")
+            for name, pair in zip(self.names, pairs)
+        ]
+        self._code = _compile(ast.Tuple(elts=pairs, ctx=ast.Load()), "<alert-rules>")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def evaluate(self, snapshot: Mapping[str, Any]) -> list[RuleResult]:
+        """Evaluate every rule against a metrics snapshot in one pass."""
+        try:
+            outcomes = eval(self._code, _EVAL_GLOBALS, {"_s": snapshot})
+        except Exception:
+            return self._evaluate_each(snapshot)
+        return [
+            RuleResult(name, bool(triggered), _as_number(value))
+            for name, (triggered, value) in zip(self.names, outcomes)
+        ]
+
+    def evaluate_series(
+        self, snapshots: Iterable[Mapping[str, Any]]
+    ) -> list[list[RuleResult]]:
+        """Evaluate every rule against each snapshot of a historical series."""
+        return [self.evaluate(snapshot) for snapshot in snapshots]
+
+    def _evaluate_each(self, snapshot: Mapping[str, Any]) -> list[RuleResult]:
+        """Evaluate rules one at a time so a failing rule does not hide the rest."""
+        results = []
+        for name, code in zip(self.names, self._rule_codes):
+            try:
+                triggered, value = eval(code, _EVAL_GLOBALS, {"_s": snapshot})
+            except Exception as e:
+                results.append(RuleResult(name, False, 0.0, f"{type(e).__name__}: {e}"))
+                continue
+            results.append(RuleResult(name, bool(triggered), _as_number(value)))
+        return results
+
+
+def _compile(body: ast.expr, filename: str) -> Any:
+    tree = _RewriteLookups().visit(ast.Expression(body=body))
+    ast.fix_missing_locations(tree)
+    return compile(tree, filename, "eval")
+
+
+def _as_number(value: Any) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
@@ -4,6 +4,8 @@ Enhanced Compliance Alert System
 
 This script provides comprehensive alerting capabilities for compliance monitoring:
 - Multi-channel alert delivery (email, Slack, webhook, file)
+- Concurrent delivery with timeouts, retries and a persistent outbox
+- Compiled rule expressions evaluated in one pass, with backtesting
 - Intelligent alert throttling and deduplication
 - Escalation policies for critical issues
 - Alert history and resolution tracking
@@ -14,6 +16,9 @@ Usage:
     python compliance_alert_system.py --send-test-alert
     python compliance_alert_system.py --setup-notifications
     python compliance_alert_system.py --alert-history
+    python compliance_alert_system.py --drain-outbox
+    python compliance_alert_system.py --delivery-metrics 7
+    python compliance_alert_system.py --backtest 90
 """
 
 import argparse
@@ -31,6 +36,23 @@ from typing import Any
 
 import requests
 
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.compliance.alert_delivery import (
+    AlertDeliveryEngine,
+    DeliveryPolicy,
+    run_blocking,
+)
+from AgentQMS.agent_tools.compliance.alert_rules import (
+    RuleExpressionError,
+    RuleSet,
+    legacy_expression,
+    parse_expression,
+)
+from AgentQMS.agent_tools.utils.event_log import EventLog, migrate_json_array
+
 
 @dataclass
 class AlertRule:
@@ -44,6 +66,14 @@ class AlertRule:
     channels: list[str]  # ['email', 'slack', 'webhook', 'file']
     enabled: bool = True
     cooldown_minutes: int = 60  # Prevent spam
+    # e.g. "compliance_rate < 0.8 and trend_7day < -0.05"; overrides condition
+    expression: str | None = None
+
+    def to_expression(self) -> str:
+        """Return the rule as an expression for the rule engine"""
+        if self.expression:
+            return self.expression
+        return legacy_expression(self.condition, self.operator, self.threshold)
 
 
 @dataclass
@@ -73,11 +103,25 @@ class ComplianceAlertSystem:
         self.config_file = config_file
         self.db_path = db_path
         self.config = self._load_config()
-        self.alert_rules = self._load_alert_rules()
+        # Rules whose expression does not compile, by name -> error message
+        self.invalid_rules: dict[str, str] = {}
+        # Rules that raised while being evaluated, by name -> last error
+        self.rule_errors: dict[str, str] = {}
+        self.alert_rules = self._compile_rules(self._load_alert_rules())
+        self.rule_set = RuleSet(
+            (rule.name, rule.to_expression()) for rule in self.alert_rules
+        )
+        self.alert_log = self._open_alert_log()
 
         # Initialize database
         self._init_alert_database()
 
+        self.delivery_engine = AlertDeliveryEngine(
+            self.db_path,
+            self._deliver_payload,
+            DeliveryPolicy.from_config(self.config["delivery"]),
+        )
+
     def _load_config(self) -> dict[str, Any]:
         """Load alert system configuration"""
         default_config = {
@@ -85,6 +129,7 @@ class ComplianceAlertSystem:
                 "enabled": False,
                 "smtp_server": "smtp.gmail.com",
                 "smtp_port": 587,
+                "use_tls": True,
                 "username": "",
                 "password": "",
                 "from_email": "",
@@ -99,14 +144,23 @@ class ComplianceAlertSystem:
             "webhook": {"enabled": False, "url": "", "headers": {}, "timeout": 30},
             "file": {
                 "enabled": True,
-                "path": "compliance_alerts.json",
+                "path": "compliance_alerts.jsonl",
                 "max_alerts": 1000,
+                "max_bytes": 1048576,
             },
             "throttling": {
                 "enabled": True,
                 "max_alerts_per_hour": 10,
                 "cooldown_minutes": 60,
             },
+            "delivery": {
+                "timeout_seconds": 30,
+                "channel_timeouts": {"file": 5},
+                "max_attempts": 3,
+                "backoff_base_seconds": 0.5,
+                "backoff_max_seconds": 30,
+                "max_outbox_attempts": 10,
+            },
         }
 
         if os.path.exists(self.config_file):
@@ -177,11 +231,31 @@ class ComplianceAlertSystem:
         if "alert_rules" in self.config:
             custom_rules = []
             for rule_data in self.config["alert_rules"]:
+                if "expression" in rule_data:
+                    rule_data = {
+                        "condition": "expression",
+                        "operator": "expression",
+                        "threshold": 0.0,
+                        **rule_data,
+                    }
                 custom_rules.append(AlertRule(**rule_data))
             return custom_rules
 
         return default_rules
 
+    def _compile_rules(self, rules: list[AlertRule]) -> list[AlertRule]:
+        """Drop rules whose expression is invalid so the others keep working"""
+        valid = []
+        for rule in rules:
+            try:
+                parse_expression(rule.to_expression())
+            except RuleExpressionError as e:
+                print(f"Warning: Skipping alert rule {rule.name!r}: {e}")
+                self.invalid_rules[rule.name] = str(e)
+                continue
+            valid.append(rule)
+        return valid
+
     def _init_alert_database(self):
         """Initialize alert-specific database tables"""
         conn = sqlite3.connect(self.db_path)
@@ -224,52 +298,97 @@ class ComplianceAlertSystem:
         """Check compliance data against alert rules and generate alerts"""
         alerts = []
 
-        for rule in self.alert_rules:
-            if not rule.enabled:
-                continue
+        # All rules are evaluated against the snapshot in one pass
+        results = self.rule_set.evaluate(compliance_data)
 
-            # Check if rule should trigger
-            should_alert, current_value = self._evaluate_rule(rule, compliance_data)
+        for rule, result in zip(self.alert_rules, results):
+            if result.error:
+                print(f"Warning: Alert rule {rule.name!r} failed to evaluate: {result.error}")
+                self.rule_errors[rule.name] = result.error
+            if not rule.enabled or not result.triggered:
+                continue
 
-            if should_alert:
-                # Check throttling/cooldown
-                if self._is_alert_throttled(rule):
-                    continue
+            # Check throttling/cooldown
+            if self._is_alert_throttled(rule):
+                continue
 
-                # Create alert
-                alert = self._create_alert(rule, current_value, compliance_data)
-                alerts.append(alert)
+            # Create alert
+            alert = self._create_alert(rule, result.value, compliance_data)
+            alerts.append(alert)
 
         return alerts
 
-    def _evaluate_rule(
-        self, rule: AlertRule, data: dict[str, Any]
-    ) -> tuple[bool, float]:
-        """Evaluate if an alert rule should trigger"""
-        current_value = 0.0
+    def backtest_rules(self, days: int = 90) -> dict[str, list[dict[str, Any]]]:
+        """Replay alert rules over stored daily reports
 
-        if rule.condition == "compliance_rate":
-            current_value = data.get("compliance_rate", 0.0)
-        elif rule.condition == "total_issues":
-            current_value = data.get("total_issues", 0)
-        elif rule.condition == "trend_decline":
-            current_value = data.get("trend_7day", 0.0)
-        else:
-            return False, 0.0
-
-        # Evaluate condition
-        if rule.operator == "lt":
-            return current_value < rule.threshold, current_value
-        elif rule.operator == "gt":
-            return current_value > rule.threshold, current_value
-        elif rule.operator == "eq":
-            return current_value == rule.threshold, current_value
-        elif rule.operator == "gte":
-            return current_value >= rule.threshold, current_value
-        elif rule.operator == "lte":
-            return current_value <= rule.threshold, current_value
-
-        return False, current_value
+        Returns, per rule, the report dates on which it would have fired.
+        Reports on which a rule raised are listed as ``{"date", "error"}``
+        entries, and rules skipped for an invalid expression with a single
+        ``{"error": ...}`` entry. Cooldowns are ignored since reports are at
+        most daily.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                SELECT date, total_files, compliant_files, total_issues,
+                       compliance_rate, issues_by_type, files_by_directory,
+                       trend_7day, trend_30day, auto_fixes_applied,
+                       manual_fixes_needed
+                FROM daily_reports
+                WHERE date >= date('now', ?)
+                ORDER BY date
+            """,
+                (f"-{int(days)} days",),
+            )
+            rows = cursor.fetchall()
+        except sqlite3.OperationalError:
+            # No daily reports recorded in this database yet
+            rows = []
+        conn.close()
+
+        columns = [
+            "date",
+            "total_files",
+            "compliant_files",
+            "total_issues",
+            "compliance_rate",
+            "issues_by_type",
+            "files_by_directory",
+            "trend_7day",
+            "trend_30day",
+            "auto_fixes_applied",
+            "manual_fixes_needed",
+        ]
+        snapshots = []
+        for row in rows:
+            snapshot = dict(zip(columns, row))
+            for key in ("issues_by_type", "files_by_directory"):
+                snapshot[key] = json.loads(snapshot[key]) if snapshot[key] else {}
+            snapshots.append(snapshot)
+
+        fired: dict[str, list[dict[str, Any]]] = {
+            rule.name: [] for rule in self.alert_rules if rule.enabled
+        }
+        for snapshot, results in zip(
+            snapshots, self.rule_set.evaluate_series(snapshots)
+        ):
+            for rule, result in zip(self.alert_rules, results):
+                if rule.enabled and result.error:
+                    self.rule_errors[rule.name] = result.error
+                    fired[rule.name].append(
+                        {"date": snapshot["date"], "error": result.error}
+                    )
+                elif rule.enabled and result.triggered:
+                    fired[rule.name].append(
+                        {"date": snapshot["date"], "value": result.value}
+                    )
+        for name, error in self.invalid_rules.items():
+            fired[name] = [{"error": error}]
+
+        return fired
 
     def _is_alert_throttled(self, rule: AlertRule) -> bool:
         """Check if alert is throttled due to cooldown"""
@@ -322,7 +441,9 @@ class ComplianceAlertSystem:
 
         emoji = severity_emoji.get(rule.severity, "📢")
 
-        if rule.condition == "compliance_rate":
+        if rule.expression:
+            return f"{emoji} Alert: {rule.name} triggered ({rule.expression}; value {current_value})"
+        elif rule.condition == "compliance_rate":
             return f"{emoji} Compliance Alert: Rate is {current_value:.1%} (threshold: {rule.threshold:.1%})"
         elif rule.condition == "total_issues":
             return f"{emoji} Issue Alert: {current_value} issues found (threshold: {rule.threshold})"
@@ -335,6 +456,12 @@ class ComplianceAlertSystem:
         self, alert: Alert, channels: list[str] | None = None
     ) -> dict[str, bool]:
         """Send alert through specified channels"""
+        return run_blocking(self.send_alert_async(alert, channels), "send_alert_async")
+
+    async def send_alert_async(
+        self, alert: Alert, channels: list[str] | None = None
+    ) -> dict[str, bool]:
+        """Send alert through all channels concurrently"""
         if channels is None:
             # Find channels from rule
             rule = next(
@@ -347,40 +474,62 @@ class ComplianceAlertSystem:
 
         results = {}
 
-        for channel in channels:
-            try:
-                success = self._send_to_channel(alert, channel)
-                results[channel] = success
+        # Disabled channels never succeed, so don't queue or retry them
+        active = []
+        for channel in dict.fromkeys(channels):
+            if self._is_channel_enabled(channel):
+                active.append(channel)
+            else:
+                results[channel] = False
+                self._log_delivery(alert.id, channel, False, "channel disabled")
 
-                if success:
-                    alert.channels_sent.append(channel)
+        outcomes = await self.delivery_engine.deliver_async(
+            alert.id, asdict(alert), active
+        )
+        for channel, (success, error) in outcomes.items():
+            results[channel] = success
 
-                # Log delivery attempt
-                self._log_delivery(alert.id, channel, success)
+            if success:
+                alert.channels_sent.append(channel)
 
-            except Exception as e:
-                results[channel] = False
-                self._log_delivery(alert.id, channel, False, str(e))
+            # Log delivery outcome
+            self._log_delivery(alert.id, channel, success, error)
 
         # Store alert in database
         self._store_alert(alert)
 
         return results
 
-    def _send_to_channel(self, alert: Alert, channel: str) -> bool:
-        """Send alert to specific channel"""
+    def drain_outbox(self, limit: int = 100) -> dict[str, int]:
+        """Retry alerts left undelivered by earlier runs"""
+        return self.delivery_engine.drain(limit)
+
+    def _is_channel_enabled(self, channel: str) -> bool:
+        """Check whether a channel is configured for delivery"""
+        if channel == "file":
+            return self.config["file"].get("enabled", True)
+        if channel in ("email", "slack", "webhook"):
+            return self.config[channel]["enabled"]
+        return False
+
+    def _deliver_payload(
+        self, payload: dict[str, Any], channel: str, timeout: float
+    ) -> bool:
+        """Delivery engine entry point; raises on failure so errors are recorded"""
+        alert = Alert(**payload)
         if channel == "email":
-            return self._send_email(alert)
+            return self._send_email(alert, timeout, raise_errors=True)
         elif channel == "slack":
-            return self._send_slack(alert)
+            return self._send_slack(alert, timeout, raise_errors=True)
         elif channel == "webhook":
-            return self._send_webhook(alert)
+            return self._send_webhook(alert, timeout, raise_errors=True)
         elif channel == "file":
             return self._send_to_file(alert)
-        else:
-            return False
+        raise ValueError(f"Unknown alert channel: {channel}")
 
-    def _send_email(self, alert: Alert) -> bool:
+    def _send_email(
+        self, alert: Alert, timeout: float = 30, raise_errors: bool = False
+    ) -> bool:
         """Send alert via email"""
         if not self.config["email"]["enabled"]:
             return False
@@ -408,22 +557,33 @@ Please review the compliance status and take appropriate action.
             msg.attach(MIMEText(body, "plain"))
 
             server = smtplib.SMTP(
-                self.config["email"]["smtp_server"], self.config["email"]["smtp_port"]
-            )
-            server.starttls()
-            server.login(
-                self.config["email"]["username"], self.config["email"]["password"]
+                self.config["email"]["smtp_server"],
+                self.config["email"]["smtp_port"],
+                timeout=timeout,
             )
-            server.send_message(msg)
-            server.quit()
+            try:
+                if self.config["email"].get("use_tls", True):
+                    server.starttls()
+                if self.config["email"]["username"]:
+                    server.login(
+                        self.config["email"]["username"],
+                        self.config["email"]["password"],
+                    )
+                server.send_message(msg)
+            finally:
+                server.quit()
 
             return True
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Email send failed: {e}")
             return False
 
-    def _send_slack(self, alert: Alert) -> bool:
+    def _send_slack(
+        self, alert: Alert, timeout: float = 30, raise_errors: bool = False
+    ) -> bool:
         """Send alert via Slack webhook"""
         if not self.config["slack"]["enabled"]:
             return False
@@ -473,16 +633,22 @@ Please review the compliance status and take appropriate action.
             }
 
             response = requests.post(
-                self.config["slack"]["webhook_url"], json=payload, timeout=30
+                self.config["slack"]["webhook_url"], json=payload, timeout=timeout
             )
 
+            if response.status_code != 200 and raise_errors:
+                raise RuntimeError(f"Slack returned HTTP {response.status_code}")
             return response.status_code == 200
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Slack send failed: {e}")
             return False
 
-    def _send_webhook(self, alert: Alert) -> bool:
+    def _send_webhook(
+        self, alert: Alert, timeout: float | None = None, raise_errors: bool = False
+    ) -> bool:
         """Send alert via webhook"""
         if not self.config["webhook"]["enabled"]:
             return False
@@ -502,41 +668,43 @@ Please review the compliance status and take appropriate action.
                 self.config["webhook"]["url"],
                 json=payload,
                 headers=self.config["webhook"]["headers"],
-                timeout=self.config["webhook"]["timeout"],
+                timeout=timeout or self.config["webhook"]["timeout"],
             )
 
+            if response.status_code not in [200, 201, 202] and raise_errors:
+                raise RuntimeError(f"Webhook returned HTTP {response.status_code}")
             return response.status_code in [200, 201, 202]
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Webhook send failed: {e}")
             return False
 
+    def _open_alert_log(self) -> EventLog:
+        """Open the JSONL alert log, converting a legacy JSON array file once"""
+        file_config = self.config["file"]
+        alert_file = Path(file_config["path"])
+        # The history used to default to compliance_alerts.json; whichever
+        # name is configured, pick up a sibling legacy array file once
+        # (migrate_json_array renames it to *.migrated afterwards)
+        legacy_file = alert_file.with_suffix(".json")
+        if alert_file.suffix == ".json":
+            alert_file = alert_file.with_suffix(".jsonl")
+
+        alert_log = EventLog(
+            alert_file,
+            max_bytes=file_config.get("max_bytes", 1048576),
+            retain_records=file_config["max_alerts"],
+        )
+        migrate_json_array(legacy_file, alert_log)
+        return alert_log
+
     def _send_to_file(self, alert: Alert) -> bool:
         """Send alert to file"""
         try:
-            alert_file = Path(self.config["file"]["path"])
-
-            # Load existing alerts
-            alerts_data = []
-            if alert_file.exists():
-                try:
-                    with open(alert_file) as f:
-                        alerts_data = json.load(f)
-                except Exception:
-                    alerts_data = []
-
-            # Add new alert
-            alerts_data.append(asdict(alert))
-
-            # Keep only max alerts
-            max_alerts = self.config["file"]["max_alerts"]
-            if len(alerts_data) > max_alerts:
-                alerts_data = alerts_data[-max_alerts:]
-
-            # Write back
-            with open(alert_file, "w") as f:
-                json.dump(alerts_data, f, indent=2)
-
+            # Append-only; the log trims to max_alerts when it rotates
+            self.alert_log.append(asdict(alert))
             return True
 
         except Exception as e:
@@ -727,6 +895,17 @@ def main():
         "--alert-history", type=int, help="Show alert history for N days"
     )
     parser.add_argument("--resolve-alert", help="Resolve alert by ID")
+    parser.add_argument(
+        "--drain-outbox",
+        action="store_true",
+        help="Retry alerts left undelivered in the outbox",
+    )
+    parser.add_argument(
+        "--delivery-metrics", type=int, help="Show delivery latency for N days"
+    )
+    parser.add_argument(
+        "--backtest", type=int, help="Replay alert rules over the last N days"
+    )
     parser.add_argument("--config", default="alert_config.json", help="Config file")
     parser.add_argument(
         "--db-path", default="compliance_monitoring.db", help="Database file path"
@@ -759,6 +938,47 @@ def main():
         alert_system.resolve_alert(args.resolve_alert)
         print(f"✅ Alert {args.resolve_alert} resolved")
 
+    elif args.drain_outbox:
+        result = alert_system.drain_outbox()
+        print(f"📤 Outbox drain: {result['delivered']}/{result['attempted']} delivered")
+        for status, count in sorted(
+            alert_system.delivery_engine.get_outbox_counts().items()
+        ):
+            print(f"  {status}: {count}")
+
+    elif args.delivery_metrics:
+        metrics = alert_system.delivery_engine.get_latency_metrics(
+            args.delivery_metrics
+        )
+        print(f"\n⏱️  Delivery Latency ({args.delivery_metrics} days)")
+        print("-" * 50)
+        for channel, stats in sorted(metrics.items()):
+            print(
+                f"{channel:8} attempts={stats['attempts']:<5} "
+                f"success={stats['success_rate']:.0%} "
+                f"p50={stats['p50_ms']:.0f}ms p95={stats['p95_ms']:.0f}ms "
+                f"max={stats['max_ms']:.0f}ms"
+            )
+
+    elif args.backtest:
+        fired = alert_system.backtest_rules(args.backtest)
+        print(f"\n🧪 Alert Rule Backtest ({args.backtest} days)")
+        print("-" * 50)
+        for rule_name, hits in fired.items():
+            if hits and "date" not in hits[0]:
+                print(f"❌ {rule_name}: {hits[0]['error']}")
+                continue
+            failed = [hit for hit in hits if "error" in hit]
+            hits = [hit for hit in hits if "error" not in hit]
+            print(f"{rule_name}: fired on {len(hits)} day(s)")
+            if failed:
+                print(
+                    f"  ⚠️  failed to evaluate on {len(failed)} day(s): "
+                    f"{failed[-1]['error']}"
+                )
+            for hit in hits[-5:]:
+                print(f"  {hit['date']}: {hit['value']}")
+
     else:
         parser.print_help()
 
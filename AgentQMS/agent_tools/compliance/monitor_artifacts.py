@@ -13,7 +13,6 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -23,6 +22,7 @@ from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
 ensure_project_root_on_sys_path()
 
 from AgentQMS.agent_tools.compliance.validate_artifacts import ArtifactValidator
+from AgentQMS.agent_tools.utils.event_log import EventLog, migrate_json_array
 
 
 class ArtifactMonitor:
@@ -31,7 +31,15 @@ class ArtifactMonitor:
     def __init__(self, artifacts_root: str = "docs/artifacts"):
         self.artifacts_root = Path(artifacts_root)
         self.validator = ArtifactValidator(str(artifacts_root))
-        self.violations_history_file = Path("artifacts_violations_history.json")
+        self.violations_history_file = Path("artifacts_violations_history.jsonl")
+        self.violations_history = EventLog(
+            self.violations_history_file,
+            max_bytes=256 * 1024,
+            retain_age=timedelta(days=30),
+        )
+        migrate_json_array(
+            self.violations_history_file.with_suffix(".json"), self.violations_history
+        )
 
     def check_organization_compliance(self) -> dict:
         """Check overall organization compliance."""
@@ -157,17 +165,8 @@ class ArtifactMonitor:
 
     def save_violations_history(self, report: dict) -> None:
         """Save violations history for trend analysis."""
-        history = []
-
-        if self.violations_history_file.exists():
-            try:
-                with open(self.violations_history_file) as f:
-                    history = json.load(f)
-            except Exception:
-                history = []
-
-        # Add current report
-        history.append(
+        # Append-only; entries older than 30 days are dropped on rotation
+        self.violations_history.append(
             {
                 "timestamp": report["timestamp"],
                 "compliance_rate": report["compliance_rate"],
@@ -180,25 +179,13 @@ class ArtifactMonitor:
             }
         )
 
-        # Keep only last 30 days
-        cutoff_date = datetime.now() - timedelta(days=30)
-        history = [
-            entry
-            for entry in history
-            if datetime.fromisoformat(entry["timestamp"]) > cutoff_date
-        ]
-
-        with open(self.violations_history_file, "w") as f:
-            json.dump(history, f, indent=2)
-
     def generate_trend_analysis(self) -> str:
         """Generate trend analysis from violations history."""
-        if not self.violations_history_file.exists():
+        if not self.violations_history.segments():
             return "No historical data available for trend analysis."
 
         try:
-            with open(self.violations_history_file) as f:
-                history = json.load(f)
+            history = self.violations_history.tail(2)
         except Exception:
             return "Error reading historical data."
 
@@ -27,12 +27,7 @@ from AgentQMS.agent_tools.compliance.validate_boundaries import BoundaryValidato
 
 # Try to import context bundle functions for validation
 try:
-    from AgentQMS.agent_tools.core.context_bundle import (
-        is_fresh,
-        list_available_bundles,
-        load_bundle_definition,
-        validate_bundle_files,
-    )
+    from AgentQMS.agent_tools.core.context_bundle import get_bundle_cache
 
     CONTEXT_BUNDLES_AVAILABLE = True
 except ImportError:
@@ -355,7 +350,8 @@ class ArtifactValidator:
         results = []
 
         try:
-            available_bundles = list_available_bundles()
+            bundle_cache = get_bundle_cache()
+            available_bundles = bundle_cache.names()
 
             for bundle_name in available_bundles:
                 bundle_result = {
@@ -366,42 +362,21 @@ class ArtifactValidator:
                 }
 
                 try:
-                    # Load bundle definition
-                    bundle_def = load_bundle_definition(bundle_name)
-
-                    # Validate bundle files
-                    validate_bundle_files(bundle_def)
-
-                    # Check for missing files
-                    project_root = Path(__file__).parent.parent.parent
-                    tiers = bundle_def.get("tiers", {})
-
-                    for tier_key, tier in tiers.items():
-                        tier_files = tier.get("files", [])
-                        for file_spec in tier_files:
-                            if isinstance(file_spec, str):
-                                file_path_str = file_spec
-                            elif isinstance(file_spec, dict):
-                                file_path_str = file_spec.get("path", "")
-                            else:
-                                continue
-
-                            # Skip glob patterns (handled by validate_bundle_files)
-                            if "*" in file_path_str or "**" in file_path_str:
-                                continue
-
-                            # Check if file exists
-                            file_path = project_root / file_path_str
-                            if not file_path.exists():
-                                bundle_result["valid"] = False
-                                bundle_result["errors"].append(
-                                    f"Missing file in {bundle_name} bundle: {file_path_str}"
-                                )
-                            elif not is_fresh(file_path, days=30):
-                                bundle_result["warnings"].append(
-                                    f"Stale file in {bundle_name} bundle: {file_path_str} "
-                                    "(not modified in last 30 days)"
-                                )
+                    # Compiled once; reused until the bundle's inputs change
+                    bundle = bundle_cache.get(bundle_name)
+
+                    # Glob patterns only ever expand to existing files
+                    for entry in bundle.fixed_entries():
+                        if not entry.exists:
+                            bundle_result["valid"] = False
+                            bundle_result["errors"].append(
+                                f"Missing file in {bundle_name} bundle: {entry.spec}"
+                            )
+                        elif not entry.is_fresh(days=30):
+                            bundle_result["warnings"].append(
+                                f"Stale file in {bundle_name} bundle: {entry.spec} "
+                                "(not modified in last 30 days)"
+                            )
 
                 except FileNotFoundError:
                     bundle_result["valid"] = False
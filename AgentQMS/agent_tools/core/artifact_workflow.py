@@ -45,11 +45,7 @@ _assert_clean_boundaries()
 
 # Try to import context bundle functions for hooks
 try:
-    from AgentQMS.agent_tools.core.context_bundle import (
-        list_available_bundles,
-        load_bundle_definition,
-        validate_bundle_files,
-    )
+    from AgentQMS.agent_tools.core.context_bundle import get_bundle_cache
 
     CONTEXT_BUNDLES_AVAILABLE = True
 except ImportError:
@@ -221,34 +217,19 @@ class ArtifactWorkflow:
             return  # Silent skip if bundle system not available
 
         try:
-            artifact_path_obj = Path(artifact_path)
-
-            # Check if any bundles reference this artifact or its directory
-            available_bundles = list_available_bundles()
+            bundle_cache = get_bundle_cache()
 
-            if not available_bundles:
-                return
+            # Drop compiled bundles whose globs or paths cover the new file
+            bundle_cache.invalidate(Path(artifact_path).resolve())
 
             # Log that artifact was created (for potential bundle inclusion)
             # Note: Bundle definitions are manually curated, so we just log
             # This hook can be extended later to suggest bundle updates
 
             # Check if artifact is already in any bundle
-            for bundle_name in available_bundles:
-                try:
-                    bundle_def = load_bundle_definition(bundle_name)
-                    bundle_files = validate_bundle_files(bundle_def)
-
-                    # Check if artifact matches any bundle file pattern
-                    artifact_relative = artifact_path_obj.relative_to(
-                        self.artifacts_root.parent.parent
-                    )
-                    if str(artifact_relative) in bundle_files:
-                        # Artifact is already in a bundle - all good
-                        return
-                except Exception:
-                    # Skip bundles that can't be loaded
-                    continue
+            if bundle_cache.bundles_containing(Path(artifact_path).resolve()):
+                # Artifact is already in a bundle - all good
+                return
 
             # Artifact not in any bundle - this is expected for most artifacts
             # Only log at debug level or when explicitly requested
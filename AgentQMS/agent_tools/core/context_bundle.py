@@ -5,6 +5,13 @@ Context Bundle Generator Core
 Generates task-specific context bundles from YAML definitions.
 Supports automatic task type detection, glob patterns, and freshness checking.
 
+Bundles are compiled once into a file list with a stat fingerprint and
+kept in a ``BundleCache`` (in memory and under ``.agentqms/cache/``). A
+compiled bundle stays valid until its YAML, one of the directories its
+globs and paths live in, or git HEAD changes, so repeated lookups from
+``get_context.py``, the artifact validator and the workflow hook skip the
+YAML parse, glob expansion and per-file stats.
+
 Usage:
     from core.context_bundle import get_context_bundle
 
@@ -13,10 +20,21 @@ Usage:
 
     # Explicit task type
     files = get_context_bundle("fix bug", task_type="debugging")
+
+    # Fit the bundle into a token budget (excerpting files that don't fit)
+    packed = pack_context_bundle("fix bug", token_budget=8000, excerpts=True)
 """
 
+from __future__ import annotations
+
+import copy
 import glob
+import json
+import os
+import re
 import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -29,6 +47,12 @@ except ImportError:
     sys.exit(1)
 
 
+from AgentQMS.agent_tools.core.task_classifier import (  # noqa: F401 - re-exported
+    TASK_KEYWORDS,
+    get_task_classifier,
+)
+from AgentQMS.agent_tools.utils.content_cache import ContentHashCache, content_hash
+from AgentQMS.agent_tools.utils.git_freshness import get_freshness_provider
 from AgentQMS.agent_tools.utils.paths import get_docs_dir, get_project_root
 from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
 
@@ -38,63 +62,10 @@ PROJECT_ROOT = get_project_root()
 # Default bundle directory
 BUNDLES_DIR = get_docs_dir() / "context_bundles"
 
-# Task type keywords for automatic classification
-TASK_KEYWORDS = {
-    "development": [
-        "implement",
-        "code",
-        "develop",
-        "feature",
-        "function",
-        "class",
-        "module",
-        "refactor",
-        "rewrite",
-        "build",
-        "create",
-        "add",
-        "fix bug",
-        "bug fix",
-    ],
-    "documentation": [
-        "document",
-        "doc",
-        "write docs",
-        "readme",
-        "guide",
-        "manual",
-        "tutorial",
-        "update docs",
-        "documentation",
-    ],
-    "debugging": [
-        "debug",
-        "troubleshoot",
-        "error",
-        "fix",
-        "broken",
-        "issue",
-        "problem",
-        "crash",
-        "exception",
-        "traceback",
-        "log",
-        "investigate",
-    ],
-    "planning": [
-        "plan",
-        "design",
-        "architecture",
-        "blueprint",
-        "strategy",
-        "assess",
-        "evaluate",
-        "analysis",
-        "proposal",
-        "roadmap",
-    ],
-}
-
+# Bump when the compiled bundle layout changes
+BUNDLE_CACHE_VERSION = "1"
+FRESHNESS_DAYS = 30
+_SECONDS_PER_DAY = 24 * 60 * 60
 
 def analyze_task_type(description: str) -> str:
     """
@@ -106,20 +77,20 @@ def analyze_task_type(description: str) -> str:
     Returns:
         Task type: 'development', 'documentation', 'debugging', 'planning', or 'general'
     """
-    description_lower = description.lower()
+    return get_task_classifier().classify(description)
+
 
-    # Count keyword matches for each task type
-    scores = {}
-    for task_type, keywords in TASK_KEYWORDS.items():
-        score = sum(1 for keyword in keywords if keyword in description_lower)
-        if score > 0:
-            scores[task_type] = score
+def _stat_key(path: Path | str) -> list[int] | None:
+    """Return ``[mtime_ns, size]`` for *path*, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
 
-    # Return task type with highest score, or 'general' if no matches
-    if scores:
-        return max(scores.items(), key=lambda x: x[1])[0]
 
-    return "general"
+# Parsed bundle YAML keyed by path, reused while the file's stat is unchanged
+_DEFINITIONS: dict[Path, tuple[list[int], dict[str, Any]]] = {}
 
 
 def load_bundle_definition(bundle_name: str) -> dict[str, Any]:
@@ -136,23 +107,37 @@ def load_bundle_definition(bundle_name: str) -> dict[str, Any]:
         FileNotFoundError: If bundle file doesn't exist
         yaml.YAMLError: If YAML is invalid
     """
-    bundle_path = BUNDLES_DIR / f"{bundle_name}.yaml"
+    return copy.deepcopy(_load_definition(BUNDLES_DIR, bundle_name))
 
-    if not bundle_path.exists():
-        available = ", ".join([f.stem for f in BUNDLES_DIR.glob("*.yaml")])
+
+def _load_definition(bundles_dir: Path, bundle_name: str) -> dict[str, Any]:
+    bundle_path = bundles_dir / f"{bundle_name}.yaml"
+    source = _stat_key(bundle_path)
+
+    if source is None:
+        available = ", ".join([f.stem for f in bundles_dir.glob("*.yaml")])
         raise FileNotFoundError(
             f"Bundle '{bundle_name}' not found at {bundle_path}. "
             f"Available bundles: {available}"
         )
 
+    cached = _DEFINITIONS.get(bundle_path)
+    if cached and cached[0] == source:
+        return cached[1]
+
     with bundle_path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        definition = yaml.safe_load(f) or {}
+    _DEFINITIONS[bundle_path] = (source, definition)
+    return definition
 
 
 def is_fresh(path: Path | str, days: int = 30) -> bool:
     """
     Check if file/directory was modified within specified days.
 
+    Uses the last git commit touching the file, falling back to the
+    filesystem mtime for uncommitted files or outside a git checkout.
+
     Args:
         path: File or directory path
         days: Number of days to check (default: 30)
@@ -165,15 +150,7 @@ def is_fresh(path: Path | str, days: int = 30) -> bool:
     if not path_obj.exists():
         return False
 
-    # Get modification time
-    mtime = path_obj.stat().st_mtime
-
-    # Calculate days since modification
-    import time
-
-    days_since_modification = (time.time() - mtime) / (24 * 60 * 60)
-
-    return days_since_modification <= days
+    return get_freshness_provider().is_fresh(path_obj, days)
 
 
 def expand_glob_pattern(pattern: str, max_files: int | None = None) -> list[Path]:
@@ -193,8 +170,9 @@ def expand_glob_pattern(pattern: str, max_files: int | None = None) -> list[Path
 
     matches = [Path(p) for p in glob.glob(pattern, recursive=True) if Path(p).is_file()]
 
-    # Sort by modification time (newest first)
-    matches.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    # Sort by last change (newest first)
+    freshness = get_freshness_provider()
+    matches.sort(key=lambda p: freshness.last_modified(p) or 0.0, reverse=True)
 
     if max_files:
         matches = matches[:max_files]
@@ -202,6 +180,232 @@ def expand_glob_pattern(pattern: str, max_files: int | None = None) -> list[Path
     return matches
 
 
+_GLOB_MAGIC = re.compile(r"[*?[]")
+
+
+def _spec_path(file_spec: Any) -> str | None:
+    """Return the path or glob a tier file spec refers to."""
+    if isinstance(file_spec, str):
+        return file_spec
+    if isinstance(file_spec, dict):
+        return file_spec.get("path", "")
+    return None
+
+
+def _is_glob(path_str: str) -> bool:
+    return "*" in path_str
+
+
+def _resolve_spec(path_str: str) -> Path:
+    path = Path(path_str)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def _nearest_existing_dir(path: Path) -> Path:
+    while not path.is_dir() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def _watched_dirs(pattern: Path) -> list[Path]:
+    """Directories whose listings decide what a glob pattern matches.
+
+    Creating, deleting or renaming a file changes its directory's mtime, so
+    these are enough to notice that a glob would now expand differently.
+    """
+    parts = pattern.parts
+    fixed = 0
+    while fixed < len(parts) and not _GLOB_MAGIC.search(parts[fixed]):
+        fixed += 1
+    base = Path(*parts[:fixed])
+    magic = parts[fixed:]
+    if not base.is_dir():
+        return [_nearest_existing_dir(base)]
+    depth = None if any("**" in part for part in magic) else len(magic) - 1
+
+    dirs = []
+    for dirpath, dirnames, _ in os.walk(base):
+        dirs.append(Path(dirpath))
+        # glob skips hidden directories, so changes there never matter
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        if depth is not None and len(Path(dirpath).relative_to(base).parts) >= depth:
+            dirnames[:] = []
+    return dirs
+
+
+@dataclass
+class BundleEntry:
+    """One file (or fixed path) a bundle tier may include."""
+
+    spec: str  # Path or glob as written in the bundle YAML
+    path: str  # Absolute path
+    is_glob: bool
+    exists: bool
+    last_modified: float | None
+    stat: list[int] | None
+
+    def is_fresh(self, days: int = FRESHNESS_DAYS, now: float | None = None) -> bool:
+        if not self.exists or self.last_modified is None:
+            return False
+        return ((now or time.time()) - self.last_modified) / _SECONDS_PER_DAY <= days
+
+
+@dataclass
+class CompiledTier:
+    key: str
+    max_files: int | None
+    # Glob matches newest first, in the order the tier lists its specs
+    entries: list[BundleEntry] = field(default_factory=list)
+
+
+@dataclass
+class CompiledBundle:
+    """A bundle definition resolved to concrete files plus what it depends on."""
+
+    name: str
+    tiers: list[CompiledTier] = field(default_factory=list)
+    source: list[int] | None = None  # Stat of the bundle YAML
+    head: str | None = None  # Git HEAD the freshness timestamps came from
+    dirs: dict[str, int] = field(default_factory=dict)  # Watched dir -> mtime_ns
+
+    def resolve(self, days: int = FRESHNESS_DAYS, now: float | None = None) -> list[str]:
+        """Return the bundle's file list, relative to the project root."""
+        return [
+            _relative_to_root(entry.path)
+            for tier_entries in self.resolve_tiers(days, now)
+            for entry in tier_entries
+        ]
+
+    def resolve_tiers(
+        self, days: int = FRESHNESS_DAYS, now: float | None = None
+    ) -> list[list[BundleEntry]]:
+        """Return the included entries of each tier, in tier order."""
+        now = now or time.time()
+        resolved = []
+        for tier in self.tiers:
+            tier_entries = [
+                entry
+                for entry in tier.entries
+                if entry.is_glob or entry.is_fresh(days, now)
+            ]
+            if tier.max_files and len(tier_entries) > tier.max_files:
+                tier_entries = tier_entries[: tier.max_files]
+            resolved.append(tier_entries)
+        return resolved
+
+    def fixed_entries(self) -> list[BundleEntry]:
+        """Entries named explicitly (not via a glob) in the bundle YAML."""
+        return [e for tier in self.tiers for e in tier.entries if not e.is_glob]
+
+    def fingerprint(self) -> dict[str, list[int] | None]:
+        """``path -> [mtime_ns, size]`` for every file the bundle can include."""
+        return {
+            _relative_to_root(e.path): e.stat for tier in self.tiers for e in tier.entries
+        }
+
+    def is_current(self, source: list[int] | None, head: str | None) -> bool:
+        if source != self.source or head != self.head:
+            return False
+        for dirpath, mtime_ns in self.dirs.items():
+            stat = _stat_key(dirpath)
+            if stat is None or stat[0] != mtime_ns:
+                return False
+        return True
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "source": self.source,
+            "head": self.head,
+            "dirs": self.dirs,
+            "tiers": [
+                {
+                    "key": tier.key,
+                    "max_files": tier.max_files,
+                    "entries": [entry.__dict__ for entry in tier.entries],
+                }
+                for tier in self.tiers
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> CompiledBundle:
+        return cls(
+            name=data["name"],
+            source=data["source"],
+            head=data["head"],
+            dirs=data["dirs"],
+            tiers=[
+                CompiledTier(
+                    tier["key"],
+                    tier["max_files"],
+                    [BundleEntry(**entry) for entry in tier["entries"]],
+                )
+                for tier in data["tiers"]
+            ],
+        )
+
+
+def _relative_to_root(path: str) -> str:
+    try:
+        return str(Path(path).relative_to(PROJECT_ROOT))
+    except ValueError:
+        return path
+
+
+def compile_bundle(
+    bundle_def: dict[str, Any], name: str = "", source: list[int] | None = None
+) -> CompiledBundle:
+    """Expand a bundle definition's globs and stat its files once."""
+    freshness = get_freshness_provider()
+    bundle = CompiledBundle(name=name, source=source, head=freshness.head)
+    watched: set[Path] = set()
+
+    def make_entry(spec: str, path: Path, is_glob: bool) -> BundleEntry:
+        stat = _stat_key(path)
+        return BundleEntry(
+            spec=spec,
+            path=str(path),
+            is_glob=is_glob,
+            exists=stat is not None,
+            last_modified=freshness.last_modified(path) if stat is not None else None,
+            stat=stat,
+        )
+
+    tiers = bundle_def.get("tiers") or {}
+    for tier_key in sorted(tiers.keys()):  # tier1, tier2, tier3...
+        tier = tiers[tier_key] or {}
+        compiled = CompiledTier(str(tier_key), tier.get("max_files"))
+
+        for file_spec in tier.get("files") or []:
+            file_path_str = _spec_path(file_spec)
+            if file_path_str is None:
+                continue
+            path = _resolve_spec(file_path_str)
+
+            if _is_glob(file_path_str):
+                watched.update(_watched_dirs(path))
+                matches = [
+                    make_entry(file_path_str, Path(p), True)
+                    for p in glob.glob(str(path), recursive=True)
+                    if os.path.isfile(p)
+                ]
+                # Sort by last change (newest first)
+                matches.sort(key=lambda e: e.last_modified or 0.0, reverse=True)
+                compiled.entries.extend(matches)
+            else:
+                watched.add(_nearest_existing_dir(path.parent))
+                compiled.entries.append(make_entry(file_path_str, path, False))
+
+        bundle.tiers.append(compiled)
+
+    for dirpath in watched:
+        stat = _stat_key(dirpath)
+        if stat is not None:
+            bundle.dirs[str(dirpath)] = stat[0]
+    return bundle
+
+
 def validate_bundle_files(bundle_def: dict[str, Any]) -> list[str]:
     """
     Validate bundle definition and return list of valid file paths.
@@ -212,51 +416,147 @@ def validate_bundle_files(bundle_def: dict[str, Any]) -> list[str]:
     - Glob patterns are expanded correctly
     - Tier limits are respected
 
+    Paths in the definition are relative to the project root. Prefer
+    ``get_bundle_cache().resolve(name)`` for named bundles; this compiles
+    the definition from scratch on every call.
+
     Args:
         bundle_def: Bundle definition dictionary
 
     Returns:
         List of valid file paths (as strings)
     """
-    valid_paths: list[str] = []
+    return compile_bundle(bundle_def).resolve()
 
-    tiers = bundle_def.get("tiers", {})
 
-    for tier_key in sorted(tiers.keys()):  # tier1, tier2, tier3...
-        tier = tiers[tier_key]
-        tier.get("name", tier_key)
-        max_files = tier.get("max_files")
-        files = tier.get("files", [])
-
-        tier_paths: list[Path] = []
-
-        for file_spec in files:
-            if isinstance(file_spec, str):
-                file_path_str = file_spec
-            elif isinstance(file_spec, dict):
-                file_path_str = file_spec.get("path", "")
-            else:
-                continue
-
-            # Handle glob patterns
-            if "*" in file_path_str or "**" in file_path_str:
-                expanded = expand_glob_pattern(file_path_str, max_files=None)
-                tier_paths.extend(expanded)
-            else:
-                # Regular file path
-                project_root = Path(__file__).parent.parent.parent
-                file_path = project_root / file_path_str
-
-                if file_path.exists() and is_fresh(file_path):
-                    tier_paths.append(file_path)
+class BundleCache:
+    """Compiled bundles by name, revalidated against directory mtimes.
 
-        # Apply tier limit and add to valid paths
-        if max_files and len(tier_paths) > max_files:
-            tier_paths = tier_paths[:max_files]
-
-        valid_paths.extend([str(p.relative_to(project_root)) for p in tier_paths])
+    Each lookup stats the bundle YAML and the directories the bundle's
+    paths and globs live in; only when one of them (or git HEAD) changed is
+    the bundle recompiled. Compiled bundles are persisted so one-shot CLI
+    runs benefit too. Edits that do not add, remove or rename files leave
+    directory mtimes alone; call ``invalidate()`` from code that knows a
+    file changed.
+    """
 
-    return valid_paths
+    def __init__(self, bundles_dir: Path | str | None = None, persist: bool = True):
+        self.bundles_dir = Path(bundles_dir) if bundles_dir else BUNDLES_DIR
+        self._bundles: dict[str, CompiledBundle] = {}
+        self._names: tuple[list[int] | None, list[str]] | None = None
+        self._store = (
+            ContentHashCache("context_bundles", version=BUNDLE_CACHE_VERSION)
+            if persist
+            else None
+        )
+        self.compiles = 0
+
+    def names(self) -> list[str]:
+        """List bundle names, re-listing the directory only when it changes."""
+        source = _stat_key(self.bundles_dir)
+        if self._names is None or self._names[0] != source:
+            names = []
+            if source is not None:
+                names = sorted(
+                    f.stem for f in self.bundles_dir.glob("*.yaml") if f.stem != "README"
+                )
+            self._names = (source, names)
+        return list(self._names[1])
+
+    def get(self, bundle_name: str) -> CompiledBundle:
+        """Return the compiled bundle, recompiling it only if it went stale.
+
+        Raises:
+            FileNotFoundError: If bundle definition file not found
+            yaml.YAMLError: If bundle YAML is invalid
+        """
+        source = _stat_key(self.bundles_dir / f"{bundle_name}.yaml")
+        head = get_freshness_provider().head
+
+        bundle = self._cached(bundle_name)
+        if bundle is not None and source is not None and bundle.is_current(source, head):
+            self._bundles[bundle_name] = bundle
+            return bundle
+
+        bundle = compile_bundle(
+            _load_definition(self.bundles_dir, bundle_name), bundle_name, source
+        )
+        self.compiles += 1
+        self._bundles[bundle_name] = bundle
+        if self._store is not None:
+            self._store.set(bundle_name, bundle.to_json())
+            self._store.save()
+        return bundle
+
+    def _cached(self, bundle_name: str) -> CompiledBundle | None:
+        bundle = self._bundles.get(bundle_name)
+        if bundle is None and self._store is not None:
+            data = self._store.get(bundle_name)
+            if data:
+                try:
+                    bundle = CompiledBundle.from_json(data)
+                except (KeyError, TypeError):
+                    bundle = None
+        return bundle
+
+    def resolve(self, bundle_name: str) -> list[str]:
+        return self.get(bundle_name).resolve()
+
+    def bundles_containing(self, path: Path | str) -> list[str]:
+        """Names of bundles whose resolved file list includes *path*."""
+        target = _relative_to_root(str(_resolve_spec(str(path))))
+        names = []
+        for name in self.names():
+            try:
+                if target in self.resolve(name):
+                    names.append(name)
+            except (OSError, yaml.YAMLError):
+                # Skip bundles that can't be loaded
+                continue
+        return names
+
+    def invalidate(self, path: Path | str | None = None) -> None:
+        """Drop compiled bundles affected by a change to *path* (all if None).
+
+        This is the hook for watchers and for tools that just wrote a file.
+        """
+        if path is None:
+            dropped = list(self._bundles)
+            if self._store is not None:
+                self._store.clear()
+                self._store.save()
+        else:
+            changed = _resolve_spec(str(path))
+            parents = {str(changed), str(changed.parent)}
+            dropped = []
+            for name in self.names():
+                bundle = self._cached(name)
+                if bundle is not None and (
+                    parents & bundle.dirs.keys()
+                    or any(e.path == str(changed) for t in bundle.tiers for e in t.entries)
+                ):
+                    dropped.append(name)
+            if changed.parent == self.bundles_dir:
+                dropped.append(changed.stem)
+                self._names = None
+        for name in dropped:
+            self._bundles.pop(name, None)
+            # Force recompilation even if directory mtimes look unchanged
+            if self._store is not None and name in self._store:
+                self._store.set(name, None)
+        if self._store is not None:
+            self._store.save()
+
+
+_DEFAULT_CACHE: BundleCache | None = None
+
+
+def get_bundle_cache() -> BundleCache:
+    """Return the bundle cache shared by get_context, validators and hooks."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = BundleCache()
+    return _DEFAULT_CACHE
 
 
 def get_context_bundle(
@@ -281,13 +581,195 @@ def get_context_bundle(
     if task_type is None:
         task_type = analyze_task_type(task_description)
 
-    # Load bundle definition
-    bundle_def = load_bundle_definition(task_type)
+    return get_bundle_cache().resolve(task_type)
+
+
+# Bump when estimate_tokens() or make_excerpt() change their output
+TOKENIZER_VERSION = "1"
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate a BPE tokenizer's count without loading a vocabulary.
+
+    Counts one token per word or punctuation mark, plus one for every
+    further four characters of long words, which tracks common tokenizers
+    on English prose and code to within roughly 10-15%.
+    """
+    count = 0
+    for match in _TOKEN_RE.finditer(text):
+        count += 1 + max(0, len(match.group()) - 4) // 4
+    return count
+
+
+def make_excerpt(text: str, max_tokens: int, markdown: bool = True) -> tuple[str, int]:
+    """Trim a document to its headings plus the first paragraph under each.
+
+    Blocks are kept in document order until *max_tokens* is reached. For
+    non-Markdown files every paragraph is a block, so the excerpt is the
+    head of the file.
+    Returns the excerpt and its token estimate (``("", 0)`` if nothing fits).
+    """
+    if markdown and text.startswith("---\n"):
+        end = text.find("\n---\n", 4)
+        if end != -1:
+            text = text[end + 5 :]
+
+    blocks: list[str] = []
+    paragraph: list[str] = []
+    want_paragraph = True
+    in_fence = False
+
+    def flush() -> None:
+        nonlocal want_paragraph
+        if paragraph and want_paragraph:
+            blocks.append("\n".join(paragraph))
+            want_paragraph = not markdown
+        paragraph.clear()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if markdown and not in_fence and _HEADING_RE.match(line):
+            flush()
+            blocks.append(line)
+            want_paragraph = True
+        elif not line.strip() and not in_fence:
+            flush()
+        else:
+            paragraph.append(line)
+    flush()
+
+    kept: list[str] = []
+    used = 0
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if used + tokens > max_tokens:
+            break
+        kept.append(block)
+        used += tokens
+    return "\n\n".join(kept), used
+
+
+@dataclass
+class PackedFile:
+    path: str  # Relative to the project root
+    tokens: int  # Tokens used in the pack (the excerpt's, if excerpted)
+    full_tokens: int
+    tier: str
+    excerpt: str | None = None
+
+
+@dataclass
+class PackedBundle:
+    """Files chosen to fit a token budget, in tier/freshness order."""
+
+    name: str
+    token_budget: int
+    files: list[PackedFile] = field(default_factory=list)
+    skipped: list[PackedFile] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(f.tokens for f in self.files)
+
+    def summary(self) -> str:
+        excerpts = sum(1 for f in self.files if f.excerpt is not None)
+        return (
+            f"# {self.total_tokens} / {self.token_budget} tokens "
+            f"({len(self.files)} files, {excerpts} excerpts, {len(self.skipped)} skipped)"
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "bundle": self.name,
+            "token_budget": self.token_budget,
+            "total_tokens": self.total_tokens,
+            "files": [f.__dict__ for f in self.files],
+            "skipped": [
+                {"path": f.path, "tokens": f.full_tokens, "tier": f.tier}
+                for f in self.skipped
+            ],
+        }
+
+
+def pack_bundle(
+    bundle: CompiledBundle,
+    token_budget: int,
+    excerpts: bool = False,
+    token_cache: ContentHashCache | None = None,
+) -> PackedBundle:
+    """Greedily fill *token_budget* with the bundle's files.
+
+    Tiers are taken in order and files within a tier newest first. A file
+    that does not fit is skipped (or, with *excerpts*, replaced by its
+    headings and first paragraphs if those fit) and packing continues with
+    the next, smaller candidates.
+    """
+    cache = token_cache or ContentHashCache("bundle_tokens", version=TOKENIZER_VERSION)
+    packed = PackedBundle(bundle.name, token_budget)
+    remaining = token_budget
+
+    for tier, tier_entries in zip(bundle.tiers, bundle.resolve_tiers()):
+        ordered = sorted(
+            (e for e in tier_entries if os.path.isfile(e.path)),
+            key=lambda e: e.last_modified or 0.0,
+            reverse=True,
+        )
+        for entry in ordered:
+            try:
+                text = Path(entry.path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            key = content_hash(text)
+            tokens = cache.get(key)
+            if tokens is None:
+                tokens = estimate_tokens(text)
+                cache.set(key, tokens)
+
+            item = PackedFile(_relative_to_root(entry.path), tokens, tokens, tier.key)
+            if tokens <= remaining:
+                packed.files.append(item)
+                remaining -= tokens
+                continue
+            if excerpts and remaining > 0:
+                excerpt, excerpt_tokens = make_excerpt(
+                    text, remaining, markdown=entry.path.endswith(".md")
+                )
+                if excerpt:
+                    item.tokens = excerpt_tokens
+                    item.excerpt = excerpt
+                    packed.files.append(item)
+                    remaining -= excerpt_tokens
+                    continue
+            packed.skipped.append(item)
+
+    cache.save()
+    return packed
+
+
+def pack_context_bundle(
+    task_description: str,
+    task_type: str | None = None,
+    token_budget: int = 8000,
+    excerpts: bool = False,
+) -> PackedBundle:
+    """Get a context bundle trimmed to fit *token_budget* tokens."""
+    if task_type is None:
+        task_type = analyze_task_type(task_description)
+    return pack_bundle(get_bundle_cache().get(task_type), token_budget, excerpts)
 
-    # Validate and get file paths
-    file_paths = validate_bundle_files(bundle_def)
 
-    return file_paths
+def print_packed_bundle(packed: PackedBundle, as_json: bool = False) -> None:
+    """Print a packed bundle: paths (excerpts marked) and the token total."""
+    if as_json:
+        print(json.dumps(packed.to_dict(), indent=2))
+        return
+    for item in packed.files:
+        marker = f"  # excerpt, {item.tokens}/{item.full_tokens} tokens" if item.excerpt else ""
+        print(f"{item.path}{marker}")
+    print(packed.summary())
 
 
 def print_context_bundle(task_description: str, task_type: str | None = None) -> None:
@@ -311,10 +793,7 @@ def list_available_bundles() -> list[str]:
     Returns:
         List of bundle names (without .yaml extension)
     """
-    if not BUNDLES_DIR.exists():
-        return []
-
-    return [f.stem for f in BUNDLES_DIR.glob("*.yaml") if f.stem != "README"]
+    return get_bundle_cache().names()
 
 
 if __name__ == "__main__":
@@ -339,19 +818,38 @@ if __name__ == "__main__":
         action="store_true",
         help="List all available bundles",
     )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        help="Pack the bundle into at most N (estimated) tokens",
+    )
+    parser.add_argument(
+        "--excerpts",
+        action="store_true",
+        help="With --token-budget, include headings and first paragraphs of files that don't fit",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="With --token-budget, print the pack (including excerpts) as JSON",
+    )
 
     args = parser.parse_args()
+    description = args.task or (f"task type: {args.type}" if args.type else None)
 
     if args.list:
         bundles = list_available_bundles()
         print("Available bundles:")
         for bundle in bundles:
             print(f"  - {bundle}")
-    elif args.task:
-        print_context_bundle(args.task, args.type)
-    elif args.type:
-        # Use a generic description if only type is provided
-        print_context_bundle(f"task type: {args.type}", args.type)
+    elif description and args.token_budget is not None:
+        packed = pack_context_bundle(
+            description, args.type, args.token_budget, excerpts=args.excerpts
+        )
+        print_packed_bundle(packed, as_json=args.json)
+    elif description:
+        # A generic description is used if only the type is provided
+        print_context_bundle(description, args.type)
     else:
         parser.print_help()
         sys.exit(1)
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Task Type Classifier
+
+Classifies free-text task descriptions into context bundle types
+('development', 'documentation', 'debugging', 'planning', or 'general').
+
+All keywords are compiled into one regex (an alternation nested as a
+prefix trie) anchored at word starts, so a description is scanned once
+regardless of how many keywords or task types exist. Keywords carry weights; defaults
+come from ``TASK_KEYWORDS`` and can be overridden or extended in config:
+
+    context_bundles:
+      task_keywords:
+        debugging:
+          stacktrace: 2.0
+          log: 0.5        # down-weight a noisy default
+
+A keyword matches at the start of a word and may be followed by more word
+characters ("plan" matches "planning", but "code" no longer matches
+"decode"). A keyword counts once per description, and a longer keyword
+also credits the keywords it contains ("fix bug" scores for both
+'development' and 'debugging', like the original substring scan).
+
+Usage:
+    from AgentQMS.agent_tools.core.task_classifier import get_task_classifier
+
+    classifier = get_task_classifier()
+    classifier.classify("implement new feature")        # 'development'
+    classifier.classify_many(descriptions)              # list of types
+
+    # Accuracy and speed against a labeled JSONL corpus
+    python task_classifier.py --evaluate corpus.jsonl --benchmark
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from AgentQMS.agent_tools.utils.config import load_config
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+DEFAULT_TASK_TYPE = "general"
+
+# Task type keywords for automatic classification
+TASK_KEYWORDS = {
+    "development": [
+        "implement",
+        "code",
+        "develop",
+        "feature",
+        "function",
+        "class",
+        "module",
+        "refactor",
+        "rewrite",
+        "build",
+        "create",
+        "add",
+        "fix bug",
+        "bug fix",
+    ],
+    "documentation": [
+        "document",
+        "doc",
+        "write docs",
+        "readme",
+        "guide",
+        "manual",
+        "tutorial",
+        "update docs",
+        "documentation",
+    ],
+    "debugging": [
+        "debug",
+        "troubleshoot",
+        "error",
+        "fix",
+        "broken",
+        "issue",
+        "problem",
+        "crash",
+        "exception",
+        "traceback",
+        "log",
+        "investigate",
+    ],
+    "planning": [
+        "plan",
+        "design",
+        "architecture",
+        "blueprint",
+        "strategy",
+        "assess",
+        "evaluate",
+        "analysis",
+        "proposal",
+        "roadmap",
+    ],
+}
+
+KeywordSpec = Mapping[str, Iterable[str] | Mapping[str, float]]
+
+
+def _normalize(keywords: KeywordSpec) -> dict[str, dict[str, float]]:
+    """Turn ``type -> [kw, ...]`` or ``type -> {kw: weight}`` into weights."""
+    weighted: dict[str, dict[str, float]] = {}
+    for task_type, spec in keywords.items():
+        if isinstance(spec, Mapping):
+            items = {str(k).lower(): float(w) for k, w in spec.items()}
+        else:
+            items = {str(k).lower(): 1.0 for k in spec}
+        weighted[task_type] = items
+    return weighted
+
+
+def merge_keywords(base: KeywordSpec, overrides: KeywordSpec | None) -> dict[str, dict[str, float]]:
+    """Overlay configured keyword weights on the defaults (weight 0 removes)."""
+    merged = _normalize(base)
+    for task_type, weights in _normalize(overrides or {}).items():
+        target = merged.setdefault(task_type, {})
+        for keyword, weight in weights.items():
+            if weight:
+                target[keyword] = weight
+            else:
+                target.pop(keyword, None)
+    return merged
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Compile keywords into a prefix-trie regex (greedy, longest match wins).
+
+    Python's regex engine tries alternatives one by one; nesting them by
+    shared prefix means a position is rejected after a single character
+    test instead of one attempt per keyword.
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class TaskClassifier:
+    """Single-pass weighted keyword classifier."""
+
+    def __init__(self, keywords: KeywordSpec | None = None):
+        self.keywords = _normalize(keywords or TASK_KEYWORDS)
+        # Task type order decides ties, as in the original max() over TASK_KEYWORDS
+        self.task_types = list(self.keywords)
+
+        # keyword -> [(task_type, weight), ...]
+        self._weights: dict[str, list[tuple[str, float]]] = {}
+        for task_type, weights in self.keywords.items():
+            for keyword, weight in weights.items():
+                self._weights.setdefault(keyword, []).append((task_type, weight))
+
+        ordered = sorted(self._weights, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"\b(" + _trie_pattern(ordered) + ")" if ordered else r"(?!x)x"
+        )
+        # The greedy trie consumes "fix bug" whole; it must credit "fix" too
+        self._expanded: dict[str, frozenset[str]] = {
+            keyword: frozenset(
+                other for other in ordered if re.search(r"\b" + re.escape(other), keyword)
+            )
+            for keyword in ordered
+        }
+
+    def matched_keywords(self, description: str) -> set[str]:
+        found = set(self._pattern.findall(description.lower()))
+        return set().union(*(self._expanded[keyword] for keyword in found))
+
+    def scores(self, description: str) -> dict[str, float]:
+        scores: dict[str, float] = {}
+        for keyword in self.matched_keywords(description):
+            for task_type, weight in self._weights[keyword]:
+                scores[task_type] = scores.get(task_type, 0.0) + weight
+        return scores
+
+    def classify(self, description: str) -> str:
+        scores = self.scores(description)
+        if not scores:
+            return DEFAULT_TASK_TYPE
+        best_type, best_score = DEFAULT_TASK_TYPE, 0.0
+        for task_type in self.task_types:
+            score = scores.get(task_type, 0.0)
+            if score > best_score:
+                best_type, best_score = task_type, score
+        return best_type
+
+    def classify_many(self, descriptions: Iterable[str]) -> list[str]:
+        """Classify a batch, scoring each distinct description once."""
+        seen: dict[str, str] = {}
+        results = []
+        for description in descriptions:
+            task_type = seen.get(description)
+            if task_type is None:
+                task_type = seen[description] = self.classify(description)
+            results.append(task_type)
+        return results
+
+
+_DEFAULT_CLASSIFIER: TaskClassifier | None = None
+
+
+def get_task_classifier() -> TaskClassifier:
+    """Return a classifier built from the defaults plus configured weights."""
+    global _DEFAULT_CLASSIFIER
+    if _DEFAULT_CLASSIFIER is None:
+        try:
+            overrides = (load_config().get("context_bundles") or {}).get("task_keywords")
+        except Exception:
+            # Classification must keep working without a readable config
+            overrides = None
+        _DEFAULT_CLASSIFIER = TaskClassifier(merge_keywords(TASK_KEYWORDS, overrides))
+    return _DEFAULT_CLASSIFIER
+
+
+def classify_many(descriptions: Iterable[str]) -> list[str]:
+    return get_task_classifier().classify_many(descriptions)
+
+
+# ----------------------------------------------------------------------
+# Accuracy and benchmark harness
+# ----------------------------------------------------------------------
+def substring_classify(description: str, keywords: KeywordSpec = TASK_KEYWORDS) -> str:
+    """The original per-keyword substring scan (unweighted), kept as a baseline."""
+    description_lower = description.lower()
+    scores = {}
+    for task_type, task_keywords in keywords.items():
+        score = sum(1 for keyword in task_keywords if keyword in description_lower)
+        if score > 0:
+            scores[task_type] = score
+    if scores:
+        return max(scores.items(), key=lambda x: x[1])[0]
+    return DEFAULT_TASK_TYPE
+
+
+def load_corpus(path: Path | str) -> list[tuple[str, str]]:
+    """Load ``{"description": ..., "task_type": ...}`` JSONL lines."""
+    corpus = []
+    with Path(path).open(encoding="utf-8") as handle:
+        for line_num, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record: dict[str, Any] = json.loads(line)
+                corpus.append((record["description"], record["task_type"]))
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{line_num}: invalid corpus line ({e})") from e
+    return corpus
+
+
+def evaluate(corpus: list[tuple[str, str]], classifier: TaskClassifier) -> dict[str, Any]:
+    """Accuracy of the classifier and the substring baseline on *corpus*."""
+    descriptions = [d for d, _ in corpus]
+    labels = [label for _, label in corpus]
+    predicted = classifier.classify_many(descriptions)
+    baseline = [substring_classify(d, classifier.keywords) for d in descriptions]
+    confusion = Counter(
+        (label, guess) for label, guess in zip(labels, predicted) if label != guess
+    )
+    total = len(corpus) or 1
+    return {
+        "samples": len(corpus),
+        "accuracy": sum(p == label for p, label in zip(predicted, labels)) / total,
+        "baseline_accuracy": sum(b == label for b, label in zip(baseline, labels)) / total,
+        "confusions": [
+            {"label": label, "predicted": guess, "count": count}
+            for (label, guess), count in confusion.most_common()
+        ],
+    }
+
+
+def benchmark(
+    descriptions: list[str], classifier: TaskClassifier, repeat: int = 5
+) -> dict[str, float]:
+    """Best-of-*repeat* wall time (seconds) for both classifiers."""
+
+    def best(func) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    return {
+        "descriptions": len(descriptions),
+        "substring_s": best(
+            lambda: [substring_classify(d, classifier.keywords) for d in descriptions]
+        ),
+        "compiled_s": best(lambda: [classifier.classify(d) for d in descriptions]),
+        "classify_many_s": best(lambda: classifier.classify_many(descriptions)),
+    }
+
+
+def _synthetic_descriptions(count: int) -> list[str]:
+    """Varied descriptions built from the keywords, for corpus-less benchmarks."""
+    keywords = [k for spec in TASK_KEYWORDS.values() for k in spec]
+    filler = "please take a look at the streamlit page and the inference service".split()
+    return [
+        " ".join(
+            filler[(i + j) % len(filler)] if j % 8 else keywords[(i * 7 + j) % len(keywords)]
+            for j in range(12 + i % 20)
+        )
+        + f" #{i}"
+        for i in range(count)
+    ]
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classify task descriptions by type")
+    parser.add_argument("descriptions", nargs="*", help="Descriptions to classify")
+    parser.add_argument(
+        "--evaluate", metavar="CORPUS", help="Labeled JSONL corpus (description, task_type)"
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Time compiled vs substring classifier"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=5000, help="Synthetic benchmark size without a corpus"
+    )
+    args = parser.parse_args()
+
+    classifier = get_task_classifier()
+    for description in args.descriptions:
+        print(f"{classifier.classify(description)}\t{description}")
+
+    corpus = load_corpus(args.evaluate) if args.evaluate else []
+    if corpus:
+        report = evaluate(corpus, classifier)
+        print(
+            f"📊 Accuracy: {report['accuracy']:.1%} "
+            f"(substring baseline {report['baseline_accuracy']:.1%}, "
+            f"{report['samples']} samples)"
+        )
+        for item in report["confusions"][:10]:
+            print(f"   {item['label']} -> {item['predicted']}: {item['count']}")
+
+    if args.benchmark:
+        descriptions = [d for d, _ in corpus] or _synthetic_descriptions(args.samples)
+        timings = benchmark(descriptions, classifier)
+        n = timings["descriptions"]
+        print(f"⏱️  {n} descriptions (best of 5):")
+        for key in ("substring_s", "compiled_s", "classify_many_s"):
+            seconds = timings[key]
+            print(f"   {key[:-2]:<14} {seconds * 1000:8.1f} ms  ({seconds / n * 1e6:.1f} µs each)")
+
+    if not (args.descriptions or corpus or args.benchmark):
+        parser.print_help()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,27 @@
 #!/usr/bin/env python3
-"""Auto-generate and update the AI handbook index.json from directory structure."""
+"""Auto-generate and update the AI handbook index.json from directory structure.
+
+Runs incrementally by default: a manifest of file hashes (kept under
+``.agentqms/cache/``) identifies which handbook documents changed since the
+last run. Only those are re-extracted; entries for unchanged files are
+carried over verbatim from the existing index, including ``last_reviewed``.
+``index.json`` is written atomically and only when its content changes.
+"""
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import re
 from collections import defaultdict
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from AgentQMS.agent_tools.utils.paths import get_project_root
+
 # Directory structure mapping
 DIRECTORY_STRUCTURE = {
     "01_onboarding": {
@@ -91,22 +102,30 @@ PRIORITY_MAP = {
 }
 
 
+MANIFEST_VERSION = 1
+
+
+def extract_title(content: str, file_path: Path) -> str:
+    """Extract title from markdown content."""
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("# "):
+            # Remove markdown heading and clean up
+            title = line[2:].strip()
+            # Remove any markdown formatting
+            title = re.sub(r"\*\*([^*]+)\*\*", r"\1", title)
+            return title
+    # Fallback to filename
+    return file_path.stem.replace("_", " ").replace("-", " ").title()
+
+
 def extract_title_from_file(file_path: Path) -> str:
     """Extract title from markdown file."""
     try:
-        with file_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("# "):
-                    # Remove markdown heading and clean up
-                    title = line[2:].strip()
-                    # Remove any markdown formatting
-                    title = re.sub(r"\*\*([^*]+)\*\*", r"\1", title)
-                    return title
+        content = file_path.read_text(encoding="utf-8")
     except Exception:
-        pass
-    # Fallback to filename
-    return file_path.stem.replace("_", " ").replace("-", " ").title()
+        content = ""
+    return extract_title(content, file_path)
 
 
 def determine_priority(filename: str, content_type: str) -> str:
@@ -142,8 +161,104 @@ def determine_owner(filename: str) -> str:
         return "core-team"
 
 
-def scan_directory(handbook_dir: Path) -> dict[str, Any]:
-    """Scan the handbook directory and build the index structure."""
+def default_manifest_path(output: Path) -> Path:
+    """Manifest location for an index file (one manifest per output path)."""
+    digest = hashlib.sha1(str(output.resolve()).encode("utf-8")).hexdigest()[:12]
+    return get_project_root() / ".agentqms" / "cache" / f"handbook_index_manifest_{digest}.json"
+
+
+def load_manifest(manifest_path: Path) -> dict[str, dict[str, Any]]:
+    """Load the ``path -> {hash, mtime_ns, size}`` manifest, or an empty one."""
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(manifest_path: Path, files: dict[str, dict[str, Any]]) -> None:
+    _write_atomic(
+        manifest_path,
+        json.dumps({"version": MANIFEST_VERSION, "files": files}, sort_keys=True),
+    )
+
+
+def load_existing_index(index_path: Path) -> dict[str, Any] | None:
+    try:
+        data = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def build_entry(md_file: Path, rel_path: Path, dir_name: str, content: str) -> dict[str, Any]:
+    """Extract the index entry for one handbook document."""
+    path_str = f"./{rel_path}"
+
+    # Extract metadata
+    title = extract_title(content, md_file)
+    filename = md_file.stem
+
+    # Determine section and other metadata
+    section = f"{dir_name.split('_')[1].title()} ({'How-To Guides' if dir_name == '02_protocols' else 'Factual Information' if dir_name == '03_references' else dir_name.split('_')[1].title()})"
+
+    priority = determine_priority(filename, dir_name.split("_")[1])
+    owner = determine_owner(filename)
+
+    # Create entry ID from filename
+    entry_id = filename.lower().replace(" ", "_").replace("-", "_")
+
+    # Determine tags based on content
+    tags = []
+    filename_lower = filename.lower()
+    if "debug" in filename_lower:
+        tags.append("debugging")
+    if "train" in filename_lower or "experiment" in filename_lower:
+        tags.append("training")
+    if "ui" in filename_lower or "streamlit" in filename_lower:
+        tags.append("ui")
+    if "config" in filename_lower or "hydra" in filename_lower:
+        tags.append("configuration")
+    if not tags:
+        tags.append(dir_name.split("_")[1])
+
+    return {
+        "id": entry_id,
+        "title": title,
+        "path": path_str,
+        "section": section,
+        "tags": tags,
+        "priority": priority,
+        "summary": f"Documentation for {title.lower()}",
+        "last_reviewed": datetime.now(UTC).strftime("%Y-%m-%d"),
+        "owner": owner,
+        "bundles": [],
+    }
+
+
+def scan_directory(
+    handbook_dir: Path,
+    previous_index: dict[str, Any] | None = None,
+    manifest: dict[str, dict[str, Any]] | None = None,
+    stats: dict[str, int] | None = None,
+) -> dict[str, Any]:
+    """Scan the handbook directory and build the index structure.
+
+    With ``previous_index`` and ``manifest`` the scan is incremental: files
+    whose stat (or, failing that, content hash) matches the manifest keep
+    their previous entry verbatim. ``manifest`` is updated in place.
+    """
+    previous_entries: dict[str, dict[str, Any]] = {}
+    if previous_index is not None and manifest is not None:
+        for entry in previous_index.get("entries", []):
+            if isinstance(entry, dict) and "path" in entry:
+                previous_entries[entry["path"]] = entry
+    new_manifest: dict[str, dict[str, Any]] = {}
+    counts = {"files": 0, "reused": 0, "extracted": 0}
+
     entries = []
     bundles: dict[str, list[str]] = defaultdict(list)
 
@@ -152,62 +267,72 @@ def scan_directory(handbook_dir: Path) -> dict[str, Any]:
         if not dir_path.exists():
             continue
 
-        # Scan for markdown files
-        for md_file in dir_path.rglob("*.md"):
+        # Scan for markdown files (sorted so output order is stable)
+        for md_file in sorted(dir_path.rglob("*.md")):
             if md_file.name.startswith(".") or md_file.name == "README.md":
                 continue
 
             # Calculate relative path
             rel_path = md_file.relative_to(handbook_dir)
             path_str = f"./{rel_path}"
+            counts["files"] += 1
+
+            entry = None
+            record = (manifest or {}).get(path_str)
+            previous = previous_entries.get(path_str)
+            try:
+                stat = md_file.stat()
+            except OSError:
+                continue
 
-            # Extract metadata
-            title = extract_title_from_file(md_file)
-            filename = md_file.stem
-
-            # Determine section and other metadata
-            section = f"{dir_name.split('_')[1].title()} ({'How-To Guides' if dir_name == '02_protocols' else 'Factual Information' if dir_name == '03_references' else dir_name.split('_')[1].title()})"
-
-            priority = determine_priority(filename, dir_name.split("_")[1])
-            owner = determine_owner(filename)
-
-            # Create entry ID from filename
-            entry_id = filename.lower().replace(" ", "_").replace("-", "_")
-
-            # Determine tags based on content
-            tags = []
-            filename_lower = filename.lower()
-            if "debug" in filename_lower:
-                tags.append("debugging")
-            if "train" in filename_lower or "experiment" in filename_lower:
-                tags.append("training")
-            if "ui" in filename_lower or "streamlit" in filename_lower:
-                tags.append("ui")
-            if "config" in filename_lower or "hydra" in filename_lower:
-                tags.append("configuration")
-            if not tags:
-                tags.append(dir_name.split("_")[1])
-
-            entry = {
-                "id": entry_id,
-                "title": title,
-                "path": path_str,
-                "section": section,
-                "tags": tags,
-                "priority": priority,
-                "summary": f"Documentation for {title.lower()}",
-                "last_reviewed": datetime.now(UTC).strftime("%Y-%m-%d"),
-                "owner": owner,
-                "bundles": [],
-            }
-
+            if (
+                previous is not None
+                and record is not None
+                and record.get("mtime_ns") == stat.st_mtime_ns
+                and record.get("size") == stat.st_size
+            ):
+                entry = previous
+                new_manifest[path_str] = record
+            else:
+                try:
+                    raw = md_file.read_bytes()
+                except OSError:
+                    raw = b""
+                digest = hashlib.sha256(raw).hexdigest()
+                if previous is not None and record is not None and record.get("hash") == digest:
+                    # Touched but not edited
+                    entry = previous
+                else:
+                    entry = build_entry(
+                        md_file, rel_path, dir_name, raw.decode("utf-8", errors="replace")
+                    )
+                    if previous is not None and _same_metadata(entry, previous):
+                        # Edited without affecting the entry (or first run
+                        # without a manifest): keep last_reviewed as it was
+                        entry = previous
+                new_manifest[path_str] = {
+                    "hash": digest,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                }
+
+            if entry is previous:
+                counts["reused"] += 1
+            else:
+                counts["extracted"] += 1
             entries.append(entry)
 
             # Add to bundles based on tags
-            for tag in tags:
+            for tag in entry.get("tags", []):
                 if tag not in bundles:
                     bundles[tag] = []
-                bundles[tag].append(entry_id)
+                bundles[tag].append(entry["id"])
+
+    if manifest is not None:
+        manifest.clear()
+        manifest.update(new_manifest)
+    if stats is not None:
+        stats.update(counts)
 
     # Convert bundles to the expected format (objects with entries arrays)
     formatted_bundles = {}
@@ -224,6 +349,31 @@ def scan_directory(handbook_dir: Path) -> dict[str, Any]:
     }
 
 
+def _same_metadata(entry: dict[str, Any], previous: dict[str, Any]) -> bool:
+    return {**entry, "last_reviewed": None} == {**previous, "last_reviewed": None}
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_index(output: Path, index_data: dict[str, Any], previous_index: dict[str, Any] | None) -> bool:
+    """Write ``index_data`` atomically unless only ``generated_at`` would change.
+
+    Returns True when the file was written.
+    """
+    if previous_index is not None:
+        unchanged = {**index_data, "generated_at": previous_index.get("generated_at")}
+        if unchanged == previous_index:
+            return False
+    _write_atomic(output, json.dumps(index_data, indent=2, ensure_ascii=False))
+    return True
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Auto-generate AI handbook index.json from directory structure"
@@ -243,18 +393,41 @@ def main() -> None:
     parser.add_argument(
         "--validate", action="store_true", help="Run validation after generation"
     )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-extract every entry instead of reusing unchanged ones",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Path to the file-hash manifest (default: under .agentqms/cache/)",
+    )
 
     args = parser.parse_args()
 
     # Generate the index
-    index_data = scan_directory(args.handbook_dir)
+    previous_index = load_existing_index(args.output)
+    manifest_path = args.manifest or default_manifest_path(args.output)
+    manifest = {} if args.full else load_manifest(manifest_path)
+    stats: dict[str, int] = {}
+    index_data = scan_directory(
+        args.handbook_dir, previous_index=previous_index, manifest=manifest, stats=stats
+    )
 
     # Write to file
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as f:
-        json.dump(index_data, f, indent=2, ensure_ascii=False)
+    written = write_index(args.output, index_data, previous_index)
+    save_manifest(manifest_path, manifest)
 
-    print(f"Generated index.json with {len(index_data['entries'])} entries")
+    if written:
+        print(f"Generated index.json with {len(index_data['entries'])} entries")
+    else:
+        print(f"index.json is up to date ({len(index_data['entries'])} entries)")
+    print(
+        f"  {stats['extracted']} extracted, {stats['reused']} unchanged "
+        f"of {stats['files']} files"
+    )
 
     # Run validation if requested
     if args.validate:
@@ -4,6 +4,10 @@ Documentation Freshness Checker
 
 Checks how recently documentation files have been updated and flags files
 that haven't been updated within specified time thresholds.
+
+Ages come from the last git commit touching each file (falling back to the
+filesystem mtime for uncommitted files), so results are the same in a fresh
+CI clone and on a long-lived checkout. Pass --mtime to use mtimes only.
 """
 
 import os
@@ -11,14 +15,21 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.utils.git_freshness import get_freshness_provider
+
 
 class FreshnessChecker:
     """Checks documentation freshness based on modification dates."""
 
-    def __init__(self, docs_root: str, max_age_days: int = 30):
+    def __init__(self, docs_root: str, max_age_days: int = 30, use_git: bool = True):
         self.docs_root = Path(docs_root)
         self.max_age_days = max_age_days
         self.now = datetime.now()
+        self.freshness = get_freshness_provider() if use_git else None
         self.stale_files: list[tuple[Path, int]] = []
         self.fresh_files: list[Path] = []
 
@@ -38,7 +49,12 @@ class FreshnessChecker:
     def get_file_age_days(self, file_path: Path) -> int:
         """Get the age of a file in days since last modification."""
         try:
-            mtime = file_path.stat().st_mtime
+            if self.freshness is not None:
+                mtime = self.freshness.last_modified(file_path)
+                if mtime is None:
+                    return -1
+            else:
+                mtime = file_path.stat().st_mtime
             modified_date = datetime.fromtimestamp(mtime)
             age = self.now - modified_date
             return age.days
@@ -99,18 +115,20 @@ class FreshnessChecker:
 
 def main() -> None:
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: python check_freshness.py <docs_root> [max_age_days]")
+    args = [arg for arg in sys.argv[1:] if arg != "--mtime"]
+    use_git = "--mtime" not in sys.argv[1:]
+    if len(args) < 1:
+        print("Usage: python check_freshness.py <docs_root> [max_age_days] [--mtime]")
         sys.exit(1)
 
-    docs_root = sys.argv[1]
-    max_age_days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    docs_root = args[0]
+    max_age_days = int(args[1]) if len(args) > 1 else 30
 
     if not os.path.exists(docs_root):
         print(f"Error: Documentation root '{docs_root}' does not exist")
         sys.exit(1)
 
-    checker = FreshnessChecker(docs_root, max_age_days)
+    checker = FreshnessChecker(docs_root, max_age_days, use_git=use_git)
     success = checker.check_all_freshness()
 
     # Generate and print summary
@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
+"""Deprecate and report on docs based on project_version.yaml.
+
+A single scan reads every artifact once (in parallel), parses its
+frontmatter, and derives deprecation, hiding, internal status and the
+health counters from that one record. Only files whose status changes are
+rewritten.
+"""
+
 from __future__ import annotations
 
 import argparse
+import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import yaml
@@ -57,51 +69,81 @@ def is_internal(fm: dict) -> bool:
     return "internal" in tags or "Internal" in tags
 
 
-def process_file(
-    md_path: Path, current_version: str, dry_run: bool
-) -> tuple[bool, str, dict]:
-    text = md_path.read_text(encoding="utf-8")
-    fm, body = parse_frontmatter(text)
-    if not fm:
-        return False, "no-frontmatter", {}
-
-    # Check if should be hidden (min_version not reached)
-    if should_hide(fm, current_version):
-        return (
-            False,
-            "hidden",
-            {"reason": "min_version", "min_version": fm.get("min_version")},
-        )
-
-    if not should_deprecate(fm, current_version):
-        return False, "skip", {}
-
-    # Update status and add notice
-    fm["status"] = "deprecated"
-    notice_lines = [
-        ":warning: Deprecated due to project version update.",
-        f"- Deprecated as of version {current_version}.",
-    ]
-    if fm.get("superseded_by"):
-        notice_lines.append(f"- Superseded by: {fm['superseded_by']}")
-    notice = "\n" + "\n".join(notice_lines) + "\n\n"
-
-    new_text = render_frontmatter(fm) + notice + body
-
-    if dry_run:
-        return True, "would-deprecate", {}
-
-    # Write back and move to archive mirror path
-    md_path.write_text(new_text, encoding="utf-8")
-    rel = md_path.relative_to(ARTIFACTS_DIR)
-    target = ARCHIVE_DIR / rel
-    target.parent.mkdir(parents=True, exist_ok=True)
-    shutil.move(str(md_path), str(target))
-    return True, "deprecated", {}
-
-
-def get_docs_health(current_version: str) -> dict:
-    """Get health status of all docs for dashboard."""
+@dataclass
+class DocRecord:
+    """One artifact read and classified in a single pass."""
+
+    path: Path
+    fm: dict = field(default_factory=dict)
+    body: str = ""
+    # False when the file could not be decoded exactly and must not be rewritten
+    writable: bool = True
+    deprecate: bool = False
+    hide: bool = False
+    internal: bool = False
+
+    @property
+    def status(self) -> str:
+        return self.fm.get("status", "active")
+
+
+def iter_artifact_paths(root: Path | None = None) -> list[Path]:
+    """List active artifacts, pruning the archive tree instead of walking it."""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root or ARTIFACTS_DIR):
+        dirnames[:] = sorted(d for d in dirnames if d != "_archived")
+        for name in sorted(filenames):
+            if name.endswith(".md"):
+                paths.append(Path(dirpath) / name)
+    return paths
+
+
+def read_record(md_path: Path, current_version: str) -> DocRecord:
+    """Read, parse and classify one artifact."""
+    record = DocRecord(md_path)
+    try:
+        raw = md_path.read_bytes()
+    except OSError:
+        record.writable = False
+        return record
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = raw.decode("utf-8", errors="ignore")
+        record.writable = False
+    try:
+        record.fm, record.body = parse_frontmatter(text)
+    except yaml.YAMLError:
+        record.fm, record.body = {}, text
+    if not isinstance(record.fm, dict):
+        record.fm = {}
+    if record.fm:
+        record.deprecate = should_deprecate(record.fm, current_version)
+        record.hide = should_hide(record.fm, current_version)
+        record.internal = is_internal(record.fm)
+    return record
+
+
+def scan_docs(
+    current_version: str, workers: int = 8, timings: dict[str, float] | None = None
+) -> list[DocRecord]:
+    """Read and classify every active artifact once, in parallel."""
+    start = time.perf_counter()
+    paths = iter_artifact_paths()
+    listed = time.perf_counter()
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(lambda p: read_record(p, current_version), paths))
+    else:
+        records = [read_record(p, current_version) for p in paths]
+    if timings is not None:
+        timings["discover"] = listed - start
+        timings["read_parse"] = time.perf_counter() - listed
+    return records
+
+
+def health_from_records(records: list[DocRecord]) -> dict:
+    """Aggregate dashboard health counters from scanned records."""
     health = {
         "total": 0,
         "active": 0,
@@ -111,48 +153,115 @@ def get_docs_health(current_version: str) -> dict:
         "pending_deprecation": [],
         "hidden_docs": [],
     }
-    for md_path in ARTIFACTS_DIR.rglob("*.md"):
-        if "_archived" in md_path.parts:
-            continue
+    for record in records:
         health["total"] += 1
-        text = md_path.read_text(encoding="utf-8", errors="ignore")
-        fm, _ = parse_frontmatter(text)
+        fm = record.fm
         if not fm:
             continue
-        status = fm.get("status", "active")
-        if status == "deprecated":
+        if record.status == "deprecated":
             health["deprecated"] += 1
         else:
             health["active"] += 1
-            if should_deprecate(fm, current_version):
+            if record.deprecate:
                 health["pending_deprecation"].append(
                     {
-                        "path": str(md_path.relative_to(REPO_ROOT)),
+                        "path": str(record.path.relative_to(REPO_ROOT)),
                         "title": fm.get("title", "Untitled"),
                         "deprecated_after": fm.get("deprecated_after"),
                         "max_version": fm.get("max_version"),
                     }
                 )
-            if should_hide(fm, current_version):
+            if record.hide:
                 health["hidden"] += 1
                 health["hidden_docs"].append(
                     {
-                        "path": str(md_path.relative_to(REPO_ROOT)),
+                        "path": str(record.path.relative_to(REPO_ROOT)),
                         "title": fm.get("title", "Untitled"),
                         "min_version": fm.get("min_version"),
                     }
                 )
-            if is_internal(fm):
+            if record.internal:
                 health["internal"] += 1
     return health
 
 
+def apply_record(
+    record: DocRecord, current_version: str, dry_run: bool
+) -> tuple[bool, str, dict]:
+    """Act on a scanned record: deprecate and archive it if policy says so."""
+    fm = record.fm
+    if not fm:
+        return False, "no-frontmatter", {}
+
+    # Check if should be hidden (min_version not reached)
+    if record.hide:
+        return (
+            False,
+            "hidden",
+            {"reason": "min_version", "min_version": fm.get("min_version")},
+        )
+
+    if not record.deprecate:
+        return False, "skip", {}
+
+    if not record.writable:
+        return False, "unreadable", {}
+
+    if dry_run:
+        return True, "would-deprecate", {}
+
+    # Only rewrite when the status actually changes; docs already marked
+    # deprecated keep their content (and notice) and are just archived
+    if record.status != "deprecated":
+        fm = dict(fm, status="deprecated")
+        notice_lines = [
+            ":warning: Deprecated due to project version update.",
+            f"- Deprecated as of version {current_version}.",
+        ]
+        if fm.get("superseded_by"):
+            notice_lines.append(f"- Superseded by: {fm['superseded_by']}")
+        notice = "\n" + "\n".join(notice_lines) + "\n\n"
+        record.path.write_text(render_frontmatter(fm) + notice + record.body, encoding="utf-8")
+
+    # Move to archive mirror path
+    rel = record.path.relative_to(ARTIFACTS_DIR)
+    target = ARCHIVE_DIR / rel
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(record.path), str(target))
+    return True, "deprecated", {}
+
+
+def process_file(
+    md_path: Path, current_version: str, dry_run: bool
+) -> tuple[bool, str, dict]:
+    return apply_record(read_record(md_path, current_version), current_version, dry_run)
+
+
+def get_docs_health(current_version: str) -> dict:
+    """Get health status of all docs for dashboard."""
+    return health_from_records(scan_docs(current_version))
+
+
+def print_stats(timings: dict[str, float], files: int) -> None:
+    total = sum(timings.values())
+    print(f"\nTiming ({files} files):")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<11} {seconds * 1000:8.1f} ms")
+    print(f"  {'total':<11} {total * 1000:8.1f} ms")
+
+
 def main() -> int:
     p = argparse.ArgumentParser(
         description="Deprecate docs based on project_version.yaml and frontmatter policy"
     )
     p.add_argument("--dry-run", action="store_true")
     p.add_argument("--health", action="store_true", help="Output health status as JSON")
+    p.add_argument(
+        "--workers", type=int, default=8, help="Parallel readers (default: 8)"
+    )
+    p.add_argument(
+        "--stats", action="store_true", help="Print a timing breakdown of the run"
+    )
     args = p.parse_args()
 
     if not VERSION_FILE.exists():
@@ -161,30 +270,39 @@ def main() -> int:
     version_info = yaml.safe_load(VERSION_FILE.read_text(encoding="utf-8")) or {}
     current_version = str(version_info.get("version", "0.0.0"))
 
+    timings: dict[str, float] = {}
+    records = scan_docs(current_version, workers=args.workers, timings=timings)
+
     if args.health:
         import json
 
-        health = get_docs_health(current_version)
+        start = time.perf_counter()
+        health = health_from_records(records)
+        timings["health"] = time.perf_counter() - start
         print(json.dumps(health, indent=2))
+        if args.stats:
+            print_stats(timings, len(records))
         return 0
 
     ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
 
+    start = time.perf_counter()
     changed = 0
     scanned = 0
     hidden_count = 0
-    for md_path in ARTIFACTS_DIR.rglob("*.md"):
-        if "_archived" in md_path.parts:
-            continue
+    for record in records:
         scanned += 1
-        did, status, meta = process_file(md_path, current_version, args.dry_run)
+        did, status, meta = apply_record(record, current_version, args.dry_run)
         if did:
             changed += 1
         if status == "hidden":
             hidden_count += 1
-        print(f"{md_path}: {status}")
+        print(f"{record.path}: {status}")
+    timings["apply"] = time.perf_counter() - start
 
     print(f"Scanned: {scanned}, Deprecated: {changed}, Hidden: {hidden_count}")
+    if args.stats:
+        print_stats(timings, scanned)
     # Exit non-zero on dry-run with changes to help CI detect pending deprecations
     if args.dry_run and changed > 0:
         return 3
@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
+"""Generate a changelog draft from the tracking DB, git history and archived docs.
+
+The draft is produced as a stream: ``git log`` is read line by line from a
+pipe (starting at the last version tag when one exists), plans and
+experiments come from one shared read-only tracking DB connection, and the
+sections are rendered by a generator straight into the output file.
+Commit subjects are classified inline; the split is cheaper than any cache
+lookup would be.
+"""
+
 from __future__ import annotations
 
 import argparse
+import os
+import sqlite3
 import subprocess
 import sys
+import time
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
+from typing import TextIO
 
 import yaml
 
@@ -13,11 +28,18 @@ from AgentQMS.agent_tools.utils.paths import get_project_root
 from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
 
 ensure_project_root_on_sys_path()
+
 REPO_ROOT = get_project_root()
 VERSION_FILE = REPO_ROOT / "project_version.yaml"
 CHANGELOG_DRAFT = REPO_ROOT / "CHANGELOG.draft.md"
 CHANGELOG = REPO_ROOT / "CHANGELOG.md"
 
+_FIELD_SEP = "\x1f"
+_RECENT_ARCHIVE_SECONDS = 7 * 24 * 60 * 60
+
+_tracking_conn: sqlite3.Connection | None = None
+_tracking_conn_opened = False
+
 
 def get_version_info() -> dict:
     if not VERSION_FILE.exists():
@@ -40,149 +62,192 @@ def get_last_version() -> str | None:
     return None
 
 
-def get_completed_plans(since_date: str | None = None) -> list[dict]:
-    """Query tracking DB for completed plans since date."""
+def get_last_version_tag() -> str | None:
+    """Return the most recent tag reachable from HEAD, if any."""
     try:
-        from AgentQMS.agent_tools.utilities.tracking.db import (
-            DB_PATH,
-            get_connection,
-            init_db,
+        result = subprocess.run(
+            ["git", "describe", "--tags", "--abbrev=0"],
+            capture_output=True,
+            text=True,
+            cwd=REPO_ROOT,
         )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
 
-        # Auto-initialize DB if it doesn't exist or is empty
-        if not DB_PATH.exists() or (DB_PATH.exists() and DB_PATH.stat().st_size == 0):
-            init_db()
-        conn = get_connection()
-        # Try query - if tables don't exist, initialize and retry
+def get_tracking_connection() -> sqlite3.Connection | None:
+    """Return the shared read-only tracking DB connection (opened once).
+
+    Drafting never creates or migrates the DB; without one, plans and
+    experiments are simply empty.
+    """
+    global _tracking_conn, _tracking_conn_opened
+    if not _tracking_conn_opened:
+        _tracking_conn_opened = True
         try:
-            query = """
-                SELECT key, title, status, updated_at, owner
-                FROM feature_plans
-                WHERE status = 'completed'
-            """
-            params = []
-            if since_date:
-                query += " AND updated_at >= ?"
-                params.append(since_date)
-            query += " ORDER BY updated_at DESC"
-            rows = conn.execute(query, params).fetchall()
-            return [dict(r) for r in rows]
-        except Exception:
-            # Tables don't exist - initialize and return empty
-            init_db()
-            return []
-    except Exception as e:
-        print(f"Warning: Could not query tracking DB: {e}")
+            from AgentQMS.agent_tools.utilities.tracking.db import get_connection
+
+            _tracking_conn = get_connection(readonly=True)
+        except FileNotFoundError:
+            _tracking_conn = None
+        except Exception as e:
+            print(f"Warning: Could not open tracking DB: {e}")
+            _tracking_conn = None
+    return _tracking_conn
+
+
+def close_tracking_connection() -> None:
+    global _tracking_conn, _tracking_conn_opened
+    if _tracking_conn is not None:
+        _tracking_conn.close()
+    _tracking_conn = None
+    _tracking_conn_opened = False
+
+
+def _query_tracking(query: str, params: list) -> list[dict]:
+    conn = get_tracking_connection()
+    if conn is None:
+        return []
+    try:
+        return [dict(r) for r in conn.execute(query, params)]
+    except sqlite3.Error as e:
+        # Missing tables in an uninitialized DB are not worth a warning
+        if "no such table" not in str(e):
+            print(f"Warning: Could not query tracking DB: {e}")
         return []
 
 
+def get_completed_plans(since_date: str | None = None) -> list[dict]:
+    """Query tracking DB for completed plans since date."""
+    query = """
+        SELECT key, title, status, updated_at, owner
+        FROM feature_plans
+        WHERE status = 'completed'
+    """
+    params = []
+    if since_date:
+        query += " AND updated_at >= ?"
+        params.append(since_date)
+    query += " ORDER BY updated_at DESC"
+    return _query_tracking(query, params)
+
+
 def get_completed_experiments(since_date: str | None = None) -> list[dict]:
     """Query tracking DB for completed experiments with summaries."""
+    query = """
+        SELECT e.key, e.title, e.status, e.updated_at, e.objective,
+               COUNT(r.id) as run_count
+        FROM experiments e
+        LEFT JOIN experiment_runs r ON r.experiment_id = e.id
+        WHERE e.status = 'completed'
+    """
+    params = []
+    if since_date:
+        query += " AND e.updated_at >= ?"
+        params.append(since_date)
+    query += " GROUP BY e.id ORDER BY e.updated_at DESC"
+    return _query_tracking(query, params)
+
+
+def classify_commit(message: str) -> dict:
+    """Parse a conventional commit subject: ``type(scope): description``."""
+    commit_type = None
+    scope = None
+    description = message
+    if ":" in message:
+        prefix, description = message.split(":", 1)
+        description = description.strip()
+        if "(" in prefix and ")" in prefix:
+            commit_type, scope = prefix.split("(", 1)
+            scope = scope.rstrip(")")
+        else:
+            commit_type = prefix
+    return {"type": commit_type, "scope": scope, "description": description}
+
+
+def iter_git_commits(
+    since_date: str | None = None,
+    since_ref: str | None = None,
+) -> Iterator[dict]:
+    """Stream conventional commits from ``git log``, newest first.
+
+    ``since_ref`` (e.g. the last version tag) takes precedence over
+    ``since_date``.
+    """
+    cmd = [
+        "git",
+        "log",
+        f"--pretty=format:%H{_FIELD_SEP}%ad{_FIELD_SEP}%s",
+        "--date=iso",
+    ]
+    if since_ref:
+        cmd.append(f"{since_ref}..HEAD")
+    elif since_date:
+        cmd.append(f"--since={since_date}")
     try:
-        from AgentQMS.agent_tools.utilities.tracking.db import (
-            DB_PATH,
-            get_connection,
-            init_db,
+        process = subprocess.Popen(
+            cmd,
+            cwd=REPO_ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
         )
+    except OSError as e:
+        print(f"Warning: Could not parse git log: {e}")
+        return
 
-        # Auto-initialize DB if it doesn't exist or is empty
-        if not DB_PATH.exists() or (DB_PATH.exists() and DB_PATH.stat().st_size == 0):
-            init_db()
-        conn = get_connection()
-        # Try query - if tables don't exist, initialize and retry
-        try:
-            query = """
-                SELECT e.key, e.title, e.status, e.updated_at, e.objective,
-                       COUNT(r.id) as run_count
-                FROM experiments e
-                LEFT JOIN experiment_runs r ON r.experiment_id = e.id
-                WHERE e.status = 'completed'
-            """
-            params = []
-            if since_date:
-                query += " AND e.updated_at >= ?"
-                params.append(since_date)
-            query += " GROUP BY e.id ORDER BY e.updated_at DESC"
-            rows = conn.execute(query, params).fetchall()
-            return [dict(r) for r in rows]
-        except Exception:
-            # Tables don't exist - initialize and return empty
-            init_db()
-            return []
-    except Exception as e:
-        print(f"Warning: Could not query tracking DB: {e}")
-        return []
-
-
-def get_git_commits(since_date: str | None = None) -> list[dict]:
-    """Parse git log for conventional commits."""
+    assert process.stdout is not None
     try:
-        cmd = ["git", "log", "--pretty=format:%H|%ad|%s", "--date=iso"]
-        if since_date:
-            cmd.append(f"--since={since_date}")
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=REPO_ROOT)
-        if result.returncode != 0:
-            return []
-        commits = []
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            parts = line.split("|", 2)
+        for line in process.stdout:
+            parts = line.rstrip("\n").split(_FIELD_SEP, 2)
             if len(parts) != 3:
                 continue
             hash_val, date, message = parts
-            # Parse conventional commit format: type(scope): description
-            commit_type = None
-            scope = None
-            description = message
-            if ":" in message:
-                prefix, description = message.split(":", 1)
-                description = description.strip()
-                if "(" in prefix and ")" in prefix:
-                    commit_type, scope = prefix.split("(")
-                    scope = scope.rstrip(")")
-                else:
-                    commit_type = prefix
-            commits.append(
-                {
-                    "hash": hash_val,
-                    "date": date,
-                    "message": message,
-                    "type": commit_type,
-                    "scope": scope,
-                    "description": description,
-                }
-            )
-        return commits
-    except Exception as e:
-        print(f"Warning: Could not parse git log: {e}")
-        return []
+            yield {"hash": hash_val, "date": date, "message": message, **classify_commit(message)}
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def get_git_commits(since_date: str | None = None) -> list[dict]:
+    """Parse git log for conventional commits."""
+    return list(iter_git_commits(since_date))
+
+
+def iter_recently_archived(
+    archived_dir: Path, max_age_seconds: float = _RECENT_ARCHIVE_SECONDS
+) -> Iterator[dict]:
+    """Yield markdown docs under ``archived_dir`` modified within the window."""
+    cutoff = time.time() - max_age_seconds
+    stack = [archived_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.name.endswith(".md") and entry.stat().st_mtime >= cutoff:
+                        md_path = Path(entry.path)
+                        yield {
+                            "path": str(md_path.relative_to(REPO_ROOT)),
+                            "title": md_path.stem,
+                        }
+        except OSError:
+            continue
 
 
 def get_deprecated_docs() -> list[dict]:
-    """Get recently deprecated docs from version bump."""
+    """Get recently deprecated docs (moved into _archived in the last 7 days)."""
+    archived_dir = REPO_ROOT / "docs" / "artifacts" / "_archived"
+    if not archived_dir.exists():
+        return []
     try:
-        from AgentQMS.agent_tools.documentation.deprecate_docs import get_docs_health
-
-        version_info = get_version_info()
-        current_version = str(version_info.get("version", "0.0.0"))
-        get_docs_health(current_version)
-        # Return docs that were just deprecated (in _archived)
-        archived_dir = REPO_ROOT / "docs" / "artifacts" / "_archived"
-        if not archived_dir.exists():
-            return []
-        deprecated = []
-        for md_path in archived_dir.rglob("*.md"):
-            # Check modification time (recently moved)
-            mtime = datetime.fromtimestamp(md_path.stat().st_mtime)
-            if (datetime.now() - mtime).days < 7:  # Last 7 days
-                deprecated.append(
-                    {
-                        "path": str(md_path.relative_to(REPO_ROOT)),
-                        "title": md_path.stem,
-                    }
-                )
-        return deprecated
+        return list(iter_recently_archived(archived_dir))
     except Exception as e:
         print(f"Warning: Could not get deprecated docs: {e}")
         return []
@@ -200,8 +265,8 @@ def format_date(date_str: str | None) -> str:
         return datetime.now().strftime("%Y-%m-%d")
 
 
-def generate_draft() -> str:
-    """Generate changelog draft from all sources."""
+def iter_draft_lines() -> Iterator[str]:
+    """Yield the changelog draft line by line (joined with newlines)."""
     version_info = get_version_info()
     current_version = str(version_info.get("version", "0.0.0"))
     release_date = version_info.get("release_date")
@@ -209,94 +274,104 @@ def generate_draft() -> str:
 
     date_str = format_date(release_date)
     last_date = get_last_version()
+    last_tag = get_last_version_tag()
 
-    lines = []
-    lines.append(f"## [{date_str}] - Version {current_version}")
+    yield f"## [{date_str}] - Version {current_version}"
     if notes:
-        lines.append(f"\n{notes}\n")
+        yield f"\n{notes}\n"
 
     # Collect data
     plans = get_completed_plans(last_date)
     experiments = get_completed_experiments(last_date)
-    commits = get_git_commits(last_date)
     deprecated = get_deprecated_docs()
 
-    # Group commits by type
-    feat_commits = [c for c in commits if c.get("type") == "feat"]
-    fix_commits = [c for c in commits if c.get("type") == "fix"]
-    refactor_commits = [c for c in commits if c.get("type") == "refactor"]
-    other_commits = [
-        c for c in commits if c.get("type") not in ("feat", "fix", "refactor")
-    ]
+    # Group commits by type while streaming git log
+    groups: dict[str, list[dict]] = {"feat": [], "fix": [], "refactor": [], "other": []}
+    commit_count = 0
+    for commit in iter_git_commits(last_date, last_tag):
+        commit_count += 1
+        groups.get(commit.get("type"), groups["other"]).append(commit)
+    feat_commits = groups["feat"]
+    fix_commits = groups["fix"]
+    refactor_commits = groups["refactor"]
+    other_commits = groups["other"]
 
     # Features (from plans and feat commits)
     if plans or feat_commits:
-        lines.append("\n### ✅ Features")
+        yield "\n### ✅ Features"
         for plan in plans:
-            lines.append(f"- **{plan['title']}** ({plan['key']})")
+            yield f"- **{plan['title']}** ({plan['key']})"
             if plan.get("owner"):
-                lines.append(f"  - Owner: {plan['owner']}")
-        for commit in feat_commits:
-            lines.append(f"- {commit['description']}")
-            if commit.get("scope"):
-                lines.append(f"  - Scope: {commit['scope']}")
+                yield f"  - Owner: {plan['owner']}"
+        yield from _commit_lines(feat_commits)
 
     # Experiments
     if experiments:
-        lines.append("\n### 🧪 Experiments")
+        yield "\n### 🧪 Experiments"
         for exp in experiments:
-            lines.append(f"- **{exp['title']}** ({exp['key']})")
+            yield f"- **{exp['title']}** ({exp['key']})"
             if exp.get("objective"):
-                lines.append(f"  - Objective: {exp['objective']}")
+                yield f"  - Objective: {exp['objective']}"
             if exp.get("run_count"):
-                lines.append(f"  - Runs: {exp['run_count']}")
+                yield f"  - Runs: {exp['run_count']}"
 
     # Fixes
     if fix_commits:
-        lines.append("\n### 🐛 Fixes")
-        for commit in fix_commits:
-            lines.append(f"- {commit['description']}")
-            if commit.get("scope"):
-                lines.append(f"  - Scope: {commit['scope']}")
+        yield "\n### 🐛 Fixes"
+        yield from _commit_lines(fix_commits)
 
     # Refactoring
     if refactor_commits:
-        lines.append("\n### 🔧 Refactoring")
-        for commit in refactor_commits:
-            lines.append(f"- {commit['description']}")
-            if commit.get("scope"):
-                lines.append(f"  - Scope: {commit['scope']}")
+        yield "\n### 🔧 Refactoring"
+        yield from _commit_lines(refactor_commits)
 
     # Documentation
     if deprecated:
-        lines.append("\n### 📚 Documentation")
-        lines.append("- Deprecated outdated documentation:")
+        yield "\n### 📚 Documentation"
+        yield "- Deprecated outdated documentation:"
         for doc in deprecated:
-            lines.append(f"  - {doc['title']} ({doc['path']})")
+            yield f"  - {doc['title']} ({doc['path']})"
 
     # Other changes
     if other_commits:
-        lines.append("\n### 📋 Other Changes")
+        yield "\n### 📋 Other Changes"
         for commit in other_commits:
             commit_type = commit.get("type", "change")
-            lines.append(f"- [{commit_type}] {commit['description']}")
+            yield f"- [{commit_type}] {commit['description']}"
 
     # Summary
-    total_items = len(plans) + len(experiments) + len(commits) + len(deprecated)
+    total_items = len(plans) + len(experiments) + commit_count + len(deprecated)
     if total_items > 0:
-        lines.append("\n### 📊 Summary")
-        lines.append(f"- Completed Plans: {len(plans)}")
-        lines.append(f"- Experiments: {len(experiments)}")
-        lines.append(f"- Git Commits: {len(commits)}")
-        lines.append(f"- Deprecated Docs: {len(deprecated)}")
-        lines.append(f"\n**Total**: {total_items} items")
-
-    lines.append("\n---")
-    lines.append(
-        "\n*This draft was automatically generated. Review and edit before merging into CHANGELOG.md*"
-    )
+        yield "\n### 📊 Summary"
+        yield f"- Completed Plans: {len(plans)}"
+        yield f"- Experiments: {len(experiments)}"
+        yield f"- Git Commits: {commit_count}"
+        yield f"- Deprecated Docs: {len(deprecated)}"
+        yield f"\n**Total**: {total_items} items"
+
+    yield "\n---"
+    yield "\n*This draft was automatically generated. Review and edit before merging into CHANGELOG.md*"
 
-    return "\n".join(lines)
+
+def _commit_lines(commits: list[dict]) -> Iterator[str]:
+    for commit in commits:
+        yield f"- {commit['description']}"
+        if commit.get("scope"):
+            yield f"  - Scope: {commit['scope']}"
+
+
+def write_draft(stream: TextIO) -> None:
+    """Render the draft directly to an open text stream."""
+    separator = ""
+    for line in iter_draft_lines():
+        stream.write(separator)
+        stream.write(line)
+        separator = "\n"
+
+
+def generate_draft() -> str:
+    """Generate changelog draft from all sources."""
+    return "\n".join(iter_draft_lines())
 
 
 def main() -> int:
@@ -312,18 +387,23 @@ def main() -> int:
     args = parser.parse_args()
 
     try:
-        draft = generate_draft()
         if args.preview:
-            print(draft)
+            write_draft(sys.stdout)
+            sys.stdout.write("\n")
         else:
             output_path = Path(args.output)
-            output_path.write_text(draft, encoding="utf-8")
+            tmp_path = output_path.with_name(output_path.name + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                write_draft(f)
+            os.replace(tmp_path, output_path)
             print(f"✅ Generated changelog draft: {output_path}")
             print("📝 Review and edit before merging into CHANGELOG.md")
         return 0
     except Exception as e:
         print(f"❌ Error generating draft: {e}")
         return 1
+    finally:
+        close_tracking_connection()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+"""
+External Link Checker
+
+Concurrent, cached reachability checks for external documentation links:
+- Global deduplication: every URL is checked at most once per run
+- Thread pool with per-host connection pooling, concurrency caps and pacing
+- Persistent TTL cache of results under ``.agentqms/cache/``
+- Offline mode that answers from the cache only
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from AgentQMS.agent_tools.utils.paths import get_project_root
+
+DEFAULT_CACHE_FILE = Path(".agentqms") / "cache" / "link_cache.json"
+
+
+@dataclass
+class LinkCheckResult:
+    """Outcome of checking one external URL."""
+
+    url: str
+    ok: bool
+    status: int | None
+    error: str | None
+    checked_at: float
+    cached: bool = False
+    skipped: bool = False
+
+
+class _HostGate:
+    """Caps concurrent requests to one host and spaces them out."""
+
+    def __init__(self, max_concurrent: int, min_interval: float) -> None:
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._min_interval = min_interval
+        self._next_slot = 0.0
+
+    def __enter__(self) -> _HostGate:
+        self._semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._min_interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+class ExternalLinkChecker:
+    """Checks external URLs concurrently with a persistent result cache."""
+
+    def __init__(
+        self,
+        cache_file: str | Path | None = None,
+        ttl_seconds: float = 24 * 3600,
+        failure_ttl_seconds: float = 3600,
+        offline: bool = False,
+        use_cache: bool = True,
+        max_workers: int = 16,
+        per_host_concurrency: int = 4,
+        per_host_interval: float = 0.1,
+        timeout: float = 10,
+    ) -> None:
+        self.cache_file = Path(cache_file or get_project_root() / DEFAULT_CACHE_FILE)
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.offline = offline
+        self.use_cache = use_cache
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+
+        self._cache: dict[str, dict] = self._load_cache() if use_cache else {}
+        self._results: dict[str, LinkCheckResult] = {}
+        self._sessions: dict[str, requests.Session] = {}
+        self._gates: dict[str, _HostGate] = {}
+        self._host_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def check(self, url: str) -> LinkCheckResult:
+        """Check a single URL (deduplicated and cached)."""
+        return self.check_many([url])[url]
+
+    def check_many(self, urls) -> dict[str, LinkCheckResult]:
+        """Check many URLs concurrently; each distinct URL is fetched once."""
+        unique = list(dict.fromkeys(urls))
+        to_fetch = []
+        for url in unique:
+            if url in self._results:
+                continue
+            cached = self._cached_result(url)
+            if cached is not None:
+                self._results[url] = cached
+            elif self.offline:
+                self._results[url] = LinkCheckResult(
+                    url, True, None, "not checked (offline)", time.time(), skipped=True
+                )
+            else:
+                to_fetch.append(url)
+
+        if to_fetch:
+            workers = max(1, min(self.max_workers, len(to_fetch)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for result in pool.map(self._fetch, to_fetch):
+                    self._results[result.url] = result
+                    self._cache[result.url] = {
+                        "ok": result.ok,
+                        "status": result.status,
+                        "error": result.error,
+                        "checked_at": result.checked_at,
+                    }
+            if self.use_cache:
+                self._save_cache()
+
+        return {url: self._results[url] for url in unique}
+
+    def stats(self) -> dict[str, int]:
+        """Summarize how results were obtained in this run."""
+        results = self._results.values()
+        return {
+            "unique_urls": len(self._results),
+            "fetched": sum(1 for r in results if not r.cached and not r.skipped),
+            "cached": sum(1 for r in results if r.cached),
+            "skipped": sum(1 for r in results if r.skipped),
+            "broken": sum(1 for r in results if not r.ok),
+        }
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _host_resources(self, url: str) -> tuple[requests.Session, _HostGate]:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.per_host_concurrency
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._gates[host] = _HostGate(
+                    self.per_host_concurrency, self.per_host_interval
+                )
+            return self._sessions[host], self._gates[host]
+
+    def _fetch(self, url: str) -> LinkCheckResult:
+        session, gate = self._host_resources(url)
+        try:
+            with gate:
+                response = session.head(url, timeout=self.timeout, allow_redirects=True)
+                # Some servers reject HEAD; fall back to a streamed GET
+                if response.status_code in (405, 501):
+                    response = session.get(
+                        url, timeout=self.timeout, allow_redirects=True, stream=True
+                    )
+                    response.close()
+            ok = response.status_code < 400
+            return LinkCheckResult(url, ok, response.status_code, None, time.time())
+        except Exception as e:
+            return LinkCheckResult(url, False, None, str(e), time.time())
+
+    def _cached_result(self, url: str) -> LinkCheckResult | None:
+        entry = self._cache.get(url)
+        if not entry:
+            return None
+        ttl = self.ttl_seconds if entry.get("ok") else self.failure_ttl_seconds
+        # Offline runs accept stale entries rather than nothing at all
+        if not self.offline and time.time() - entry.get("checked_at", 0) > ttl:
+            return None
+        return LinkCheckResult(
+            url,
+            bool(entry.get("ok")),
+            entry.get("status"),
+            entry.get("error"),
+            entry.get("checked_at", 0),
+            cached=True,
+        )
+
+    def _load_cache(self) -> dict[str, dict]:
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_cache(self) -> None:
+        # Drop entries that expired long ago so the cache stays bounded
+        horizon = time.time() - max(self.ttl_seconds, self.failure_ttl_seconds) * 7
+        data = {
+            url: entry
+            for url, entry in self._cache.items()
+            if entry.get("checked_at", 0) >= horizon
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.cache_file)
+
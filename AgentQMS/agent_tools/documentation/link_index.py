@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Documentation Link Graph Index
+
+Parses every documentation file once and records:
+- GitHub-style heading anchors (slugs)
+- Outgoing links with line numbers
+- Incoming backlinks (derived from all outgoing links)
+
+The index is persisted under ``.agentqms/cache/`` and refreshed
+incrementally: only files whose mtime or size changed are re-parsed. Link
+validation then reduces to set lookups, and the same graph answers
+"which documents are orphaned?" and "what breaks if this file is renamed?".
+
+Usage:
+    python link_index.py docs/ --check
+    python link_index.py docs/ --orphans
+    python link_index.py docs/ --impact docs/ai_handbook/index.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Any
+
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+PROJECT_ROOT = ensure_project_root_on_sys_path()
+
+INDEX_VERSION = 1
+DOC_EXTENSIONS = {".md", ".markdown", ".txt", ".rst"}
+# Documents that are expected to have no inbound links
+ENTRY_POINTS = {"README.md", "INDEX.md", "index.md", "CHANGELOG.md", "CONTRIBUTING.md"}
+
+_MD_LINK = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_REF_LINK = re.compile(r"\[([^\]]+)\]\[([^\]]+)\]")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_INLINE_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_SLUG_DROP = re.compile(r"[^\w\- ]", re.UNICODE)
+
+
+def github_slug(heading: str) -> str:
+    """Return the GitHub anchor slug for a heading text (without dedup suffix)."""
+    text = _INLINE_LINK.sub(r"\1", heading)
+    text = text.replace("`", "")
+    text = unicodedata.normalize("NFC", text).strip().lower()
+    text = _SLUG_DROP.sub("", text)
+    return text.replace(" ", "-")
+
+
+def parse_document(content: str) -> tuple[list[str], list[tuple[str, int]]]:
+    """Extract heading slugs and outgoing links from a document in one pass."""
+    slugs: list[str] = []
+    seen: dict[str, int] = {}
+    links: list[tuple[str, int]] = []
+    in_fence = False
+
+    for line_num, line in enumerate(content.splitlines(), 1):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            heading = _HEADING.match(line)
+            if heading:
+                slug = github_slug(heading.group(2))
+                count = seen.get(slug, 0)
+                seen[slug] = count + 1
+                slugs.append(slug if count == 0 else f"{slug}-{count}")
+
+        # Link extraction matches LinkValidator.extract_links (fences included)
+        for _text, url in _MD_LINK.findall(line):
+            links.append((url.strip(), line_num))
+        for _text, ref in _REF_LINK.findall(line):
+            links.append((f"#{ref}", line_num))
+
+    return slugs, links
+
+
+def is_external(url: str) -> bool:
+    return url.startswith(("http://", "https://", "mailto:", "tel:"))
+
+
+class LinkIndex:
+    """Persistent link graph for a documentation tree."""
+
+    def __init__(self, docs_root: str | Path, index_file: str | Path | None = None):
+        self.docs_root = Path(docs_root).resolve()
+        # The root as given, for paths reached through a symlinked docs_root
+        self._given_root = Path(os.path.abspath(docs_root))
+        if index_file is None:
+            digest = hashlib.sha1(str(self.docs_root).encode("utf-8")).hexdigest()[:12]
+            index_file = (
+                PROJECT_ROOT / ".agentqms" / "cache" / f"link_index_{digest}.json"
+            )
+        self.index_file = Path(index_file)
+        self.files: dict[str, dict[str, Any]] = {}
+        self.backlinks: dict[str, list[tuple[str, int, str]]] = {}
+        self._slug_sets: dict[str, set[str]] = {}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def update(self) -> dict[str, int]:
+        """Re-parse only new or changed files and drop deleted ones."""
+        seen: set[str] = set()
+        changed = 0
+        for dirpath, _dirnames, filenames in os.walk(self.docs_root):
+            for name in filenames:
+                path = Path(dirpath) / name
+                if path.suffix not in DOC_EXTENSIONS:
+                    continue
+                rel = self.relpath(path)
+                seen.add(rel)
+                if self._refresh(rel, path):
+                    changed += 1
+
+        removed = [rel for rel in self.files if rel not in seen]
+        for rel in removed:
+            del self.files[rel]
+
+        if changed or removed:
+            self._rebuild_derived()
+            self.save()
+        return {"files": len(self.files), "changed": changed, "removed": len(removed)}
+
+    def update_paths(self, paths: list[str | Path]) -> None:
+        """Refresh specific files, e.g. from a file watcher or workflow hook."""
+        for path in paths:
+            path = Path(path).resolve()
+            rel = self.relpath(path)
+            if path.exists():
+                self._refresh(rel, path)
+            else:
+                self.files.pop(rel, None)
+        self._rebuild_derived()
+        self.save()
+
+    def _refresh(self, rel: str, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        record = self.files.get(rel)
+        if (
+            record is not None
+            and record["mtime_ns"] == stat.st_mtime_ns
+            and record["size"] == stat.st_size
+        ):
+            return False
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            content = ""
+        slugs, links = parse_document(content)
+        self.files[rel] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "slugs": slugs,
+            "links": [[url, line] for url, line in links],
+        }
+        return True
+
+    def _rebuild_derived(self) -> None:
+        self._slug_sets = {rel: set(rec["slugs"]) for rel, rec in self.files.items()}
+        backlinks: dict[str, list[tuple[str, int, str]]] = {}
+        for source, record in self.files.items():
+            for url, line in record["links"]:
+                target, _anchor = self.resolve(source, url)
+                if target is not None and target != source:
+                    backlinks.setdefault(target, []).append((source, line, url))
+        self.backlinks = backlinks
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if data.get("version") != INDEX_VERSION or data.get("docs_root") != str(
+            self.docs_root
+        ):
+            return
+        self.files = data.get("files", {})
+        self._rebuild_derived()
+
+    def save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "docs_root": str(self.docs_root),
+            "files": self.files,
+            "backlinks": {
+                target: [list(entry) for entry in entries]
+                for target, entries in sorted(self.backlinks.items())
+            },
+        }
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_file, self.index_file)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def relpath(self, path: str | Path) -> str:
+        """Docs-root relative POSIX path; ValueError if ``path`` is outside the root.
+
+        The path is tried as written (so a symlinked file inside the tree keeps
+        its in-tree name) and then fully resolved (so files reached through a
+        symlinked docs root still match).
+        """
+        path = Path(path)
+        if not path.is_absolute():
+            path = Path.cwd() / path
+        normalized = Path(os.path.normpath(path))
+        for candidate, root in (
+            (normalized, self.docs_root),
+            (normalized, self._given_root),
+            (path.resolve(), self.docs_root),
+        ):
+            if candidate.is_relative_to(root):
+                return candidate.relative_to(root).as_posix()
+        raise ValueError(f"{path} is not under {self.docs_root}")
+
+    def resolve(self, source: str, url: str) -> tuple[str | None, str | None]:
+        """Resolve a link to (indexed target, anchor).
+
+        The target is ``None`` for external links and for paths outside the
+        indexed tree; same-file anchors resolve to ``source``.
+        """
+        if is_external(url):
+            return None, None
+        path_part, _, anchor = url.partition("#")
+        path_part = path_part.split("?", 1)[0]
+        if not path_part:
+            return source, anchor or None
+        joined = os.path.normpath(
+            os.path.join(os.path.dirname(source), path_part)
+        ).replace(os.sep, "/")
+        if joined.startswith("../") or joined == "..":
+            return None, anchor or None
+        if joined not in self.files and not Path(joined).suffix:
+            if f"{joined}.md" in self.files:
+                joined = f"{joined}.md"
+        return (joined if joined in self.files else None), anchor or None
+
+    def has_anchor(self, rel: str, anchor: str) -> bool:
+        slugs = self._slug_sets.get(rel)
+        if slugs is None:
+            return False
+        return anchor.lower() in slugs
+
+    def check_link(self, source: str, url: str) -> bool:
+        """Validate an internal link using only index lookups where possible."""
+        if is_external(url):
+            return True
+        target, anchor = self.resolve(source, url)
+        if target is None:
+            # Non-document targets (images, directories, files outside the
+            # tree) still need the filesystem
+            path_part = url.partition("#")[0].split("?", 1)[0]
+            candidate = (self.docs_root / source).parent / path_part
+            if candidate.exists():
+                return True
+            return not candidate.suffix and candidate.with_suffix(".md").exists()
+        if anchor:
+            return self.has_anchor(target, anchor)
+        return True
+
+    def broken_links(self) -> list[tuple[str, int, str]]:
+        """Return (source, line, url) for every broken internal link."""
+        broken = []
+        for source, record in sorted(self.files.items()):
+            for url, line in record["links"]:
+                if not self.check_link(source, url):
+                    broken.append((source, line, url))
+        return broken
+
+    def orphans(self) -> list[str]:
+        """Documents that no other document links to."""
+        return sorted(
+            rel
+            for rel in self.files
+            if rel not in self.backlinks and Path(rel).name not in ENTRY_POINTS
+        )
+
+    def rename_impact(self, rel: str) -> list[tuple[str, int, str]]:
+        """Links (source, line, url) that break if ``rel`` is renamed or moved."""
+        return sorted(self.backlinks.get(rel, []))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Documentation link graph index")
+    parser.add_argument("docs_root", help="Documentation root directory")
+    parser.add_argument("--check", action="store_true", help="Report broken internal links")
+    parser.add_argument("--orphans", action="store_true", help="List orphaned documents")
+    parser.add_argument("--impact", help="Show inbound links to a document")
+    parser.add_argument("--json", action="store_true", help="Emit JSON output")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.docs_root):
+        print(f"Error: Documentation root '{args.docs_root}' does not exist")
+        sys.exit(1)
+
+    index = LinkIndex(args.docs_root)
+    stats = index.update()
+    output: dict[str, Any] = {"index": stats}
+    exit_code = 0
+
+    if args.check:
+        broken = index.broken_links()
+        output["broken_links"] = [
+            {"file": source, "line": line, "url": url} for source, line, url in broken
+        ]
+        exit_code = 1 if broken else 0
+    if args.orphans:
+        output["orphans"] = index.orphans()
+    if args.impact:
+        rel = index.relpath(args.impact)
+        output["impact"] = [
+            {"file": source, "line": line, "url": url}
+            for source, line, url in index.rename_impact(rel)
+        ]
+
+    if args.json:
+        print(json.dumps(output, indent=2))
+    else:
+        print(
+            f"Indexed {stats['files']} files "
+            f"({stats['changed']} re-parsed, {stats['removed']} removed)"
+        )
+        for entry in output.get("broken_links", []):
+            print(f"❌ {entry['file']}:{entry['line']}: {entry['url']}")
+        if "orphans" in output:
+            print(f"\n📭 Orphaned documents ({len(output['orphans'])}):")
+            for rel in output["orphans"]:
+                print(f"  - {rel}")
+        if "impact" in output:
+            print(f"\n🔗 Inbound links to {args.impact} ({len(output['impact'])}):")
+            for entry in output["impact"]:
+                print(f"  - {entry['file']}:{entry['line']}: {entry['url']}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,47 @@ Documentation Link Validator
 
 Validates internal and external links in documentation files.
 Checks for broken internal references and unreachable external URLs.
+
+Internal links and anchors are checked against the persistent link graph
+index (see ``link_index.py``), which re-parses only files that changed.
+External URLs are collected across all files, deduplicated and checked
+concurrently at the end of the run, with results cached between runs.
+
+Usage:
+    python validate_links.py docs/
+    python validate_links.py docs/ --offline
+    python validate_links.py docs/ --workers 32 --cache-ttl-hours 6
 """
 
+import argparse
 import os
 import re
 import sys
 from pathlib import Path
 
-import requests
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.documentation.link_checker import ExternalLinkChecker
+from AgentQMS.agent_tools.documentation.link_index import LinkIndex
 
 
 class LinkValidator:
     """Validates links in documentation files."""
 
-    def __init__(self, docs_root: str):
+    def __init__(
+        self, docs_root: str, link_checker: ExternalLinkChecker | None = None
+    ):
         self.docs_root = Path(docs_root)
         self.errors: list[str] = []
         self.warnings: list[str] = []
+        self.link_checker = link_checker or ExternalLinkChecker()
+
+        # External URL -> every (file, line) that references it
+        self.external_links: dict[str, list[tuple[Path, int]]] = {}
+        self.link_index = LinkIndex(docs_root)
+        self._index_fresh = False
 
         # Common file extensions for documentation
         self.doc_extensions = {".md", ".markdown", ".txt", ".rst"}
@@ -56,72 +80,97 @@ class LinkValidator:
 
         return links
 
+    def _ensure_index(self) -> None:
+        """Bring the link index up to date once per validator run."""
+        if not self._index_fresh:
+            self.link_index.update()
+            self._index_fresh = True
+
+    def _index_relpath(self, file_path: Path) -> str | None:
+        """Path of ``file_path`` in the link index, or None if outside the docs root."""
+        try:
+            return self.link_index.relpath(file_path)
+        except ValueError:
+            return None
+
     def validate_internal_link(self, url: str, file_path: Path) -> bool:
         """Validate internal links (relative paths and anchors)."""
         if url.startswith(("http://", "https://", "mailto:", "tel:")):
             return True  # External links handled separately
 
-        if url.startswith("#"):
-            # Anchor link - check if it exists in the same file
-            return self.check_anchor_exists(file_path, url[1:])
-
-        # Relative path
-        try:
-            target_path = (file_path.parent / url).resolve()
-            if target_path.exists():
-                return True
-            else:
-                # Try with .md extension if not present
-                if not target_path.suffix and "." not in target_path.name:
-                    target_path = target_path.with_suffix(".md")
-                    return target_path.exists()
-        except Exception:
-            pass
-
-        return False
+        self._ensure_index()
+        rel = self._index_relpath(file_path)
+        if rel is None:
+            return False
+        return self.link_index.check_link(rel, url)
 
     def check_anchor_exists(self, file_path: Path, anchor: str) -> bool:
         """Check if an anchor exists in a file."""
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
-                # Look for headers that would generate this anchor
-                # GitHub-style anchor generation: lowercase, spaces to hyphens
-                anchor_pattern = re.compile(
-                    rf"^#+\s+{re.escape(anchor.replace('-', ' '))}",
-                    re.MULTILINE | re.IGNORECASE,
-                )
-                return bool(anchor_pattern.search(content))
-        except Exception:
+        # Anchors are precomputed GitHub-style heading slugs
+        self._ensure_index()
+        rel = self._index_relpath(file_path)
+        if rel is None:
             return False
+        return self.link_index.has_anchor(rel, anchor)
 
     def validate_external_link(self, url: str) -> bool:
         """Validate external links by making HTTP requests."""
-        try:
-            # Only check HTTP/HTTPS links
-            if not url.startswith(("http://", "https://")):
-                return True
-
-            response = requests.head(url, timeout=10, allow_redirects=True)
-            return response.status_code < 400
-        except Exception:
-            return False
+        # Only check HTTP/HTTPS links
+        if not url.startswith(("http://", "https://")):
+            return True
+        return self.link_checker.check(url).ok
 
     def validate_file(self, file_path: Path) -> None:
-        """Validate all links in a single file."""
-        links = self.extract_links(file_path)
+        """Validate all links in a single file.
+
+        External links are only collected here; they are checked together in
+        :meth:`validate_external_links`.
+        """
+        self._ensure_index()
+        rel = self._index_relpath(file_path)
+        if rel is None:
+            self.errors.append(
+                f"Cannot validate {file_path}: outside docs root {self.docs_root}"
+            )
+            return
+        record = self.link_index.files.get(rel)
+        if record is not None:
+            links = [(url, line_num) for url, line_num in record["links"]]
+        else:
+            links = self.extract_links(file_path)
 
         for url, line_num in links:
-            if not self.validate_internal_link(url, file_path):
-                if url.startswith(("http://", "https://")):
-                    if not self.validate_external_link(url):
-                        self.errors.append(
-                            f"Broken external link in {file_path}:{line_num}: {url}"
-                        )
-                else:
-                    self.errors.append(
-                        f"Broken internal link in {file_path}:{line_num}: {url}"
-                    )
+            if url.startswith(("http://", "https://")):
+                self.external_links.setdefault(url, []).append((file_path, line_num))
+            elif not self.validate_internal_link(url, file_path):
+                self.errors.append(
+                    f"Broken internal link in {file_path}:{line_num}: {url}"
+                )
+
+    def validate_external_links(self) -> None:
+        """Check every collected external URL once, concurrently."""
+        if not self.external_links:
+            return
+
+        results = self.link_checker.check_many(self.external_links)
+        for url, result in results.items():
+            if result.ok:
+                continue
+            for file_path, line_num in self.external_links[url]:
+                self.errors.append(
+                    f"Broken external link in {file_path}:{line_num}: {url}"
+                )
+
+        stats = self.link_checker.stats()
+        print(
+            f"Checked {stats['unique_urls']} unique external URLs "
+            f"({stats['fetched']} fetched, {stats['cached']} cached, "
+            f"{stats['skipped']} skipped offline)"
+        )
+        if stats["skipped"]:
+            self.warnings.append(
+                f"{stats['skipped']} external links were not checked (offline, no cache entry)"
+            )
 
     def validate_all(self) -> bool:
         """Validate all documentation files."""
@@ -132,11 +181,17 @@ class LinkValidator:
             return True
 
         print(f"Found {len(doc_files)} documentation files to validate")
+        stats = self.link_index.update()
+        self._index_fresh = True
+        print(f"Link index: {stats['files']} files, {stats['changed']} re-parsed")
 
         for file_path in doc_files:
             print(f"Validating {file_path}")
             self.validate_file(file_path)
 
+        self.validate_external_links()
+        self.link_checker.close()
+
         # Report results
         if self.errors:
             print(f"\n❌ Found {len(self.errors)} link errors:")
@@ -150,17 +205,44 @@ class LinkValidator:
 
 def main() -> None:
     """Main entry point."""
-    if len(sys.argv) != 2:
-        print("Usage: python validate_links.py <docs_root>")
-        sys.exit(1)
-
-    docs_root = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Documentation link validator")
+    parser.add_argument("docs_root", help="Documentation root directory")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Do not contact external hosts; use cached results only",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore and do not update the link cache"
+    )
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=24,
+        help="How long successful external checks stay cached (default: 24)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=16, help="Concurrent external checks"
+    )
+    parser.add_argument(
+        "--per-host", type=int, default=4, help="Concurrent requests per host"
+    )
+    args = parser.parse_args()
+
+    docs_root = args.docs_root
 
     if not os.path.exists(docs_root):
         print(f"Error: Documentation root '{docs_root}' does not exist")
         sys.exit(1)
 
-    validator = LinkValidator(docs_root)
+    link_checker = ExternalLinkChecker(
+        ttl_seconds=args.cache_ttl_hours * 3600,
+        offline=args.offline,
+        use_cache=not args.no_cache,
+        max_workers=args.workers,
+        per_host_concurrency=args.per_host,
+    )
+    validator = LinkValidator(docs_root, link_checker)
     success = validator.validate_all()
 
     if validator.warnings:
@@ -4,23 +4,155 @@ Template Validation Script
 
 Validates documentation files against standardized templates.
 Ensures new documents follow proper structure and formatting.
+
+Each document is scanned once for its outline (level-2 headings and
+``ai_cue`` comments together), checked against a section matcher compiled
+once per template type, and the findings are cached by content hash under
+``.agentqms/cache/`` so unchanged documents are not re-checked. Cache misses
+can be spread over a process pool.
+
+Usage:
+    python validate_templates.py <templates_dir> <docs_dir>
+    python validate_templates.py <templates_dir> <docs_dir> --workers 0
+    python validate_templates.py <templates_dir> <docs_dir> --no-cache
 """
 
+import argparse
+import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.utils.content_cache import ContentHashCache, content_hash
+
+# Bump when the checks below change so cached findings are discarded
+RULES_VERSION = "1"
+
+# Level-2 headings and AI cue comments, matched in a single scan
+_OUTLINE = re.compile(
+    r"^##\s+(?P<heading>.+)$|<!-- ai_cue:(?P<cue_key>\w+)=(?P<cue_value>.+?) -->",
+    re.MULTILINE,
+)
+_BOLD_HEADING = re.compile(r"^\*\*(.+)\*\*$")
+_PLACEHOLDER = re.compile(r"\{\{[^}]+\}\}")
+
+
+def iter_outline(content: str) -> Iterator[tuple[str, str, str]]:
+    """Yield ``("heading", text, "")`` and ``("ai_cue", key, value)`` in document order."""
+    for match in _OUTLINE.finditer(content):
+        heading = match.group("heading")
+        if heading is not None:
+            heading = heading.strip()
+            # Remove ** markers if present
+            bold = _BOLD_HEADING.match(heading)
+            yield "heading", bold.group(1) if bold else heading, ""
+        else:
+            yield "ai_cue", match.group("cue_key"), match.group("cue_value").strip()
+
+
+def extract_outline(content: str) -> tuple[list[str], dict[str, str]]:
+    """Return the section headers and AI cues of a document in one pass."""
+    sections: list[str] = []
+    cues: dict[str, str] = {}
+    for kind, key, value in iter_outline(content):
+        if kind == "heading":
+            sections.append(key)
+        else:
+            cues[key] = value
+    return sections, cues
+
+
+class SectionMatcher:
+    """Required-section check for one template type, built once per run."""
+
+    def __init__(self, template_type: str, required: list[str]):
+        self.template_type = template_type
+        self.required = tuple(required)
+        self._required_set = frozenset(required)
+
+    def missing(self, sections: list[str]) -> list[str]:
+        """Return required sections absent from ``sections``, in template order."""
+        present = set(sections)
+        if self._required_set <= present:
+            return []
+        return [section for section in self.required if section not in present]
+
+
+def check_document(
+    content: str,
+    display_path: str,
+    expected_filename: str,
+    matcher: SectionMatcher | None,
+    required_ai_cues: tuple[str, ...],
+) -> tuple[list[str], list[str]]:
+    """Check one document's content and return ``(errors, warnings)``.
+
+    Pure function of its arguments so it can run in a worker process and its
+    result can be cached by content hash.
+    """
+    errors: list[str] = []
+    warnings: list[str] = []
+    sections, ai_cues = extract_outline(content)
+
+    # Check AI cues
+    for cue in required_ai_cues:
+        if cue not in ai_cues:
+            errors.append(f"Missing AI cue '{cue}' in {display_path}")
+        elif not ai_cues[cue] or ai_cues[cue] == "{{" + cue + "}}":
+            errors.append(f"Empty or placeholder AI cue '{cue}' in {display_path}")
+
+    # Check required sections
+    if matcher is not None:
+        for req_section in matcher.missing(sections):
+            errors.append(f"Missing required section '{req_section}' in {display_path}")
+
+    # Check for template placeholders
+    if "{{" in content:
+        placeholders = _PLACEHOLDER.findall(content)
+        if placeholders:
+            unique_placeholders = dict.fromkeys(placeholders)
+            warnings.append(
+                f"Unresolved template placeholders in {display_path}: {', '.join(unique_placeholders)}"
+            )
+
+    # Check filename header
+    if f"# **filename: {expected_filename}**" not in content:
+        errors.append(f"Incorrect or missing filename header in {display_path}")
+
+    return errors, warnings
+
+
+def _check_document_job(job: tuple) -> tuple[list[str], list[str]]:
+    return check_document(*job)
 
 
 class TemplateValidator:
     """Validates documentation files against templates."""
 
-    def __init__(self, templates_dir: str, docs_dir: str):
+    def __init__(
+        self,
+        templates_dir: str,
+        docs_dir: str,
+        workers: int = 1,
+        use_cache: bool = True,
+    ):
         self.templates_dir = Path(templates_dir)
         self.docs_dir = Path(docs_dir)
         self.errors: list[str] = []
         self.warnings: list[str] = []
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = (
+            ContentHashCache("template_validation", version=RULES_VERSION)
+            if use_cache
+            else None
+        )
 
         # Template requirements
         self.required_sections = {
@@ -83,6 +215,14 @@ class TemplateValidator:
 
         self.required_ai_cues = ["priority", "use_when"]
 
+        self.section_matchers = {
+            template_type: SectionMatcher(template_type, required)
+            for template_type, required in self.required_sections.items()
+        }
+        self._rules_fingerprint = content_hash(
+            json.dumps([self.required_sections, self.required_ai_cues], sort_keys=True)
+        )
+
     def load_template(self, template_name: str) -> str | None:
         """Load a template file."""
         template_path = self.templates_dir / f"{template_name}.md"
@@ -93,69 +233,61 @@ class TemplateValidator:
 
     def extract_sections(self, content: str) -> list[str]:
         """Extract section headers from markdown content."""
-        # Find all level 2 headers (## Header)
-        headers = re.findall(r"^##\s+(.+)$", content, re.MULTILINE)
-        # Strip ** markers from section names
-        cleaned_headers = []
-        for h in headers:
-            # Remove ** markers if present
-            h = h.strip()
-            h = re.sub(r"^\*\*(.+)\*\*$", r"\1", h)
-            cleaned_headers.append(h)
-        return cleaned_headers
+        return extract_outline(content)[0]
 
     def extract_ai_cues(self, content: str) -> dict[str, str]:
         """Extract AI cue comments from content."""
-        cues = {}
-        cue_pattern = r"<!-- ai_cue:(\w+)=(.+?) -->"
-        matches = re.findall(cue_pattern, content)
-        for key, value in matches:
-            cues[key] = value.strip()
-        return cues
+        return extract_outline(content)[1]
 
     def validate_file_structure(self, file_path: Path, template_type: str) -> None:
         """Validate a file against its template structure."""
+        job = self._prepare_job(file_path, template_type)
+        if job is None:
+            return
+        cache_key, args = job
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record(cached[0], cached[1])
+                return
+        errors, warnings = check_document(*args)
+        self._store(cache_key, errors, warnings)
+
+    def _prepare_job(
+        self, file_path: Path, template_type: str
+    ) -> tuple[str | None, tuple] | None:
+        """Read a file and return its cache key and ``check_document`` arguments."""
         try:
             with open(file_path, encoding="utf-8") as f:
                 content = f.read()
         except Exception as e:
             self.errors.append(f"Cannot read file {file_path}: {e}")
-            return
-
-        # Check AI cues
-        ai_cues = self.extract_ai_cues(content)
-        for cue in self.required_ai_cues:
-            if cue not in ai_cues:
-                self.errors.append(f"Missing AI cue '{cue}' in {file_path}")
-            elif not ai_cues[cue] or ai_cues[cue] == "{{" + cue + "}}":
-                self.errors.append(
-                    f"Empty or placeholder AI cue '{cue}' in {file_path}"
-                )
-
-        # Check required sections
-        if template_type in self.required_sections:
-            sections = self.extract_sections(content)
-            required = self.required_sections[template_type]
-
-            for req_section in required:
-                if req_section not in sections:
-                    self.errors.append(
-                        f"Missing required section '{req_section}' in {file_path}"
-                    )
-
-        # Check for template placeholders
-        placeholders = re.findall(r"\{\{[^}]+\}\}", content)
-        if placeholders:
-            unique_placeholders = set(placeholders)
-            self.warnings.append(
-                f"Unresolved template placeholders in {file_path}: {', '.join(unique_placeholders)}"
-            )
+            return None
 
-        # Check filename header
+        display_path = str(file_path)
         expected_filename = f"docs/ai_handbook/{file_path.relative_to(self.docs_dir)}"
-        filename_pattern = rf"# \*\*filename: {re.escape(expected_filename)}\*\*"
-        if not re.search(filename_pattern, content, re.MULTILINE):
-            self.errors.append(f"Incorrect or missing filename header in {file_path}")
+        cache_key = None
+        if self.cache is not None:
+            cache_key = content_hash(
+                self._rules_fingerprint, template_type, display_path, expected_filename, content
+            )
+        args = (
+            content,
+            display_path,
+            expected_filename,
+            self.section_matchers.get(template_type),
+            tuple(self.required_ai_cues),
+        )
+        return cache_key, args
+
+    def _record(self, errors: list[str], warnings: list[str]) -> None:
+        self.errors.extend(errors)
+        self.warnings.extend(warnings)
+
+    def _store(self, cache_key: str | None, errors: list[str], warnings: list[str]) -> None:
+        self._record(errors, warnings)
+        if cache_key is not None:
+            self.cache.set(cache_key, [errors, warnings])
 
     def determine_template_type(self, file_path: Path) -> str:
         """Determine which template type a file should follow based on its path."""
@@ -190,10 +322,47 @@ class TemplateValidator:
 
         print(f"Validating {len(doc_files)} documentation files against templates")
 
-        for file_path in doc_files:
+        # Resolve cached results first; only misses are checked, possibly in
+        # worker processes. Results are recorded in file order either way.
+        pending: list[tuple[int, str | None, tuple]] = []
+        results: list[tuple[list[str], list[str]] | None] = [None] * len(doc_files)
+        for position, file_path in enumerate(doc_files):
             template_type = self.determine_template_type(file_path)
             print(f"Validating {file_path} against {template_type} template")
-            self.validate_file_structure(file_path, template_type)
+            job = self._prepare_job(file_path, template_type)
+            if job is None:
+                continue
+            cache_key, args = job
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[position] = (cached[0], cached[1])
+            else:
+                pending.append((position, cache_key, args))
+
+        if self.workers > 1 and len(pending) > 1:
+            workers = min(self.workers, len(pending))
+            chunksize = max(1, len(pending) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(
+                    pool.map(
+                        _check_document_job,
+                        [args for _, _, args in pending],
+                        chunksize=chunksize,
+                    )
+                )
+        else:
+            outcomes = [check_document(*args) for _, _, args in pending]
+
+        for (position, cache_key, _args), (errors, warnings) in zip(pending, outcomes):
+            results[position] = (errors, warnings)
+            if cache_key is not None:
+                self.cache.set(cache_key, [errors, warnings])
+
+        for result in results:
+            if result is not None:
+                self._record(*result)
+        if self.cache is not None:
+            self.cache.save()
 
         # Report results
         if self.errors:
@@ -217,12 +386,26 @@ class TemplateValidator:
 
 def main() -> None:
     """Main entry point."""
-    if len(sys.argv) < 3:
-        print("Usage: python validate_templates.py <templates_dir> <docs_dir>")
-        sys.exit(1)
-
-    templates_dir = sys.argv[1]
-    docs_dir = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Validate documentation files against templates"
+    )
+    parser.add_argument("templates_dir", help="Templates directory")
+    parser.add_argument("docs_dir", help="Documentation directory")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for uncached files (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not update the content-hash result cache",
+    )
+    args = parser.parse_args()
+
+    templates_dir = args.templates_dir
+    docs_dir = args.docs_dir
 
     if not os.path.exists(templates_dir):
         print(f"Error: Templates directory '{templates_dir}' does not exist")
@@ -232,7 +415,9 @@ def main() -> None:
         print(f"Error: Documentation directory '{docs_dir}' does not exist")
         sys.exit(1)
 
-    validator = TemplateValidator(templates_dir, docs_dir)
+    validator = TemplateValidator(
+        templates_dir, docs_dir, workers=args.workers, use_cache=not args.no_cache
+    )
     success = validator.validate_all_files()
 
     report = validator.generate_template_report()
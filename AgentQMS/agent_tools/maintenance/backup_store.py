@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Backup Store for Maintenance Tools
+
+Maintenance fixers (naming fixes, file reorganization, link rewrites) stage
+their file operations in a ``BackupRun`` and apply them as one transaction:
+
+- File contents are stored once as SHA-256 named blobs under
+  ``<root>/blobs/``, so unchanged content is never duplicated across runs
+- Every run has a JSON journal under ``<root>/runs/<run-id>.json``
+  recording each move/write with the content hashes involved; while a run
+  is applied, a small append-only ``<run-id>.progress`` file records which
+  operations have taken effect
+- ``commit()`` validates the whole batch, applies it, and undoes the
+  already-applied operations if any step fails
+- ``rollback(run_id)`` reverses a committed run, restoring moved and
+  rewritten files from their blobs
+
+Usage:
+    python backup_store.py --list
+    python backup_store.py --show <run-id>
+    python backup_store.py --rollback <run-id> [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+DEFAULT_STORE_ROOT = Path("backups") / "store"
+# fsync the progress file once per this many applied operations
+PROGRESS_SYNC_EVERY = 32
+
+
+class BackupStoreError(RuntimeError):
+    """Raised when a run cannot be applied or rolled back."""
+
+
+@dataclass
+class FileOperation:
+    """One journaled file operation.
+
+    ``op`` is ``"move"`` (``src`` -> ``dst``) or ``"write"`` (new content for
+    ``src``). ``before`` is the hash of the content the operation replaced
+    (``None`` for a newly created file) and ``after`` the hash it produced.
+    """
+
+    op: str
+    src: str
+    dst: str | None = None
+    before: str | None = None
+    after: str | None = None
+    mode: int | None = None
+    applied: bool = False
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupStore:
+    """Blob store plus per-run operation journals."""
+
+    def __init__(self, root: str | Path = DEFAULT_STORE_ROOT):
+        self.root = Path(root)
+        self.blobs_dir = self.root / "blobs"
+        self.runs_dir = self.root / "runs"
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest[2:]
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store ``data`` once and return its hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f"{blob.name}.{secrets.token_hex(4)}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, blob)
+        return digest
+
+    def put_file(self, path: str | Path) -> str:
+        """Store a file's content once and return its hash."""
+        return self.put_bytes(Path(path).read_bytes())
+
+    def get_bytes(self, digest: str) -> bytes:
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            raise BackupStoreError(f"Missing backup blob {digest}")
+        return blob.read_bytes()
+
+    # ------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------
+    def begin_run(self, tool: str) -> BackupRun:
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{tool}-{secrets.token_hex(3)}"
+        return BackupRun(self, run_id, tool)
+
+    def journal_path(self, run_id: str) -> Path:
+        return self.runs_dir / f"{run_id}.json"
+
+    def progress_path(self, run_id: str) -> Path:
+        return self.runs_dir / f"{run_id}.progress"
+
+    def load_journal(self, run_id: str) -> dict[str, Any]:
+        """Load a run's journal, replaying its progress file if it was interrupted."""
+        path = self.journal_path(run_id)
+        if not path.exists():
+            raise BackupStoreError(f"Unknown backup run: {run_id}")
+        with open(path, encoding="utf-8") as f:
+            journal = json.load(f)
+        if journal.get("status") == "prepared":
+            operations = journal.get("operations", [])
+            for index in self._read_progress(run_id):
+                if 0 <= index < len(operations):
+                    operations[index]["applied"] = True
+        return journal
+
+    def _read_progress(self, run_id: str) -> list[int]:
+        try:
+            with open(self.progress_path(run_id), encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except OSError:
+            return []
+        # The last line may be torn by a crash mid-write
+        return [int(line) for line in lines if line.isdigit()]
+
+    def write_journal(self, journal: dict[str, Any]) -> None:
+        path = self.journal_path(journal["run_id"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(journal, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        if journal.get("status") != "prepared":
+            self.progress_path(journal["run_id"]).unlink(missing_ok=True)
+
+    def list_runs(self) -> list[dict[str, Any]]:
+        """Summaries of all journaled runs, oldest first."""
+        if not self.runs_dir.exists():
+            return []
+        runs = []
+        for path in sorted(self.runs_dir.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    journal = json.load(f)
+            except (OSError, ValueError):
+                continue
+            runs.append(
+                {
+                    "run_id": journal.get("run_id"),
+                    "tool": journal.get("tool"),
+                    "created_at": journal.get("created_at"),
+                    "status": journal.get("status"),
+                    "operations": len(journal.get("operations", [])),
+                }
+            )
+        return runs
+
+    def rollback(self, run_id: str, dry_run: bool = False) -> list[str]:
+        """Reverse a committed run; return a description of each action.
+
+        Files changed since the run are left alone and reported as conflicts.
+        A run interrupted mid-apply is still ``"prepared"``; its progress file
+        marks the operations known to be applied, and the rest are checked
+        against the filesystem, since the process may have died between
+        applying one and recording it.
+        """
+        journal = self.load_journal(run_id)
+        if journal.get("status") == "rolled_back":
+            raise BackupStoreError(f"Run {run_id} was already rolled back")
+        operations = [FileOperation(**op) for op in journal.get("operations", [])]
+        interrupted = journal.get("status") == "prepared"
+        actions = []
+        for operation in reversed(operations):
+            if not operation.applied and not (interrupted and _looks_applied(operation)):
+                continue
+            actions.append(_undo(self, operation, dry_run))
+        if not dry_run:
+            journal["status"] = "rolled_back"
+            journal["rolled_back_at"] = datetime.now().isoformat()
+            self.write_journal(journal)
+        return actions
+
+
+class BackupRun:
+    """A batch of staged file operations applied as one transaction."""
+
+    def __init__(self, store: BackupStore, run_id: str, tool: str):
+        self.store = store
+        self.run_id = run_id
+        self.tool = tool
+        self.operations: list[FileOperation] = []
+        self.created_at = datetime.now().isoformat()
+        # Original path -> where the staged operations leave it
+        self._locations: dict[str, str] = {}
+        self._staged_writes: dict[int, bytes] = {}
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+    def current_path(self, path: str | Path) -> Path:
+        """Where ``path`` will be once the staged operations are applied."""
+        key = _key(path)
+        return Path(self._locations.get(key, key))
+
+    def is_claimed(self, path: str | Path) -> bool:
+        """True if a staged move already targets ``path``."""
+        key = _key(path)
+        return any(op.op == "move" and op.dst == key for op in self.operations)
+
+    def move(self, src: str | Path, dst: str | Path) -> FileOperation:
+        source = str(self.current_path(src))
+        operation = FileOperation("move", source, _key(dst))
+        self.operations.append(operation)
+        self._locations[_key(src)] = operation.dst
+        if source != _key(src):
+            self._locations[source] = operation.dst
+        return operation
+
+    def write_text(self, path: str | Path, text: str, encoding: str = "utf-8") -> FileOperation:
+        return self.write_bytes(path, text.encode(encoding))
+
+    def write_bytes(self, path: str | Path, data: bytes) -> FileOperation:
+        target = str(self.current_path(path))
+        operation = FileOperation("write", target)
+        self.operations.append(operation)
+        self._staged_writes[id(operation)] = data
+        return operation
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    # ------------------------------------------------------------------
+    # Apply
+    # ------------------------------------------------------------------
+    def commit(self) -> None:
+        """Back up, validate and apply every staged operation, or none."""
+        if not self.operations:
+            return
+        self._validate()
+        self._backup()
+        journal = self._journal("prepared")
+        self.store.write_journal(journal)
+
+        applied: list[FileOperation] = []
+        try:
+            # Progress is appended per operation so a killed run can still be
+            # rolled back without rewriting the whole journal each time
+            with open(self.store.progress_path(self.run_id), "w", encoding="utf-8") as progress:
+                for index, operation in enumerate(self.operations):
+                    self._apply(operation)
+                    operation.applied = True
+                    applied.append(operation)
+                    progress.write(f"{index}\n")
+                    progress.flush()
+                    if len(applied) % PROGRESS_SYNC_EVERY == 0:
+                        os.fsync(progress.fileno())
+        except (OSError, BackupStoreError) as e:
+            for operation in reversed(applied):
+                _undo(self.store, operation, dry_run=False)
+                operation.applied = False
+            self.store.write_journal(self._journal("failed", error=str(e)))
+            raise BackupStoreError(
+                f"Run {self.run_id} failed and was reverted: {e}"
+            ) from e
+
+        self._staged_writes.clear()
+        self.store.write_journal(self._journal("applied"))
+
+    def _validate(self) -> None:
+        """Check the whole batch against the filesystem before touching it."""
+        present: dict[str, bool] = {}
+
+        def exists(path: str) -> bool:
+            if path not in present:
+                present[path] = os.path.exists(path)
+            return present[path]
+
+        for operation in self.operations:
+            if operation.op == "move":
+                if not exists(operation.src):
+                    raise BackupStoreError(f"Source does not exist: {operation.src}")
+                if operation.src != operation.dst and exists(operation.dst):
+                    raise BackupStoreError(f"Target already exists: {operation.dst}")
+                present[operation.src] = False
+                present[operation.dst] = True
+            else:
+                present[operation.src] = True
+
+    def _backup(self) -> None:
+        hashes: dict[str, str | None] = {}
+        for operation in self.operations:
+            path = operation.src
+            if path not in hashes:
+                hashes[path] = self.store.put_file(path) if os.path.exists(path) else None
+                if hashes[path] is not None:
+                    operation.mode = os.stat(path).st_mode & 0o7777
+            operation.before = hashes[path]
+            if operation.op == "move":
+                operation.after = operation.before
+                hashes[operation.dst] = operation.before
+                hashes[path] = None
+            else:
+                data = self._staged_writes[id(operation)]
+                operation.after = self.store.put_bytes(data)
+                hashes[path] = operation.after
+
+    def _apply(self, operation: FileOperation) -> None:
+        if operation.op == "move":
+            if operation.src == operation.dst:
+                return
+            Path(operation.dst).parent.mkdir(parents=True, exist_ok=True)
+            os.replace(operation.src, operation.dst)
+        else:
+            _atomic_write(Path(operation.src), self.store.get_bytes(operation.after))
+
+    def _journal(self, status: str, error: str | None = None) -> dict[str, Any]:
+        journal = {
+            "run_id": self.run_id,
+            "tool": self.tool,
+            "created_at": self.created_at,
+            "status": status,
+            "operations": [asdict(op) for op in self.operations],
+        }
+        if error:
+            journal["error"] = error
+        return journal
+
+
+def _key(path: str | Path) -> str:
+    return os.path.abspath(path)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    tmp.write_bytes(data)
+    if path.exists():
+        shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+
+def _current_digest(path: str) -> str | None:
+    return file_digest(Path(path)) if os.path.isfile(path) else None
+
+
+def _looks_applied(operation: FileOperation) -> bool:
+    """Whether an operation journaled as pending already took effect."""
+    if operation.op == "move":
+        if operation.src == operation.dst:
+            return False
+        return not os.path.exists(operation.src) and _current_digest(operation.dst) == operation.after
+    return operation.before != operation.after and _current_digest(operation.src) == operation.after
+
+
+def _undo(store: BackupStore, operation: FileOperation, dry_run: bool) -> str:
+    """Reverse one applied operation, refusing to clobber later edits."""
+    if operation.op == "move":
+        if operation.src == operation.dst:
+            return f"unchanged: {operation.src}"
+        if os.path.exists(operation.src):
+            return f"conflict: {operation.src} exists again; left {operation.dst} in place"
+        current = _current_digest(operation.dst)
+        if current == operation.after:
+            if not dry_run:
+                os.replace(operation.dst, operation.src)
+            return f"moved back: {operation.dst} -> {operation.src}"
+        if operation.before is None:
+            return f"conflict: {operation.dst} missing and no backup content"
+        if not dry_run:
+            _atomic_write(Path(operation.src), store.get_bytes(operation.before))
+            if operation.mode is not None:
+                os.chmod(operation.src, operation.mode)
+        return f"restored from backup: {operation.src} ({operation.dst} changed since run)"
+
+    current = _current_digest(operation.src)
+    if current != operation.after:
+        return f"conflict: {operation.src} changed since run; not restored"
+    if operation.before is None:
+        if not dry_run:
+            os.remove(operation.src)
+        return f"removed created file: {operation.src}"
+    if not dry_run:
+        _atomic_write(Path(operation.src), store.get_bytes(operation.before))
+    return f"restored: {operation.src}"
+
+
+def add_rollback_arguments(parser: argparse.ArgumentParser) -> None:
+    """CLI flags shared by tools that write through a BackupStore."""
+    parser.add_argument(
+        "--rollback", metavar="RUN_ID", help="Reverse a previous run from its backup journal"
+    )
+    parser.add_argument(
+        "--list-runs", action="store_true", help="List journaled backup runs"
+    )
+    parser.add_argument(
+        "--backup-store",
+        default=str(DEFAULT_STORE_ROOT),
+        help="Content-addressed backup store directory",
+    )
+
+
+def handle_rollback_arguments(args: argparse.Namespace, store: BackupStore) -> bool:
+    """Run ``--list-runs`` / ``--rollback`` if requested; True when handled."""
+    if args.list_runs:
+        runs = store.list_runs()
+        if not runs:
+            print("No backup runs recorded")
+        for run in runs:
+            print(
+                f"{run['run_id']}  {run['status']:<11} {run['operations']:>4} ops  {run['tool']}"
+            )
+        return True
+    if args.rollback:
+        try:
+            actions = store.rollback(args.rollback, dry_run=getattr(args, "dry_run", False))
+        except BackupStoreError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        prefix = "[DRY RUN] " if getattr(args, "dry_run", False) else ""
+        for action in actions:
+            print(f"{prefix}{action}")
+        print(f"{prefix}Rolled back run {args.rollback} ({len(actions)} operations)")
+        return True
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and roll back maintenance runs")
+    parser.add_argument("--store", default=str(DEFAULT_STORE_ROOT), help="Backup store directory")
+    parser.add_argument("--list", action="store_true", help="List journaled runs")
+    parser.add_argument("--show", metavar="RUN_ID", help="Print a run's journal")
+    parser.add_argument("--rollback", metavar="RUN_ID", help="Reverse a run")
+    parser.add_argument("--dry-run", action="store_true", help="Describe rollback actions only")
+    args = parser.parse_args()
+
+    store = BackupStore(args.store)
+    if args.show:
+        print(json.dumps(store.load_journal(args.show), indent=2))
+    elif args.rollback or args.list:
+        args.list_runs = args.list
+        handle_rollback_arguments(args, store)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
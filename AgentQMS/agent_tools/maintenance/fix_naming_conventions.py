@@ -14,15 +14,31 @@ Usage:
     python fix_naming_conventions.py --dry-run
     python fix_naming_conventions.py --file path/to/file.md
     python fix_naming_conventions.py --directory docs/artifacts/
+    python fix_naming_conventions.py --list-runs
+    python fix_naming_conventions.py --rollback <run-id>
+
+Renames are applied as one transaction per invocation through the shared
+content-addressed backup store (see ``backup_store.py``).
 """
 
 import argparse
 import re
-import shutil
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+from AgentQMS.agent_tools.maintenance.backup_store import (
+    BackupRun,
+    BackupStore,
+    BackupStoreError,
+    add_rollback_arguments,
+    handle_rollback_arguments,
+)
+from AgentQMS.agent_tools.maintenance.rename_engine import RenameEngine
+
+TOOL_NAME = "naming_fixes"
+
 
 @dataclass
 class RenameOperation:
@@ -37,9 +53,21 @@ class RenameOperation:
 class NamingConventionFixer:
     """Automatically fixes naming convention violations"""
 
-    def __init__(self, artifacts_root: str = "docs/artifacts"):
+    def __init__(
+        self,
+        artifacts_root: str = "docs/artifacts",
+        backup_store: BackupStore | None = None,
+        rename_engine: RenameEngine | None = None,
+    ):
         self.artifacts_root = Path(artifacts_root)
-        self.backup_dir = Path("backups/naming_fixes")
+        self.backup_store = backup_store or BackupStore()
+        # Rewrites links to renamed files in the same transaction when set
+        self.rename_engine = rename_engine
+        self.backup_dir = self.backup_store.root
+        self._run: BackupRun | None = None
+        self._staged: list[RenameOperation] = []
+        # Set when a batch could not be applied; the CLI exits non-zero
+        self.commit_failed = False
 
         # Define valid prefixes and their expected directories
         self.valid_prefixes = {
@@ -330,11 +358,9 @@ class NamingConventionFixer:
         return type_to_prefix.get(artifact_type)
 
     def create_backup(self, file_path: Path) -> bool:
-        """Create backup of file before renaming"""
+        """Store the file's content in the content-addressed backup store"""
         try:
-            self.backup_dir.mkdir(parents=True, exist_ok=True)
-            backup_path = self.backup_dir / file_path.name
-            shutil.copy2(file_path, backup_path)
+            self.backup_store.put_file(file_path)
             return True
         except Exception as e:
             print(f"Warning: Could not create backup for {file_path}: {e}")
@@ -343,7 +369,7 @@ class NamingConventionFixer:
     def execute_rename_operation(
         self, operation: RenameOperation, dry_run: bool = False
     ) -> bool:
-        """Execute a rename operation"""
+        """Execute a rename operation (staged when a batch is open)"""
         old_path = Path(operation.old_path)
         new_path = Path(operation.new_path)
 
@@ -352,22 +378,54 @@ class NamingConventionFixer:
             print(f"         Reason: {operation.reason}")
             return True
 
-        try:
-            # Create backup
-            self.create_backup(old_path)
+        if self._run is not None:
+            self._run.move(old_path, new_path)
+            self._staged.append(operation)
+            return True
 
-            # Create target directory if it doesn't exist
-            new_path.parent.mkdir(parents=True, exist_ok=True)
+        self.begin_batch()
+        self.execute_rename_operation(operation)
+        return self.commit_batch()
 
-            # Perform rename
-            old_path.rename(new_path)
-            print(f"✅ Renamed: {old_path} -> {new_path}")
-            print(f"   Reason: {operation.reason}")
+    def plan_link_updates(self, operations: list[RenameOperation]) -> str:
+        """Describe the link rewrites the given operations would need"""
+        if self.rename_engine is None:
+            return ""
+        plan = self.rename_engine.plan(
+            [(operation.old_path, operation.new_path) for operation in operations]
+        )
+        return plan.summary()
+
+    def begin_batch(self) -> None:
+        """Stage subsequent renames into one backup run"""
+        if self._run is None:
+            self._run = self.backup_store.begin_run(TOOL_NAME)
+            self._staged = []
+
+    def commit_batch(self) -> bool:
+        """Back up and apply all staged renames atomically"""
+        run, staged = self._run, self._staged
+        self._run, self._staged = None, []
+        if run is None or not len(run):
             return True
-
-        except Exception as e:
-            print(f"❌ Failed to rename {old_path}: {e}")
+        if self.rename_engine is not None:
+            plan = self.rename_engine.plan(
+                [(op.src, op.dst) for op in run.operations if op.op == "move"]
+            )
+            files = self.rename_engine.stage_edits(plan, run)
+            if files:
+                print(f"🔗 Updating {plan.edit_count} links in {files} files")
+        try:
+            run.commit()
+        except BackupStoreError as e:
+            print(f"❌ No files renamed: {e}")
+            self.commit_failed = True
             return False
+        for operation in staged:
+            print(f"✅ Renamed: {operation.old_path} -> {operation.new_path}")
+            print(f"   Reason: {operation.reason}")
+        print(f"💾 Backup run: {run.run_id} (undo with --rollback {run.run_id})")
+        return True
 
     def fix_file(self, file_path: Path, dry_run: bool = False) -> list[RenameOperation]:
         """Fix naming issues for a single file"""
@@ -379,25 +437,34 @@ class NamingConventionFixer:
 
         print(f"🔧 Found {len(operations)} naming issues for {file_path}")
 
+        owns_batch = not dry_run and self._run is None
+        if owns_batch:
+            self.begin_batch()
         for operation in operations:
             success = self.execute_rename_operation(operation, dry_run)
             if success and not dry_run:
                 # Update file_path for next operation
                 file_path = Path(operation.new_path)
+        if owns_batch and not self.commit_batch():
+            return []
 
         return operations
 
     def fix_directory(
         self, directory: Path, dry_run: bool = False
     ) -> dict[str, list[RenameOperation]]:
-        """Fix naming issues for all files in a directory"""
+        """Fix naming issues for all files in a directory as one transaction"""
         results = {}
 
+        if not dry_run:
+            self.begin_batch()
         for file_path in directory.rglob("*.md"):
             if file_path.is_file():
                 operations = self.fix_file(file_path, dry_run)
                 if operations:
                     results[str(file_path)] = operations
+        if not dry_run and not self.commit_batch():
+            return {}
 
         return results
 
@@ -448,10 +515,25 @@ def main():
         default="docs/artifacts",
         help="Root directory for artifacts",
     )
+    parser.add_argument(
+        "--docs-root",
+        default="docs",
+        help="Document tree whose links are updated when files move",
+    )
+    parser.add_argument(
+        "--no-link-rewrite",
+        action="store_true",
+        help="Do not rewrite links that point at moved files",
+    )
+    add_rollback_arguments(parser)
 
     args = parser.parse_args()
 
-    fixer = NamingConventionFixer(args.artifacts_root)
+    fixer = NamingConventionFixer(args.artifacts_root, BackupStore(args.backup_store))
+    if handle_rollback_arguments(args, fixer.backup_store):
+        return
+    if not args.no_link_rewrite and Path(args.docs_root).is_dir():
+        fixer.rename_engine = RenameEngine(args.docs_root)
 
     if args.file:
         file_path = Path(args.file)
@@ -461,6 +543,10 @@ def main():
         directory = Path(args.directory)
         results = fixer.fix_directory(directory, dry_run=args.dry_run)
 
+    if args.dry_run and results and fixer.rename_engine is not None:
+        print("\n🔗 Link updates planned:")
+        print(fixer.plan_link_updates([op for ops in results.values() for op in ops]))
+
     # Generate report
     report = fixer.generate_fix_report(results)
 
@@ -471,6 +557,9 @@ def main():
     else:
         print(report)
 
+    if fixer.commit_failed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Reference-Rewriting Rename Engine
+
+Plans a batch of file renames/moves together with every link that would
+break because of them, then stages both into one ``BackupRun``:
+
+- Inbound links are found through the reverse index of the documentation
+  link graph (``documentation/link_index.py``), refreshed incrementally in
+  a single tree walk, instead of grepping the tree per rename
+- Relative links inside moved files are re-pointed from their new location
+- Each affected file is rewritten once, however many of its links change
+
+Usage:
+    python rename_engine.py --docs-root docs old.md:new.md [old2.md:new2.md ...]
+    python rename_engine.py --docs-root docs --apply old.md:new.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from AgentQMS.agent_tools.documentation.link_index import (
+    DOC_EXTENSIONS,
+    LinkIndex,
+    is_external,
+)
+from AgentQMS.agent_tools.maintenance.backup_store import (
+    BackupRun,
+    BackupStore,
+    BackupStoreError,
+)
+
+_MD_LINK = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+
+
+@dataclass
+class LinkEdit:
+    """One link to rewrite: ``url`` on ``line`` of ``source`` becomes ``new_url``."""
+
+    source: str
+    line: int
+    url: str
+    new_url: str
+
+
+@dataclass
+class RenamePlan:
+    """Renames (docs-root relative) plus the link edits they require."""
+
+    renames: dict[str, str] = field(default_factory=dict)
+    edits: dict[str, list[LinkEdit]] = field(default_factory=dict)
+    # Paths given to plan() that lie outside the indexed docs root
+    unindexed: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def edit_count(self) -> int:
+        return sum(len(edits) for edits in self.edits.values())
+
+    def summary(self) -> str:
+        lines = [
+            f"{len(self.renames)} renames, {self.edit_count} link updates "
+            f"in {len(self.edits)} files"
+        ]
+        for source, edits in sorted(self.edits.items()):
+            for edit in edits:
+                lines.append(f"  {source}:{edit.line}: {edit.url} -> {edit.new_url}")
+        return "\n".join(lines)
+
+
+class RenameEngine:
+    """Plans renames against the link graph and stages link rewrites."""
+
+    def __init__(self, docs_root: str | Path = "docs", link_index: LinkIndex | None = None):
+        self.docs_root = Path(docs_root).resolve()
+        self.index = link_index or LinkIndex(self.docs_root)
+        self._refreshed = False
+
+    def refresh(self) -> None:
+        """Bring the link graph up to date (one incremental tree walk)."""
+        if not self._refreshed:
+            self.index.update()
+            self._refreshed = True
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+    def plan(self, renames: list[tuple[str | Path, str | Path]]) -> RenamePlan:
+        """Compose a batch of renames and collect every link they affect.
+
+        Renames may chain (``a -> b`` then ``b -> c``) or repeat the original
+        path (``a -> b`` then ``a -> c``); both resolve to ``a -> c``.
+        """
+        self.refresh()
+        plan = RenamePlan()
+        current_to_original: dict[str, str] = {}
+        for old, new in renames:
+            try:
+                old_rel = self.index.relpath(Path(old).resolve())
+                new_rel = self.index.relpath(Path(new).resolve())
+            except ValueError:
+                plan.unindexed.append((str(old), str(new)))
+                continue
+            original = current_to_original.pop(old_rel, old_rel)
+            plan.renames[original] = new_rel
+            current_to_original[new_rel] = original
+        plan.renames = {old: new for old, new in plan.renames.items() if old != new}
+
+        edits: dict[tuple[str, int, str], str] = {}
+        # Inbound links to renamed documents
+        for old_target, new_target in plan.renames.items():
+            for source, line, url in self.index.backlinks.get(old_target, []):
+                new_source = plan.renames.get(source, source)
+                new_url = _rewrite_url(url, new_source, new_target)
+                if new_url != url:
+                    edits[(source, line, url)] = new_url
+
+        # Relative links inside moved documents
+        for old_source, new_source in plan.renames.items():
+            record = self.index.files.get(old_source)
+            if record is None:
+                continue
+            for url, line in record["links"]:
+                if (old_source, line, url) in edits:
+                    continue
+                new_url = self._rewrite_outbound(old_source, new_source, url, plan.renames)
+                if new_url is not None and new_url != url:
+                    edits[(old_source, line, url)] = new_url
+
+        for (source, line, url), new_url in sorted(edits.items()):
+            plan.edits.setdefault(source, []).append(LinkEdit(source, line, url, new_url))
+        return plan
+
+    def _rewrite_outbound(
+        self, old_source: str, new_source: str, url: str, renames: dict[str, str]
+    ) -> str | None:
+        if is_external(url) or url.startswith(("#", "/")):
+            return None
+        target, _anchor = self.index.resolve(old_source, url)
+        if target is not None:
+            return _rewrite_url(url, new_source, renames.get(target, target))
+        # Non-document targets (images, scripts) that exist on disk
+        path_part = url.partition("#")[0].split("?", 1)[0]
+        candidate = os.path.normpath(os.path.join(os.path.dirname(old_source), path_part))
+        if (self.docs_root / candidate).exists():
+            return _rewrite_url(url, new_source, candidate.replace(os.sep, "/"))
+        return None
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+    def stage_edits(self, plan: RenamePlan, run: BackupRun) -> int:
+        """Stage one rewrite per affected file into ``run``; return file count.
+
+        Call after the renames themselves are staged so writes land on the
+        files' new locations.
+        """
+        staged = 0
+        for source, edits in plan.edits.items():
+            path = self.docs_root / source
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            new_text = apply_edits(text, edits)
+            if new_text != text:
+                run.write_text(path, new_text)
+                staged += 1
+        return staged
+
+    def apply(self, plan: RenamePlan, store: BackupStore, tool: str = "rename") -> BackupRun:
+        """Stage the plan's renames and link rewrites and commit them together."""
+        run = store.begin_run(tool)
+        for old, new in plan.renames.items():
+            run.move(self.docs_root / old, self.docs_root / new)
+        for old, new in plan.unindexed:
+            run.move(old, new)
+        self.stage_edits(plan, run)
+        run.commit()
+        self._sync_index(run)
+        return run
+
+    def _sync_index(self, run: BackupRun) -> None:
+        """Re-index the files ``run`` moved or rewrote so later plans see them."""
+        touched: set[str] = set()
+        for operation in run.operations:
+            touched.add(operation.src)
+            if operation.op == "move":
+                touched.add(operation.dst)
+        paths = []
+        for path in sorted(touched):
+            resolved = Path(path).resolve()
+            if resolved.suffix in DOC_EXTENSIONS and resolved.is_relative_to(self.docs_root):
+                paths.append(resolved)
+        if paths:
+            self.index.update_paths(paths)
+
+
+def _rewrite_url(url: str, new_source: str, new_target: str) -> str:
+    """Point ``url`` (as written in ``new_source``) at ``new_target``."""
+    path_part, hash_sep, anchor = url.partition("#")
+    path_only, query_sep, query = path_part.partition("?")
+    if not path_only:
+        # Pure same-file anchor: still valid wherever the file goes
+        if new_target == new_source:
+            return url
+        path_only = "."
+    relative = os.path.relpath(new_target, os.path.dirname(new_source) or ".")
+    relative = relative.replace(os.sep, "/")
+    # Keep the author's style: extensionless links and explicit ./ prefixes
+    if not Path(path_only).suffix and relative.endswith(".md"):
+        relative = relative[:-3]
+    if path_only.startswith("./") and not relative.startswith("../"):
+        relative = f"./{relative}"
+    return f"{relative}{query_sep}{query}{hash_sep}{anchor}"
+
+
+def apply_edits(text: str, edits: list[LinkEdit]) -> str:
+    """Rewrite the given links in ``text``, touching only their lines."""
+    by_line: dict[int, dict[str, str]] = {}
+    for edit in edits:
+        by_line.setdefault(edit.line, {})[edit.url] = edit.new_url
+    lines = text.splitlines(keepends=True)
+    for line_num, replacements in by_line.items():
+        index = line_num - 1
+        if not 0 <= index < len(lines):
+            continue
+
+        def replace(match: re.Match, replacements: dict[str, str] = replacements) -> str:
+            raw_url = match.group(2)
+            new_url = replacements.get(raw_url.strip())
+            if new_url is None:
+                return match.group(0)
+            return f"[{match.group(1)}]({raw_url.replace(raw_url.strip(), new_url)})"
+
+        lines[index] = _MD_LINK.sub(replace, lines[index])
+    return "".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan or apply renames with link rewriting")
+    parser.add_argument("renames", nargs="+", help="OLD:NEW path pairs")
+    parser.add_argument("--docs-root", default="docs", help="Root of the linked document tree")
+    parser.add_argument("--apply", action="store_true", help="Apply instead of only planning")
+    parser.add_argument(
+        "--backup-store", default="backups/store", help="Content-addressed backup store"
+    )
+    args = parser.parse_args()
+
+    pairs = []
+    for item in args.renames:
+        old, sep, new = item.partition(":")
+        if not sep:
+            parser.error(f"Expected OLD:NEW, got {item!r}")
+        pairs.append((old, new))
+
+    engine = RenameEngine(args.docs_root)
+    plan = engine.plan(pairs)
+    print(plan.summary())
+    for old, new in plan.unindexed:
+        print(f"⚠️  Outside {args.docs_root}, links not tracked: {old} -> {new}")
+    if args.apply:
+        try:
+            run = engine.apply(plan, BackupStore(args.backup_store))
+        except BackupStoreError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        print(f"✅ Applied. Backup run: {run.run_id}")
+
+
+if __name__ == "__main__":
+    main()
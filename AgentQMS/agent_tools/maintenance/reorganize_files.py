@@ -10,14 +10,30 @@ Usage:
     python reorganize_files.py --dry-run
     python reorganize_files.py --file path/to/file.md
     python reorganize_files.py --directory docs/artifacts/
+    python reorganize_files.py --list-runs
+    python reorganize_files.py --rollback <run-id>
+
+Moves are applied as one transaction per invocation through the shared
+content-addressed backup store (see ``backup_store.py``).
 """
 
 import argparse
 import re
-import shutil
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
+from AgentQMS.agent_tools.maintenance.backup_store import (
+    BackupRun,
+    BackupStore,
+    BackupStoreError,
+    add_rollback_arguments,
+    handle_rollback_arguments,
+)
+from AgentQMS.agent_tools.maintenance.rename_engine import RenameEngine
+
+TOOL_NAME = "file_reorganization"
+
 
 @dataclass
 class MoveOperation:
@@ -32,9 +48,21 @@ class MoveOperation:
 class FileReorganizer:
     """Automatically reorganizes misplaced artifact files"""
 
-    def __init__(self, artifacts_root: str = "docs/artifacts"):
+    def __init__(
+        self,
+        artifacts_root: str = "docs/artifacts",
+        backup_store: BackupStore | None = None,
+        rename_engine: RenameEngine | None = None,
+    ):
         self.artifacts_root = Path(artifacts_root)
-        self.backup_dir = Path("backups/file_reorganization")
+        self.backup_store = backup_store or BackupStore()
+        # Rewrites links to renamed files in the same transaction when set
+        self.rename_engine = rename_engine
+        self.backup_dir = self.backup_store.root
+        self._run: BackupRun | None = None
+        self._staged: list[MoveOperation] = []
+        # Set when a batch could not be applied; the CLI exits non-zero
+        self.commit_failed = False
 
         # Define valid prefixes and their expected directories
         self.valid_prefixes = {
@@ -276,11 +304,9 @@ class FileReorganizer:
         return type_to_directory.get(artifact_type)
 
     def create_backup(self, file_path: Path) -> bool:
-        """Create backup of file before moving"""
+        """Store the file's content in the content-addressed backup store"""
         try:
-            self.backup_dir.mkdir(parents=True, exist_ok=True)
-            backup_path = self.backup_dir / file_path.name
-            shutil.copy2(file_path, backup_path)
+            self.backup_store.put_file(file_path)
             return True
         except Exception as e:
             print(f"Warning: Could not create backup for {file_path}: {e}")
@@ -289,7 +315,7 @@ class FileReorganizer:
     def execute_move_operation(
         self, operation: MoveOperation, dry_run: bool = False
     ) -> bool:
-        """Execute a move operation"""
+        """Execute a move operation (staged when a batch is open)"""
         old_path = Path(operation.old_path)
         new_path = Path(operation.new_path)
 
@@ -298,34 +324,67 @@ class FileReorganizer:
             print(f"         Reason: {operation.reason}")
             return True
 
-        try:
-            # Create backup
-            self.create_backup(old_path)
-
-            # Create target directory if it doesn't exist
-            new_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Check if target file already exists
-            if new_path.exists():
-                print(f"⚠️  Target file already exists: {new_path}")
-                # Generate unique name
-                counter = 1
-                while new_path.exists():
-                    stem = new_path.stem
-                    suffix = new_path.suffix
-                    new_path = new_path.parent / f"{stem}_{counter}{suffix}"
-                    counter += 1
-                print(f"   Using unique name: {new_path}")
-
-            # Perform move
-            shutil.move(str(old_path), str(new_path))
-            print(f"✅ Moved: {old_path} -> {new_path}")
-            print(f"   Reason: {operation.reason}")
-            return True
+        if self._run is None:
+            self.begin_batch()
+            self.execute_move_operation(operation)
+            return self.commit_batch()
+
+        # Check if target file already exists (or is claimed by this batch)
+        if new_path.exists() or self._run.is_claimed(new_path):
+            print(f"⚠️  Target file already exists: {new_path}")
+            # Generate unique name
+            stem = new_path.stem
+            suffix = new_path.suffix
+            counter = 1
+            while new_path.exists() or self._run.is_claimed(new_path):
+                new_path = new_path.parent / f"{stem}_{counter}{suffix}"
+                counter += 1
+            print(f"   Using unique name: {new_path}")
+            operation.new_path = str(new_path)
+
+        self._run.move(old_path, new_path)
+        self._staged.append(operation)
+        return True
 
-        except Exception as e:
-            print(f"❌ Failed to move {old_path}: {e}")
+    def plan_link_updates(self, operations: list[MoveOperation]) -> str:
+        """Describe the link rewrites the given operations would need"""
+        if self.rename_engine is None:
+            return ""
+        plan = self.rename_engine.plan(
+            [(operation.old_path, operation.new_path) for operation in operations]
+        )
+        return plan.summary()
+
+    def begin_batch(self) -> None:
+        """Stage subsequent moves into one backup run"""
+        if self._run is None:
+            self._run = self.backup_store.begin_run(TOOL_NAME)
+            self._staged = []
+
+    def commit_batch(self) -> bool:
+        """Back up and apply all staged moves atomically"""
+        run, staged = self._run, self._staged
+        self._run, self._staged = None, []
+        if run is None or not len(run):
+            return True
+        if self.rename_engine is not None:
+            plan = self.rename_engine.plan(
+                [(op.src, op.dst) for op in run.operations if op.op == "move"]
+            )
+            files = self.rename_engine.stage_edits(plan, run)
+            if files:
+                print(f"🔗 Updating {plan.edit_count} links in {files} files")
+        try:
+            run.commit()
+        except BackupStoreError as e:
+            print(f"❌ No files moved: {e}")
+            self.commit_failed = True
             return False
+        for operation in staged:
+            print(f"✅ Moved: {operation.old_path} -> {operation.new_path}")
+            print(f"   Reason: {operation.reason}")
+        print(f"💾 Backup run: {run.run_id} (undo with --rollback {run.run_id})")
+        return True
 
     def reorganize_file(
         self, file_path: Path, dry_run: bool = False
@@ -348,14 +407,18 @@ class FileReorganizer:
     def reorganize_directory(
         self, directory: Path, dry_run: bool = False
     ) -> dict[str, MoveOperation]:
-        """Reorganize all files in a directory"""
+        """Reorganize all files in a directory as one transaction"""
         results = {}
 
+        if not dry_run:
+            self.begin_batch()
         for file_path in directory.rglob("*.md"):
             if file_path.is_file():
                 operation = self.reorganize_file(file_path, dry_run)
                 if operation:
                     results[str(file_path)] = operation
+        if not dry_run and not self.commit_batch():
+            return {}
 
         return results
 
@@ -506,10 +569,25 @@ def main():
         default="docs/artifacts",
         help="Root directory for artifacts",
     )
+    parser.add_argument(
+        "--docs-root",
+        default="docs",
+        help="Document tree whose links are updated when files move",
+    )
+    parser.add_argument(
+        "--no-link-rewrite",
+        action="store_true",
+        help="Do not rewrite links that point at moved files",
+    )
+    add_rollback_arguments(parser)
 
     args = parser.parse_args()
 
-    reorganizer = FileReorganizer(args.artifacts_root)
+    reorganizer = FileReorganizer(args.artifacts_root, BackupStore(args.backup_store))
+    if handle_rollback_arguments(args, reorganizer.backup_store):
+        return
+    if not args.no_link_rewrite and Path(args.docs_root).is_dir():
+        reorganizer.rename_engine = RenameEngine(args.docs_root)
 
     if args.structure_report:
         # Generate directory structure report
@@ -547,6 +625,10 @@ def main():
         directory = Path(args.directory)
         results = reorganizer.reorganize_directory(directory, dry_run=args.dry_run)
 
+    if args.dry_run and results and reorganizer.rename_engine is not None:
+        print("\n🔗 Link updates planned:")
+        print(reorganizer.plan_link_updates(list(results.values())))
+
     # Generate report
     report = reorganizer.generate_reorganization_report(results)
 
@@ -557,6 +639,9 @@ def main():
     else:
         print(report)
 
+    if reorganizer.commit_failed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -5,10 +5,15 @@ Collects and manages feedback from AI agents about documentation and system issu
 """
 
 import argparse
-import json
 from datetime import datetime
 from pathlib import Path
 
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.utils.event_log import EventLog, migrate_json_array
+
 
 class AgentFeedbackCollector:
     """Collects and manages agent feedback about documentation issues."""
@@ -16,8 +21,16 @@ class AgentFeedbackCollector:
     def __init__(self, feedback_dir: str = "docs/artifacts/agent_feedback"):
         self.feedback_dir = Path(feedback_dir)
         self.feedback_dir.mkdir(parents=True, exist_ok=True)
-        self.feedback_file = self.feedback_dir / "feedback_log.json"
-        self.suggestions_file = self.feedback_dir / "suggestions.json"
+        self.feedback_file = self.feedback_dir / "feedback_log.jsonl"
+        self.suggestions_file = self.feedback_dir / "suggestions.jsonl"
+        self.feedback_log = EventLog(self.feedback_file)
+        self.suggestions_log = EventLog(self.suggestions_file)
+
+        # One-shot conversion of the legacy JSON array files
+        migrate_json_array(self.feedback_file.with_suffix(".json"), self.feedback_log)
+        migrate_json_array(
+            self.suggestions_file.with_suffix(".json"), self.suggestions_log
+        )
 
     def collect_feedback(
         self,
@@ -42,12 +55,7 @@ class AgentFeedbackCollector:
             "id": f"FB_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
         }
 
-        # Load existing feedback
-        existing_feedback = self._load_feedback()
-        existing_feedback.append(feedback)
-
-        # Save updated feedback
-        self._save_feedback(existing_feedback)
+        self._save_feedback(feedback)
 
         return feedback["id"]
 
@@ -72,12 +80,7 @@ class AgentFeedbackCollector:
             "id": f"SUG_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
         }
 
-        # Load existing suggestions
-        existing_suggestions = self._load_suggestions()
-        existing_suggestions.append(suggestion)
-
-        # Save updated suggestions
-        self._save_suggestions(existing_suggestions)
+        self._save_suggestions(suggestion)
 
         return suggestion["id"]
 
@@ -164,27 +167,19 @@ class AgentFeedbackCollector:
 
     def _load_feedback(self) -> list[dict]:
         """Load existing feedback from file."""
-        if self.feedback_file.exists():
-            with open(self.feedback_file) as f:
-                return json.load(f)
-        return []
+        return self.feedback_log.read_all()
 
-    def _save_feedback(self, feedback: list[dict]):
-        """Save feedback to file."""
-        with open(self.feedback_file, "w") as f:
-            json.dump(feedback, f, indent=2)
+    def _save_feedback(self, feedback: dict):
+        """Append a feedback entry to the log."""
+        self.feedback_log.append(feedback)
 
     def _load_suggestions(self) -> list[dict]:
         """Load existing suggestions from file."""
-        if self.suggestions_file.exists():
-            with open(self.suggestions_file) as f:
-                return json.load(f)
-        return []
-
-    def _save_suggestions(self, suggestions: list[dict]):
-        """Save suggestions to file."""
-        with open(self.suggestions_file, "w") as f:
-            json.dump(suggestions, f, indent=2)
+        return self.suggestions_log.read_all()
+
+    def _save_suggestions(self, suggestion: dict):
+        """Append a suggestion to the log."""
+        self.suggestions_log.append(suggestion)
 
 
 def main():
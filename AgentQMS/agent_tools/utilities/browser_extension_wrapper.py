@@ -17,12 +17,88 @@ Usage Pattern:
     2. Always wait for page load before snapshots
     3. Fallback to Puppeteer (not screenshots) when extension fails
     4. Use lightweight checks (console, network) before expensive operations
+    5. Verify many pages with verify_pages_pattern (parallel, via Puppeteer)
+
+Retries use jittered exponential backoff and respect an optional deadline.
+A per-target circuit breaker stops retrying a host after repeated failures.
 """
 
+import random
+import threading
 import time
+from collections import Counter, deque
 from collections.abc import Callable
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
+from urllib.parse import urlparse
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a target whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-target circuit breaker.
+
+    After ``failure_threshold`` consecutive failed attempts against a target
+    its circuit opens and calls fail fast for ``reset_timeout`` seconds.
+    Then a single trial call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        # target -> {"failures": int, "opened_at": float | None, "trial": bool}
+        self._targets: dict[str, dict[str, Any]] = {}
+
+    def _state(self, target: str) -> dict[str, Any]:
+        return self._targets.setdefault(
+            target, {"failures": 0, "opened_at": None, "trial": False}
+        )
+
+    def allow(self, target: str) -> bool:
+        with self._lock:
+            state = self._state(target)
+            if state["opened_at"] is None:
+                return True
+            if time.monotonic() - state["opened_at"] < self.reset_timeout or state["trial"]:
+                return False
+            state["trial"] = True
+            return True
+
+    def record_success(self, target: str) -> None:
+        with self._lock:
+            self._targets[target] = {"failures": 0, "opened_at": None, "trial": False}
+
+    def record_failure(self, target: str) -> None:
+        with self._lock:
+            state = self._state(target)
+            state["failures"] += 1
+            if state["trial"] or state["failures"] >= self.failure_threshold:
+                state["opened_at"] = time.monotonic()
+                state["trial"] = False
+
+    def state(self, target: str) -> str:
+        with self._lock:
+            state = self._targets.get(target)
+            if state is None or state["opened_at"] is None:
+                return "closed"
+            if time.monotonic() - state["opened_at"] >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def states(self) -> dict[str, str]:
+        return {target: self.state(target) for target in list(self._targets)}
+
+
+def _target_of(url: str | None, default: str) -> str:
+    """Circuit key for a URL: its host (pages of one app share a fate)."""
+    if not url:
+        return default
+    return urlparse(url).netloc or url
 
 
 class BrowserExtensionWrapper:
@@ -30,7 +106,8 @@ class BrowserExtensionWrapper:
     Wrapper for browser extension MCP tools with retry logic and fallback.
 
     This wrapper addresses common failure patterns:
-    - Timeout issues (retry with exponential backoff)
+    - Timeout issues (retry with jittered exponential backoff)
+    - Dead targets (per-target circuit breaker fails fast instead of retrying)
     - Connection instability (automatic reconnection)
     - Wait condition failures (proper wait sequences)
     - Missing error handling (comprehensive error handling)
@@ -42,6 +119,10 @@ class BrowserExtensionWrapper:
         initial_delay: float = 1.0,
         use_puppeteer_fallback: bool = True,
         log_failures: bool = True,
+        max_delay: float = 10.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        failure_log_size: int = 200,
     ):
         """
         Initialize wrapper.
@@ -51,15 +132,49 @@ class BrowserExtensionWrapper:
             initial_delay: Initial delay between retries (exponential backoff)
             use_puppeteer_fallback: Whether to use Puppeteer instead of screenshots
             log_failures: Whether to log failures for debugging
+            max_delay: Upper bound for a single backoff delay
+            failure_threshold: Consecutive failures that open a target's circuit
+            reset_timeout: Seconds an open circuit waits before a trial call
+            failure_log_size: Entries kept in the failure log ring buffer
         """
         self.max_retries = max_retries
         self.initial_delay = initial_delay
+        self.max_delay = max_delay
         self.use_puppeteer_fallback = use_puppeteer_fallback
         self.log_failures = log_failures
-        self.failure_log: list[dict[str, Any]] = []
+        self.circuit_breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        # Recent entries only; lifetime counts are kept in _failure_counts
+        self.failure_log: deque[dict[str, Any]] = deque(maxlen=failure_log_size)
+        self._failure_counts: dict[str, Counter] = {}
+        self._log_lock = threading.Lock()
+
+    def _log(self, entry: dict[str, Any]) -> None:
+        if not self.log_failures:
+            return
+        entry.setdefault("timestamp", time.time())
+        with self._log_lock:
+            self.failure_log.append(entry)
+            operation = entry.get("operation", "unknown")
+            self._failure_counts.setdefault(operation, Counter())[
+                entry.get("status", "unknown")
+            ] += 1
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, initial_delay * 2**attempt)].
+
+        Spreads retries from parallel callers instead of having them hit a
+        recovering target in lockstep.
+        """
+        return random.uniform(0, min(self.max_delay, self.initial_delay * (2**attempt)))
 
     def _retry_operation(
-        self, operation: Callable, operation_name: str, *args, **kwargs
+        self,
+        operation: Callable,
+        operation_name: str,
+        *args,
+        target: str | None = None,
+        deadline: float | None = None,
+        **kwargs,
     ) -> Any:
         """
         Execute operation with retry logic.
@@ -68,53 +183,74 @@ class BrowserExtensionWrapper:
             operation: Function to execute
             operation_name: Name for logging
             *args: Positional arguments for operation
+            target: Circuit breaker key (defaults to operation_name)
+            deadline: ``time.monotonic()`` value after which no retry starts
             **kwargs: Keyword arguments for operation
 
         Returns:
             Result of operation
 
         Raises:
-            Exception: If all retries fail
+            CircuitOpenError: If the target's circuit is open
+            Exception: If all retries fail or the deadline leaves no room
         """
+        target = target or operation_name
         last_error = None
 
         for attempt in range(self.max_retries):
+            if not self.circuit_breaker.allow(target):
+                self._log(
+                    {"operation": operation_name, "target": target, "status": "circuit_open"}
+                )
+                raise CircuitOpenError(
+                    f"{operation_name} skipped: circuit open for {target}"
+                    + (f" (last error: {last_error})" if last_error else "")
+                )
             try:
                 result = operation(*args, **kwargs)
-
-                # Log success after retries
-                if attempt > 0 and self.log_failures:
-                    self.failure_log.append(
-                        {
-                            "operation": operation_name,
-                            "attempt": attempt + 1,
-                            "status": "success_after_retry",
-                            "timestamp": time.time(),
-                        }
-                    )
-
-                return result
-
             except Exception as e:
                 last_error = e
+                self.circuit_breaker.record_failure(target)
 
                 # Log failure
-                if self.log_failures:
-                    self.failure_log.append(
+                self._log(
+                    {
+                        "operation": operation_name,
+                        "target": target,
+                        "attempt": attempt + 1,
+                        "status": "failed",
+                        "error": str(e),
+                    }
+                )
+
+                # Don't retry on last attempt, or if the wait would overrun the deadline
+                if attempt < self.max_retries - 1:
+                    delay = self._backoff_delay(attempt)
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        self._log(
+                            {"operation": operation_name, "target": target, "status": "deadline"}
+                        )
+                        raise Exception(
+                            f"{operation_name} failed after {attempt + 1} attempts "
+                            f"(deadline reached): {e}"
+                        ) from e
+                    time.sleep(delay)
+                    continue
+            else:
+                self.circuit_breaker.record_success(target)
+
+                # Log success after retries
+                if attempt > 0:
+                    self._log(
                         {
                             "operation": operation_name,
+                            "target": target,
                             "attempt": attempt + 1,
-                            "status": "failed",
-                            "error": str(e),
-                            "timestamp": time.time(),
+                            "status": "success_after_retry",
                         }
                     )
 
-                # Don't retry on last attempt
-                if attempt < self.max_retries - 1:
-                    delay = self.initial_delay * (2**attempt)
-                    time.sleep(delay)
-                    continue
+                return result
 
         # All retries failed
         raise Exception(
@@ -148,7 +284,7 @@ class BrowserExtensionWrapper:
             def _navigate():
                 return browser_navigate_func(url=url)
 
-            self._retry_operation(_navigate, "navigate")
+            self._retry_operation(_navigate, "navigate", target=_target_of(url, "navigate"))
 
             # Wait for Streamlit to load
             if wait_for_streamlit:
@@ -211,15 +347,9 @@ class BrowserExtensionWrapper:
 
         except Exception as e:
             # Log but don't fail - page might still be usable
-            if self.log_failures:
-                self.failure_log.append(
-                    {
-                        "operation": "wait_for_page_load",
-                        "status": "warning",
-                        "error": str(e),
-                        "timestamp": time.time(),
-                    }
-                )
+            self._log(
+                {"operation": "wait_for_page_load", "status": "warning", "error": str(e)}
+            )
 
     def snapshot_pattern(
         self,
@@ -249,7 +379,9 @@ class BrowserExtensionWrapper:
             def _snapshot():
                 return browser_snapshot_func()
 
-            result = self._retry_operation(_snapshot, "snapshot")
+            result = self._retry_operation(
+                _snapshot, "snapshot", target=_target_of(url, "snapshot")
+            )
 
             return {"success": True, "data": result, "method": "browser_extension"}
 
@@ -314,29 +446,10 @@ class BrowserExtensionWrapper:
             Result dictionary from Puppeteer
         """
         try:
-            # Import Puppeteer wrapper
-            sys_path = Path(__file__).parent.parent.parent
-            wrapper_path = (
-                sys_path
-                / "scripts"
-                / "agent_tools"
-                / "utilities"
-                / "puppeteer_wrapper.py"
-            )
-
-            if not wrapper_path.exists():
-                raise ImportError(f"Puppeteer wrapper not found: {wrapper_path}")
-
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location(
-                "puppeteer_wrapper", wrapper_path
-            )
-            puppeteer_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(puppeteer_module)
+            from AgentQMS.agent_tools.utilities.puppeteer_wrapper import capture_page
 
             # Use Puppeteer to capture page
-            result = puppeteer_module.capture_page(url, timeout=30)
+            result = capture_page(url, timeout=30)
 
             if result["success"]:
                 return {
@@ -438,33 +551,111 @@ class BrowserExtensionWrapper:
 
         return results
 
+    def verify_pages_pattern(
+        self,
+        urls: list[str],
+        concurrency: int = 4,
+        timeout: int = 30,
+        deadline: float | None = None,
+        check_func: Callable[[str], dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Verify many Streamlit pages in parallel.
+
+        Each page is checked through the shared Puppeteer browser pool (see
+        ``puppeteer_wrapper.BrowserPool``) with retries and the per-host
+        circuit breaker, so a multi-page smoke check takes about as long as
+        its slowest page and a dead app fails fast instead of being retried
+        page by page.
+
+        Args:
+            urls: Page URLs to verify
+            concurrency: Pages checked at once
+            timeout: Navigation timeout per page (seconds)
+            deadline: Overall budget in seconds; no retry starts after it
+            check_func: ``url -> {"passed": bool, ...}``; defaults to the pool
+
+        Returns:
+            Dictionary with overall success, per-page results and timings
+        """
+        started = time.monotonic()
+        retry_deadline = started + deadline if deadline is not None else None
+
+        if check_func is None:
+            from AgentQMS.agent_tools.utilities.puppeteer_wrapper import (
+                BrowserPoolError,
+                get_browser_pool,
+            )
+
+            pool = get_browser_pool()
+            try:
+                # Fail once for all pages if the worker can't start
+                pool.start()
+            except BrowserPoolError as e:
+                return {
+                    "success": False,
+                    "pages": [{"url": url, "success": False, "error": str(e)} for url in urls],
+                    "passed": 0,
+                    "failed": len(urls),
+                    "elapsed_s": time.monotonic() - started,
+                }
+
+            def check_func(url: str) -> dict[str, Any]:
+                return pool.verify(url, page_name=url, timeout=timeout)
+
+        def check(url: str) -> dict[str, Any]:
+            page_started = time.monotonic()
+            try:
+                report = self._retry_operation(
+                    check_func,
+                    "verify_page",
+                    url,
+                    target=_target_of(url, "verify_page"),
+                    deadline=retry_deadline,
+                )
+                result = {"url": url, "success": bool(report.get("passed")), "report": report}
+            except Exception as e:
+                result = {"url": url, "success": False, "error": str(e)}
+            result["elapsed_s"] = time.monotonic() - page_started
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(urls) or 1))) as executor:
+            pages = list(executor.map(check, urls))
+
+        passed = sum(1 for page in pages if page["success"])
+        return {
+            "success": passed == len(pages),
+            "pages": pages,
+            "passed": passed,
+            "failed": len(pages) - passed,
+            "elapsed_s": time.monotonic() - started,
+            "slowest_s": max((page["elapsed_s"] for page in pages), default=0.0),
+        }
+
     def get_failure_stats(self) -> dict[str, Any]:
         """
         Get statistics about failures.
 
+        Counts cover the wrapper's whole lifetime; ``recent_failures`` comes
+        from the bounded failure log.
+
         Returns:
             Failure statistics dictionary
         """
-        if not self.failure_log:
-            return {"total_failures": 0, "operations": {}}
+        with self._log_lock:
+            operations = {
+                op: {"count": sum(statuses.values()), "statuses": dict(statuses)}
+                for op, statuses in self._failure_counts.items()
+            }
+            recent = list(self.failure_log)[-10:]  # Last 10 failures
 
-        stats = {
-            "total_failures": len(self.failure_log),
-            "operations": {},
-            "recent_failures": self.failure_log[-10:],  # Last 10 failures
+        stats: dict[str, Any] = {
+            "total_failures": sum(op["count"] for op in operations.values()),
+            "operations": operations,
+            "circuits": self.circuit_breaker.states(),
         }
-
-        # Group by operation
-        for failure in self.failure_log:
-            op = failure.get("operation", "unknown")
-            if op not in stats["operations"]:
-                stats["operations"][op] = {"count": 0, "statuses": {}}
-            stats["operations"][op]["count"] += 1
-            status = failure.get("status", "unknown")
-            stats["operations"][op]["statuses"][status] = (
-                stats["operations"][op]["statuses"].get(status, 0) + 1
-            )
-
+        if recent:
+            stats["recent_failures"] = recent
         return stats
 
 
@@ -593,5 +784,11 @@ if __name__ == "__main__":
            browser_console_messages_func=browser_console_messages
        )
 
+    4. Verify many pages in parallel (Puppeteer browser pool):
+       result = wrapper.verify_pages_pattern(
+           ["http://localhost:8501/page_a", "http://localhost:8501/page_b"],
+           concurrency=4
+       )
+
     See docs/troubleshooting/BROWSER_EXTENSION_FAILURES.md for details.
     """)
@@ -1,21 +1,33 @@
 #!/usr/bin/env python3
 """
 Clean up log files by removing ANSI escape codes and making them human readable.
+
+Files are processed in fixed-size chunks, so memory use does not grow with
+the log. ``--no-backup`` compacts each file in place instead of keeping a
+``.backup`` copy.
 """
 
-import re
-import sys
+import argparse
 from pathlib import Path
 
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.utils.log_stream import (
+    clean_copy,
+    clean_in_place,
+    drop_index,
+    strip_ansi,
+)
+
 
 def strip_ansi_codes(text: str) -> str:
     """Remove ANSI escape codes from text."""
-    # Pattern to match ANSI escape codes
-    ansi_pattern = re.compile(r"\x1b\[[0-9;]*[mK]")
-    return ansi_pattern.sub("", text)
+    return strip_ansi(text)
 
 
-def clean_log_file(file_path: Path) -> None:
+def clean_log_file(file_path: Path, backup: bool = True) -> None:
     """Clean a single log file."""
     if not file_path.exists():
         print(f"❌ File not found: {file_path}")
@@ -23,31 +35,20 @@ def clean_log_file(file_path: Path) -> None:
 
     print(f"🧹 Cleaning log file: {file_path}")
 
-    # Read the original content
-    try:
-        with file_path.open("r", encoding="utf-8") as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        # Try with different encoding if UTF-8 fails
-        with file_path.open("r", encoding="latin-1") as f:
-            content = f.read()
-
-    # Strip ANSI codes
-    cleaned_content = strip_ansi_codes(content)
-
-    # Create backup
-    backup_path = file_path.with_suffix(file_path.suffix + ".backup")
-    file_path.rename(backup_path)
-    print(f"📦 Created backup: {backup_path}")
-
-    # Write cleaned content
-    with file_path.open("w", encoding="utf-8") as f:
-        f.write(cleaned_content)
+    if backup:
+        # Create backup, then stream the cleaned copy back into place
+        backup_path = file_path.with_suffix(file_path.suffix + ".backup")
+        file_path.rename(backup_path)
+        print(f"📦 Created backup: {backup_path}")
+        before, after = clean_copy(backup_path, file_path)
+        drop_index(file_path)
+    else:
+        before, after = clean_in_place(file_path)
 
-    print(f"✅ Cleaned log file: {file_path}")
+    print(f"✅ Cleaned log file: {file_path} ({before:,} -> {after:,} bytes)")
 
 
-def clean_all_logs(logs_dir: Path) -> None:
+def clean_all_logs(logs_dir: Path, backup: bool = True) -> None:
     """Clean all log files in a directory."""
     if not logs_dir.exists():
         print(f"❌ Logs directory not found: {logs_dir}")
@@ -62,21 +63,27 @@ def clean_all_logs(logs_dir: Path) -> None:
     print(f"🔍 Found {len(log_files)} log files to clean")
 
     for log_file in log_files:
-        clean_log_file(log_file)
+        clean_log_file(log_file, backup=backup)
         print()
 
 
 def main() -> None:
     """Main function."""
-    if len(sys.argv) > 1:
+    parser = argparse.ArgumentParser(description="Strip ANSI escape codes from log files")
+    parser.add_argument("file", nargs="?", type=Path, help="Log file to clean (default: all in logs/)")
+    parser.add_argument(
+        "--no-backup", action="store_true", help="Clean in place without keeping a .backup copy"
+    )
+    args = parser.parse_args()
+
+    if args.file:
         # Clean specific file
-        file_path = Path(sys.argv[1])
-        clean_log_file(file_path)
+        clean_log_file(args.file, backup=not args.no_backup)
     else:
         # Clean all logs in the logs directory
         project_root = Path(__file__).resolve().parents[2]
         logs_dir = project_root / "logs"
-        clean_all_logs(logs_dir)
+        clean_all_logs(logs_dir, backup=not args.no_backup)
 
 
 if __name__ == "__main__":
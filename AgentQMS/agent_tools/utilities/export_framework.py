@@ -5,16 +5,32 @@ Export Framework Utility
 Automated export tool for creating project-agnostic AI agent framework packages.
 Excludes project-specific content and Streamlit UI dashboard features.
 
+Re-exports are incremental: the output directory keeps a manifest
+(``.export_manifest.json``) of every exported file's size and SHA-256, so
+only changed files are copied and files no longer exported are removed.
+Copies run on a thread pool and, when the output is on the same filesystem,
+can be reflinks (copy-on-write clones) or hardlinks instead of byte copies.
+
 Usage:
     python export_framework.py --output export_package/
     python export_framework.py --output export_package/ --validate
     python export_framework.py --output export_package/ --dry-run
+    python export_framework.py --output ../downstream/ --link-mode hardlink --jobs 16
 """
 
 import argparse
+import errno
+import fcntl
+import fnmatch
+import hashlib
+import json
+import os
+import re
 import shutil
 import sys
-from pathlib import Path
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
 from typing import Any
 
 try:
@@ -26,6 +42,109 @@ except ImportError:
     sys.exit(1)
 
 
+MANIFEST_NAME = ".export_manifest.json"
+MANIFEST_VERSION = 1
+LINK_MODES = ("auto", "copy", "reflink", "hardlink")
+# ioctl(2) request for a copy-on-write clone (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    """Clone *src* into *dst*; falls back to an in-kernel ``copy_file_range``."""
+    with src.open("rb") as source, dst.open("wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            return
+        except OSError:
+            pass
+        remaining = os.fstat(source.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(source.fileno(), target.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def place_file(src: Path, dst: Path, mode: str = "copy") -> str:
+    """Atomically create *dst* from *src*; returns the method actually used.
+
+    ``reflink`` and ``hardlink`` need *src* and *dst* on one filesystem and
+    degrade to a plain copy otherwise. A hardlinked export shares its inode
+    with the source, so editing it downstream edits the source too.
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.export-tmp")
+    try:
+        if mode == "hardlink":
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return "hardlink"
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+        if mode == "reflink" and hasattr(os, "copy_file_range"):
+            try:
+                _reflink(src, tmp)
+                shutil.copystat(src, tmp)
+                os.replace(tmp, dst)
+                return "reflink"
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EINVAL, errno.ENOTSUP, errno.ENOSYS):
+                    raise
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+        return "copy"
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+class ExcludeMatcher:
+    """Precompiled form of ``EXCLUDE_PATTERNS`` / ``EXCLUDE_FILES``.
+
+    Matches exactly what the per-item string checks did: a pattern excludes
+    a path if it occurs anywhere in the project-relative path, or if it
+    matches the path's trailing components (``Path.match`` semantics).
+    """
+
+    def __init__(self, patterns: list[str], names: list[str], substrings: tuple[str, ...] = ()):
+        self.substring_re = re.compile("|".join(re.escape(p) for p in (*patterns, *substrings)))
+        self.names = frozenset(names)
+        # Trailing-component patterns, grouped by length; globs as regexes
+        self.literal_tails: dict[int, set[tuple[str, ...]]] = {}
+        self.glob_tails: list[tuple[re.Pattern[str], ...]] = []
+        for pattern in patterns:
+            parts = PurePosixPath(pattern).parts
+            if any(ch in pattern for ch in "*?["):
+                self.glob_tails.append(tuple(re.compile(fnmatch.translate(part)) for part in parts))
+            else:
+                self.literal_tails.setdefault(len(parts), set()).add(parts)
+
+    def matches(self, relative: str, parts: tuple[str, ...]) -> bool:
+        if parts and parts[-1] in self.names:
+            return True
+        if self.substring_re.search(relative):
+            return True
+        for size, tails in self.literal_tails.items():
+            if len(parts) >= size and parts[-size:] in tails:
+                return True
+        for tail in self.glob_tails:
+            if len(parts) >= len(tail) and all(
+                regex.match(part) for regex, part in zip(tail, parts[-len(tail):])
+            ):
+                return True
+        return False
+
+
 class FrameworkExporter:
     """Exports AI agent framework to project-agnostic package."""
 
@@ -69,11 +188,29 @@ class FrameworkExporter:
         "validate_coordinate_consistency.py",  # Streamlit UI validation
     ]
 
-    def __init__(self, project_root: Path, output_dir: Path):
+    def __init__(
+        self,
+        project_root: Path,
+        output_dir: Path,
+        jobs: int | None = None,
+        link_mode: str = "auto",
+        incremental: bool = True,
+    ):
         self.project_root = Path(project_root).resolve()
         self.output_dir = Path(output_dir).resolve()
+        self.jobs = jobs or min(16, (os.cpu_count() or 1) * 2)
+        self.link_mode = link_mode
+        self.incremental = incremental
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self._excludes = ExcludeMatcher(
+            self.EXCLUDE_PATTERNS, self.EXCLUDE_FILES, substrings=("streamlit_app",)
+        )
+        # Files to export, destination -> source; filled by copy_directory/copy_file
+        self._plan: dict[Path, Path] = {}
         self.stats = {
             "files_copied": 0,
+            "files_unchanged": 0,
+            "files_removed": 0,
             "files_excluded": 0,
             "directories_created": 0,
             "errors": [],
@@ -81,67 +218,43 @@ class FrameworkExporter:
 
     def should_exclude(self, path: Path) -> bool:
         """Check if path should be excluded from export."""
-        relative_path = path.relative_to(self.project_root)
-
+        path = Path(os.path.abspath(path))
         # Exclude the output directory itself to prevent recursion
-        try:
-            if self.output_dir.resolve() in path.resolve().parents or path.resolve() == self.output_dir.resolve():
-                return True
-        except (ValueError, OSError):
-            # If paths can't be compared (different drives, etc.), check by name
-            if path.name == self.output_dir.name and str(self.output_dir) in str(path):
-                return True
-
-        # Check exclude patterns
-        for pattern in self.EXCLUDE_PATTERNS:
-            if pattern in str(relative_path) or path.match(pattern):
-                return True
-
-        # Check exclude files
-        if path.name in self.EXCLUDE_FILES:
+        if path == self.output_dir or self.output_dir in path.parents:
             return True
+        relative_path = path.relative_to(self.project_root)
+        return self._excludes.matches(relative_path.as_posix(), relative_path.parts)
 
-        # Check if path contains streamlit_app
-        return "streamlit_app" in str(relative_path)
+    def _skip(self, path: Path, dry_run: bool) -> None:
+        if not dry_run:
+            print(f"⏭️  Excluding: {path.relative_to(self.project_root)}")
+        self.stats["files_excluded"] += 1
 
     def copy_directory(self, src: Path, dst: Path, dry_run: bool = False) -> None:
-        """Copy directory structure, excluding specified patterns."""
+        """Queue a directory's files for export, excluding specified patterns.
+
+        Files are copied by ``sync()`` once every component has been queued.
+        """
         if not src.exists():
             self.stats["errors"].append(f"Source does not exist: {src}")
             return
 
         if self.should_exclude(src):
-            if not dry_run:
-                print(f"⏭️  Excluding: {src.relative_to(self.project_root)}")
-            self.stats["files_excluded"] += 1
+            self._skip(src, dry_run)
             return
 
-        # Create destination directory
-        if not dry_run:
-            dst.mkdir(parents=True, exist_ok=True)
-            self.stats["directories_created"] += 1
-
-        # Copy files and subdirectories
         try:
-            for item in src.iterdir():
-                item_dst = dst / item.name
-
+            with os.scandir(src) as entries:
+                items = sorted(entries, key=lambda entry: entry.name)
+            for entry in items:
+                item = src / entry.name
                 if self.should_exclude(item):
-                    if not dry_run:
-                        print(f"⏭️  Excluding: {item.relative_to(self.project_root)}")
-                    self.stats["files_excluded"] += 1
+                    self._skip(item, dry_run)
                     continue
-
-                if item.is_dir():
-                    self.copy_directory(item, item_dst, dry_run=dry_run)
-                elif item.is_file():
-                    if not dry_run:
-                        shutil.copy2(item, item_dst)
-                        self.stats["files_copied"] += 1
-                    else:
-                        print(f"📄 Would copy: {item.relative_to(self.project_root)}")
-                        self.stats["files_copied"] += 1
-
+                if entry.is_dir():
+                    self.copy_directory(item, dst / entry.name, dry_run=dry_run)
+                elif entry.is_file():
+                    self._plan[dst / entry.name] = item
         except Exception as e:
             error_msg = f"Error copying {src}: {e}"
             self.stats["errors"].append(error_msg)
@@ -149,24 +262,150 @@ class FrameworkExporter:
                 print(f"❌ {error_msg}")
 
     def copy_file(self, src: Path, dst: Path, dry_run: bool = False) -> None:
-        """Copy a single file."""
+        """Queue a single file for export."""
         if not src.exists():
             self.stats["errors"].append(f"Source does not exist: {src}")
             return
 
         if self.should_exclude(src):
-            if not dry_run:
-                print(f"⏭️  Excluding: {src.relative_to(self.project_root)}")
-            self.stats["files_excluded"] += 1
+            self._skip(src, dry_run)
             return
 
-        if not dry_run:
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src, dst)
-            self.stats["files_copied"] += 1
-        else:
-            print(f"📄 Would copy: {src.relative_to(self.project_root)}")
-            self.stats["files_copied"] += 1
+        self._plan[dst] = src
+
+    # ------------------------------------------------------------------
+    # Incremental sync
+    # ------------------------------------------------------------------
+    def _load_manifest(self) -> dict[str, dict[str, Any]]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save_manifest(self, files: dict[str, dict[str, Any]]) -> None:
+        payload = {"version": MANIFEST_VERSION, "generated_at": time.time(), "files": files}
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def _resolve_link_mode(self) -> str:
+        if self.link_mode != "auto":
+            return self.link_mode
+        try:
+            same_device = self.project_root.stat().st_dev == self.output_dir.stat().st_dev
+        except OSError:
+            same_device = False
+        return "reflink" if same_device else "copy"
+
+    def _check(self, dst: Path, src: Path, previous: dict[str, Any] | None) -> tuple[bool, dict[str, Any]]:
+        """Return (needs copy, manifest entry) for one planned file.
+
+        Sources whose size and mtime match the manifest are not re-hashed;
+        the destination must still exist with the recorded size and mtime.
+        """
+        stat = src.stat()
+        entry = {
+            "source": src.relative_to(self.project_root).as_posix(),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        try:
+            dst_stat = dst.stat()
+            dst_intact = dst_stat.st_size == stat.st_size and (
+                previous is None or dst_stat.st_mtime_ns == previous.get("dst_mtime_ns")
+            )
+        except OSError:
+            dst_intact = False
+
+        if previous and dst_intact and previous.get("source") == entry["source"]:
+            if previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+                return False, previous
+            entry["sha256"] = file_digest(src)
+            if entry["sha256"] == previous.get("sha256"):
+                entry["dst_mtime_ns"] = previous["dst_mtime_ns"]
+                entry["method"] = previous.get("method")
+                return False, entry
+        elif "sha256" not in entry:
+            entry["sha256"] = file_digest(src)
+        return True, entry
+
+    def sync(self, dry_run: bool = False) -> None:
+        """Copy changed queued files and remove files no longer exported."""
+        previous = self._load_manifest()
+        plan = {dst.relative_to(self.output_dir).as_posix(): (dst, src) for dst, src in self._plan.items()}
+        mode = self._resolve_link_mode()
+
+        def check(item: tuple[str, tuple[Path, Path]]) -> tuple[str, bool, dict[str, Any] | None]:
+            rel, (dst, src) = item
+            try:
+                # A full export re-copies everything but still prunes removed files
+                known = previous.get(rel) if self.incremental else None
+                needs_copy, entry = self._check(dst, src, known)
+                return rel, needs_copy, entry
+            except OSError as e:
+                self.stats["errors"].append(f"Error reading {src}: {e}")
+                return rel, False, None
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            checked = list(pool.map(check, sorted(plan.items())))
+
+        to_copy = [(rel, entry) for rel, needs_copy, entry in checked if needs_copy]
+        files = {rel: entry for rel, needs_copy, entry in checked if entry and not needs_copy}
+        self.stats["files_unchanged"] += len(files)
+        removed = sorted(set(previous) - set(plan))
+
+        if dry_run:
+            for rel, entry in to_copy:
+                print(f"📄 Would copy: {entry['source']}")
+            for rel in removed:
+                print(f"🗑️  Would remove: {rel}")
+            self.stats["files_copied"] += len(to_copy)
+            self.stats["files_removed"] += len(removed)
+            return
+
+        for directory in sorted({plan[rel][0].parent for rel, _ in to_copy}):
+            if not directory.exists():
+                directory.mkdir(parents=True, exist_ok=True)
+                self.stats["directories_created"] += 1
+
+        def copy(item: tuple[str, dict[str, Any]]) -> tuple[str, dict[str, Any] | None]:
+            rel, entry = item
+            dst, src = plan[rel]
+            try:
+                entry["method"] = place_file(src, dst, mode)
+                entry["dst_mtime_ns"] = dst.stat().st_mtime_ns
+                return rel, entry
+            except OSError as e:
+                self.stats["errors"].append(f"Error copying {src}: {e}")
+                return rel, None
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for rel, entry in pool.map(copy, to_copy):
+                if entry is not None:
+                    files[rel] = entry
+                    self.stats["files_copied"] += 1
+
+        for rel in removed:
+            stale = self.output_dir / rel
+            try:
+                stale.unlink()
+                self.stats["files_removed"] += 1
+                print(f"🗑️  Removed: {rel}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.stats["errors"].append(f"Error removing {stale}: {e}")
+                continue
+            # Drop directories the removal left empty
+            parent = stale.parent
+            while parent != self.output_dir and parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+
+        self._save_manifest(files)
 
     def export_agent_tools(self, dry_run: bool = False) -> None:
         """Export scripts/agent_tools/ directory."""
@@ -202,7 +441,10 @@ class FrameworkExporter:
                 self.stats["files_excluded"] += 1
                 continue
 
-            if item.name in exclude_in_agent:
+            # Violation history is a JSONL log with rotated segments and indexes
+            if item.name in exclude_in_agent or item.name.startswith(
+                "artifacts_violations_history."
+            ):
                 if not dry_run:
                     print(f"⏭️  Excluding: {item.relative_to(self.project_root)}")
                 self.stats["files_excluded"] += 1
@@ -353,7 +595,8 @@ The following project-specific components are excluded from this export:
 
         readme_path = self.output_dir / "README.md"
         if not dry_run:
-            readme_path.write_text(readme_content, encoding="utf-8")
+            if not readme_path.exists() or readme_path.read_text(encoding="utf-8") != readme_content:
+                readme_path.write_text(readme_content, encoding="utf-8")
             print("\n📝 Created README.md")
         else:
             print("\n📝 Would create README.md")
@@ -417,6 +660,8 @@ The following project-specific components are excluded from this export:
 
     def export_all(self, dry_run: bool = False, validate: bool = False) -> None:
         """Export entire framework."""
+        started = time.perf_counter()
+        self._plan = {}
         print("🚀 Starting framework export...")
         print(f"   Project root: {self.project_root}")
         print(f"   Output directory: {self.output_dir}")
@@ -436,6 +681,9 @@ The following project-specific components are excluded from this export:
         self.export_templates(dry_run=dry_run)
         self.export_adaptation_tool(dry_run=dry_run)
         self.export_documentation(dry_run=dry_run)
+
+        print(f"\n🔄 Syncing {len(self._plan)} files ({self._resolve_link_mode()}, {self.jobs} workers)...")
+        self.sync(dry_run=dry_run)
         self.create_readme(dry_run=dry_run)
 
         # Print summary
@@ -443,8 +691,11 @@ The following project-specific components are excluded from this export:
         print("📊 Export Summary")
         print("=" * 60)
         print(f"   Files copied: {self.stats['files_copied']}")
+        print(f"   Files unchanged: {self.stats['files_unchanged']}")
+        print(f"   Files removed: {self.stats['files_removed']}")
         print(f"   Files excluded: {self.stats['files_excluded']}")
         print(f"   Directories created: {self.stats['directories_created']}")
+        print(f"   Elapsed: {time.perf_counter() - started:.2f}s")
         if self.stats["errors"]:
             print(f"   Errors: {len(self.stats['errors'])}")
             for error in self.stats["errors"]:
@@ -483,6 +734,9 @@ Examples:
 
   # Export with validation
   python export_framework.py --output export_package/ --validate
+
+  # Re-export into a downstream repo on the same filesystem using hardlinks
+  python export_framework.py --output ../downstream/AgentQMS --link-mode hardlink
         """,
     )
 
@@ -508,10 +762,37 @@ Examples:
         action="store_true",
         help="Validate export completeness after export",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Parallel copy workers (default: 2x CPUs, at most 16)",
+    )
+    parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default="auto",
+        help=(
+            "How files are placed: copy, reflink (copy-on-write clone / copy_file_range), "
+            "hardlink (shares inodes with the source; edits propagate both ways), "
+            "or auto (reflink on the same filesystem, else copy)"
+        ),
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the export manifest and re-copy every file",
+    )
 
     args = parser.parse_args()
 
-    exporter = FrameworkExporter(args.project_root, args.output)
+    exporter = FrameworkExporter(
+        args.project_root,
+        args.output,
+        jobs=args.jobs,
+        link_mode=args.link_mode,
+        incremental=not args.full,
+    )
     exporter.export_all(dry_run=args.dry_run, validate=args.validate)
 
     return 0 if exporter.stats["errors"] == [] else 1
@@ -11,6 +11,7 @@ Usage examples:
     uv run python scripts/agent_tools/get_context.py --task "implement new feature"
     uv run python scripts/agent_tools/get_context.py --type development
     uv run python scripts/agent_tools/get_context.py --list-context-bundles
+    uv run python scripts/agent_tools/get_context.py --type debugging --token-budget 8000
 """
 
 import argparse
@@ -28,13 +29,17 @@ try:
     from AgentQMS.agent_tools.core.context_bundle import (
         get_context_bundle,
         list_available_bundles,
+        pack_context_bundle,
         print_context_bundle,
+        print_packed_bundle,
     )
 except ImportError:
     # Graceful fallback if context_bundle module not available
     get_context_bundle = None
     list_available_bundles = None
+    pack_context_bundle = None
     print_context_bundle = None
+    print_packed_bundle = None
 
 DOC_INDEX_PATH = get_docs_dir() / "ai_handbook" / "index.json"
 
@@ -145,6 +150,21 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="List available context bundles (YAML-based).",
     )
+    context_group.add_argument(
+        "--token-budget",
+        type=int,
+        help="Pack the context bundle into at most N (estimated) tokens.",
+    )
+    context_group.add_argument(
+        "--excerpts",
+        action="store_true",
+        help="With --token-budget, include headings and first paragraphs of files that don't fit.",
+    )
+    context_group.add_argument(
+        "--json",
+        action="store_true",
+        help="With --token-budget, print the pack (including excerpts) as JSON.",
+    )
 
     args = parser.parse_args(argv)
 
@@ -187,11 +207,15 @@ def main(argv: list[str] | None = None) -> None:
             )
             sys.exit(1)
 
-        if args.task:
-            print_context_bundle(args.task, args.type)
-        elif args.type:
-            # Use a generic description if only type is provided
-            print_context_bundle(f"task type: {args.type}", args.type)
+        # Use a generic description if only type is provided
+        description = args.task or f"task type: {args.type}"
+        if args.token_budget is not None:
+            packed = pack_context_bundle(
+                description, args.type, args.token_budget, excerpts=args.excerpts
+            )
+            print_packed_bundle(packed, as_json=args.json)
+        else:
+            print_context_bundle(description, args.type)
         return
 
     # Handle legacy handbook index commands
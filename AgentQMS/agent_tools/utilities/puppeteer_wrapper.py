@@ -4,17 +4,45 @@ Puppeteer Wrapper for AI Agents
 
 This utility allows AI agents to easily use Puppeteer for browser automation.
 It handles Node.js version management and provides a simple Python interface.
+
+``capture_page`` and ``verify_page`` go through a ``BrowserPool``: one
+long-lived Node worker (``browser_pool_worker.js``) that keeps a browser
+open and serves up to N pages concurrently over a line-delimited JSON
+protocol on stdio. The resolved Node path is cached, so neither nvm nor a
+browser launch is paid per call. When the worker cannot start (e.g.
+puppeteer is not installed) the one-shot scripts are used instead.
 """
 
+from __future__ import annotations
+
+import atexit
+import contextlib
+import functools
+import itertools
 import json
+import os
+import shutil
 import subprocess
 import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any
 
+SCRIPT_DIR = Path(__file__).resolve().parents[2] / "agent_scripts" / "browser-automation"
+WORKER_SCRIPT = SCRIPT_DIR / "browser_pool_worker.js"
+FIXTURES_DIR = SCRIPT_DIR / "fixtures"
+NODE_PATH_CACHE = Path.home() / ".cache" / "agentqms" / "node_path"
+
+_node_path: str | None = None
+_node_path_lock = threading.Lock()
+
 
-def get_node_path() -> str | None:
-    """Get the path to Node.js using nvm."""
+def _resolve_node_path() -> str | None:
     try:
         # Try to activate nvm and get node path
         result = subprocess.run(
@@ -35,16 +63,51 @@ def get_node_path() -> str | None:
         pass
 
     # Fallback: try system node
-    try:
-        result = subprocess.run(
-            ["which", "node"], capture_output=True, text=True, check=False
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
+    return shutil.which("node")
+
+
+def get_node_path(refresh: bool = False) -> str | None:
+    """Get the path to Node.js using nvm.
 
-    return None
+    The nvm lookup spawns a login-style shell, so its answer is cached in
+    memory and in ``~/.cache/agentqms/node_path`` (re-validated by checking
+    the binary still exists). ``AGENTQMS_NODE`` overrides the lookup.
+    """
+    global _node_path
+    override = os.environ.get("AGENTQMS_NODE")
+    if override:
+        return override
+
+    with _node_path_lock:
+        if _node_path and not refresh and os.access(_node_path, os.X_OK):
+            return _node_path
+
+        if not refresh:
+            try:
+                cached = NODE_PATH_CACHE.read_text(encoding="utf-8").strip()
+                if cached and os.access(cached, os.X_OK):
+                    _node_path = cached
+                    return cached
+            except OSError:
+                pass
+
+        _node_path = _resolve_node_path()
+        if _node_path:
+            try:
+                NODE_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+                NODE_PATH_CACHE.write_text(_node_path, encoding="utf-8")
+            except OSError:
+                pass
+        return _node_path
+
+
+def _node_env(node_path: str, env: dict[str, str] | None = None) -> dict[str, str]:
+    """Environment with the resolved Node first on PATH (what `nvm use` did)."""
+    run_env = os.environ.copy()
+    run_env["PATH"] = os.pathsep.join([str(Path(node_path).parent), run_env.get("PATH", "")])
+    if env:
+        run_env.update(env)
+    return run_env
 
 
 def run_puppeteer_script(
@@ -85,23 +148,9 @@ def run_puppeteer_script(
             "returncode": 1,
         }
 
-    # Build command with nvm activation
-    cmd = [
-        "bash",
-        "-c",
-        f'export NVM_DIR="$HOME/.nvm" && '
-        f'[ -s "$NVM_DIR/nvm.sh" ] && . "$NVM_DIR/nvm.sh" && '
-        f"nvm use 20 > /dev/null 2>&1 && "
-        f"{node_path} {script_path} {' '.join(args)}",
-    ]
-
-    # Prepare environment
-    run_env = None
-    if env:
-        import os
-
-        run_env = os.environ.copy()
-        run_env.update(env)
+    # The cached node path already is the nvm-selected binary
+    cmd = [node_path, str(script_path_obj), *args]
+    run_env = _node_env(node_path, env)
 
     try:
         result = subprocess.run(
@@ -135,6 +184,260 @@ def run_puppeteer_script(
         }
 
 
+class BrowserPoolError(RuntimeError):
+    """A pool request failed (navigation error, timeout, ...)."""
+
+
+class BrowserWorkerUnavailable(BrowserPoolError):
+    """The Node worker could not be started or exited (e.g. no puppeteer)."""
+
+
+class BrowserPool:
+    """Client for a long-lived ``browser_pool_worker.js`` process.
+
+    Thread-safe: requests from many threads are multiplexed over the
+    worker's stdin and matched to responses by id, so up to ``max_pages``
+    pages load concurrently in one browser. The worker is started lazily
+    and restarted if it dies. A worker that cannot start, or exits before
+    answering anything, is not respawned for ``retry_after`` seconds;
+    requests in that window fail fast with ``BrowserWorkerUnavailable``.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 4,
+        worker_script: Path | str = WORKER_SCRIPT,
+        node_path: str | None = None,
+        retry_after: float = 60.0,
+    ):
+        self.max_pages = max_pages
+        self.worker_script = Path(worker_script)
+        self.node_path = node_path
+        self.retry_after = retry_after
+        self._unavailable: BrowserWorkerUnavailable | None = None
+        self._unavailable_until = 0.0
+        self._process: subprocess.Popen | None = None
+        self._pending: dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stderr_tail: list[str] = []
+
+    # ------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        # A worker that just died at startup may not have been reaped yet
+        return (
+            self.unavailable is None
+            and self._process is not None
+            and self._process.poll() is None
+        )
+
+    @property
+    def unavailable(self) -> BrowserWorkerUnavailable | None:
+        """The last startup failure, while its retry window is still open."""
+        if self._unavailable is not None and time.monotonic() < self._unavailable_until:
+            return self._unavailable
+        return None
+
+    def _mark_unavailable(self, error: BrowserWorkerUnavailable) -> BrowserWorkerUnavailable:
+        self._unavailable = error
+        self._unavailable_until = time.monotonic() + self.retry_after
+        return error
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            if self.unavailable is not None:
+                raise BrowserWorkerUnavailable(str(self._unavailable))
+            node_path = self.node_path or get_node_path()
+            if not node_path:
+                raise self._mark_unavailable(
+                    BrowserWorkerUnavailable(
+                        "Node.js not found. Please install Node.js 20+ using nvm."
+                    )
+                )
+            if not self.worker_script.exists():
+                raise self._mark_unavailable(
+                    BrowserWorkerUnavailable(f"Worker script not found: {self.worker_script}")
+                )
+            try:
+                self._process = subprocess.Popen(
+                    [node_path, str(self.worker_script), "--max-pages", str(self.max_pages)],
+                    cwd=str(self.worker_script.parent),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,
+                    env=_node_env(node_path),
+                )
+            except OSError as e:
+                raise self._mark_unavailable(
+                    BrowserWorkerUnavailable(f"Could not start browser worker: {e}")
+                ) from e
+            # Each worker gets its own pending map, so a dying worker's reader
+            # never fails requests already sent to its replacement
+            self._pending = {}
+            self._stderr_tail = []
+            threading.Thread(
+                target=self._read_responses, args=(self._process, self._pending), daemon=True
+            ).start()
+            threading.Thread(
+                target=self._read_stderr, args=(self._process,), daemon=True
+            ).start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            self._send({"op": "shutdown"}, timeout=timeout)
+        except BrowserPoolError:
+            pass
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def __enter__(self) -> "BrowserPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _read_responses(self, process: subprocess.Popen, pending: dict[int, Future]) -> None:
+        answered = False
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if not answered:
+                answered = True
+                self._unavailable = None
+            future = pending.pop(message.get("id"), None)
+            if future is None:
+                continue
+            if message.get("ok"):
+                future.set_result(message.get("result"))
+            else:
+                future.set_exception(BrowserPoolError(message.get("error", "Unknown error")))
+        # Worker exited: fail whatever was still waiting on it
+        detail = "".join(self._stderr_tail[-5:]).strip()
+        if not answered:
+            # Died at startup (e.g. puppeteer missing): stop respawning it
+            self._mark_unavailable(
+                BrowserWorkerUnavailable(f"Browser worker exited at startup. {detail}".strip())
+            )
+        for request_id in list(pending):
+            future = pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_exception(
+                    BrowserWorkerUnavailable(f"Browser worker exited. {detail}".strip())
+                )
+
+    def _read_stderr(self, process: subprocess.Popen) -> None:
+        for line in process.stderr:
+            self._stderr_tail = (self._stderr_tail + [line])[-20:]
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _send(self, request: dict[str, Any], timeout: float) -> Any:
+        self.start()
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._lock:
+            pending = self._pending
+            pending[request_id] = future
+            try:
+                self._process.stdin.write(json.dumps({**request, "id": request_id}) + "\n")
+                self._process.stdin.flush()
+            except (OSError, ValueError) as e:
+                pending.pop(request_id, None)
+                raise BrowserWorkerUnavailable(f"Browser worker unavailable: {e}") from e
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError as e:
+            pending.pop(request_id, None)
+            raise BrowserPoolError(f"Browser worker timed out after {timeout}s") from e
+
+    def capture(
+        self, url: str, timeout: int = 30, settle_ms: int = 3000, fresh_context: bool = False
+    ) -> dict[str, Any]:
+        """Load *url* and return its text, console output and error elements."""
+        return self._send(
+            {
+                "op": "capture",
+                "url": url,
+                "timeout": timeout,
+                "settle_ms": settle_ms,
+                "fresh_context": fresh_context,
+            },
+            # Navigation timeout + settle time + browser launch headroom
+            timeout=timeout + settle_ms / 1000 + 30,
+        )
+
+    def verify(
+        self, url: str, page_name: str = "", timeout: int = 30, settle_ms: int = 3000
+    ) -> dict[str, Any]:
+        """Capture *url* and scan it for the verify_fixes.js error patterns."""
+        return self._send(
+            {
+                "op": "verify",
+                "url": url,
+                "page_name": page_name,
+                "timeout": timeout,
+                "settle_ms": settle_ms,
+            },
+            timeout=timeout + settle_ms / 1000 + 30,
+        )
+
+    def ping(self, timeout: float = 10.0) -> dict[str, Any]:
+        return self._send({"op": "ping"}, timeout=timeout)
+
+    def status(self) -> dict[str, Any]:
+        """Pool status without starting the worker."""
+        status: dict[str, Any] = {"running": self.running, "max_pages": self.max_pages}
+        if self.unavailable is not None:
+            status["unavailable"] = str(self.unavailable)
+        if self.running:
+            try:
+                status.update(self.ping())
+            except BrowserPoolError as e:
+                status["error"] = str(e)
+        return status
+
+
+_DEFAULT_POOL: BrowserPool | None = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool (``AGENTQMS_BROWSER_PAGES`` pages).
+
+    ``AGENTQMS_BROWSER_RETRY_S`` sets how long a worker that failed to start
+    is skipped before it is tried again.
+    """
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = BrowserPool(
+                max_pages=int(os.environ.get("AGENTQMS_BROWSER_PAGES", "4")),
+                retry_after=float(os.environ.get("AGENTQMS_BROWSER_RETRY_S", "60")),
+            )
+            atexit.register(_DEFAULT_POOL.close)
+        return _DEFAULT_POOL
+
+
+def _pool_enabled() -> bool:
+    return os.environ.get("AGENTQMS_BROWSER_POOL", "1") != "0"
+
+
 def capture_page(url: str, timeout: int = 30) -> dict[str, Any]:
     """
     Capture a page's content using Puppeteer.
@@ -146,8 +449,24 @@ def capture_page(url: str, timeout: int = 30) -> dict[str, Any]:
     Returns:
         Dictionary with page content and status
     """
-    script_dir = Path(__file__).parent.parent.parent / "browser-automation"
-    script_path = script_dir / "capture_page.js"
+    if _pool_enabled():
+        try:
+            page = get_browser_pool().capture(url, timeout=timeout)
+            return {
+                "success": True,
+                "content": page["content"],
+                "errors": "\n".join(page["page_errors"] + page["error_elements"]),
+                "status": page["status"],
+                "console": page["console"],
+                "method": "browser_pool",
+            }
+        except BrowserWorkerUnavailable:
+            pass
+        except BrowserPoolError as e:
+            # The page itself failed; the one-shot script would fail the same way
+            return {"success": False, "error": str(e), "output": ""}
+
+    script_path = SCRIPT_DIR / "capture_page.js"
 
     result = run_puppeteer_script(str(script_path), url, timeout=timeout)
 
@@ -176,14 +495,27 @@ def verify_page(url: str, page_name: str = "") -> dict[str, Any]:
     Returns:
         Dictionary with verification results
     """
-    script_dir = Path(__file__).parent.parent.parent / "browser-automation"
-    script_path = script_dir / "verify_fixes.js"
+    if _pool_enabled():
+        try:
+            report = get_browser_pool().verify(url, page_name=page_name)
+        except BrowserWorkerUnavailable:
+            report = None
+        except BrowserPoolError as e:
+            return {"success": False, "stdout": "", "stderr": str(e), "returncode": 1}
+        if report is not None:
+            return {
+                "success": report["passed"],
+                "stdout": format_verify_report(report),
+                "stderr": "\n".join(report["page_errors"]),
+                "returncode": 0 if report["passed"] else 1,
+                "report": report,
+            }
 
     args = [url]
     if page_name:
         args.append(page_name)
 
-    result = run_puppeteer_script(str(script_path), *args, timeout=60)
+    result = run_puppeteer_script(str(SCRIPT_DIR / "verify_fixes.js"), *args, timeout=60)
 
     return {
         "success": result["success"],
@@ -193,6 +525,88 @@ def verify_page(url: str, page_name: str = "") -> dict[str, Any]:
     }
 
 
+def format_verify_report(report: dict[str, Any]) -> str:
+    """Render a pool ``verify`` result in the style of verify_fixes.js."""
+    lines = [f"Testing: {report['page_name'] or report['url']}"]
+    for title, key, ok in (
+        ("📊 Critical Errors (MUST be 0)", "critical_errors", "No critical errors found!"),
+        ("🔧 Fixed Errors (should NOT appear)", "fixed_errors", "All previously fixed errors are resolved!"),
+        ("⚠️  Unexpected User-Visible Errors (should be 0)", "unexpected_errors", "No unexpected error messages visible to users!"),
+    ):
+        lines.append(f"\n{title}:")
+        lines.extend(f"  ❌ FOUND: {pattern}" for pattern in report[key])
+        if not report[key]:
+            lines.append(f"  ✅ {ok}")
+    lines.append(
+        "\n✅ ALL FIXES VERIFIED" if report["passed"] else "\n⚠️  ISSUES FOUND - REVIEW NEEDED"
+    )
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def serve_fixtures(directory: Path | str = FIXTURES_DIR) -> Iterator[str]:
+    """Serve *directory* over HTTP on a free local port; yields the base URL."""
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def selftest(rounds: int = 3, pool: BrowserPool | None = None) -> dict[str, Any]:
+    """Capture and verify the HTML fixtures through the pool.
+
+    Checks that the clean fixture passes and the error fixture is flagged,
+    and times a cold first capture against warm sequential and concurrent
+    rounds over the fixtures.
+    """
+    pool = pool or get_browser_pool()
+    fixtures = sorted(p.name for p in FIXTURES_DIR.glob("*.html"))
+    timings: dict[str, float] = {}
+    with serve_fixtures() as base_url:
+        urls = [f"{base_url}/{name}" for name in fixtures]
+
+        start = time.perf_counter()
+        pool.capture(urls[0], settle_ms=0)
+        timings["cold_first_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for url in urls:
+                pool.capture(url, settle_ms=0)
+        timings["warm_sequential_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=pool.max_pages) as executor:
+            list(executor.map(lambda u: pool.capture(u, settle_ms=0), urls * rounds))
+        timings["warm_concurrent_s"] = time.perf_counter() - start
+
+        ok = pool.verify(f"{base_url}/ok.html", page_name="ok", settle_ms=0)
+        error = pool.verify(f"{base_url}/error.html", page_name="error", settle_ms=0)
+
+    checks = {
+        "ok_fixture_passes": ok["passed"],
+        "error_fixture_flagged": not error["passed"] and "Traceback" in error["critical_errors"],
+        "error_elements_captured": bool(error["error_elements"]),
+    }
+    return {
+        "passed": all(checks.values()),
+        "checks": checks,
+        "captures": len(urls) * rounds,
+        "timings": timings,
+        "pool": pool.status(),
+    }
+
+
 def main():
     """CLI interface for the Puppeteer wrapper."""
     if len(sys.argv) < 2:
@@ -201,6 +615,7 @@ def main():
         print("  capture <url>           - Capture page content")
         print("  verify <url> [name]     - Verify page for errors")
         print("  run <script> [args...]  - Run a Puppeteer script")
+        print("  selftest [rounds]       - Exercise the browser pool against local fixtures")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -229,6 +644,19 @@ def main():
         result = run_puppeteer_script(script_path, *args)
         print(json.dumps(result, indent=2))
 
+    elif command == "selftest":
+        rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+        try:
+            result = selftest(rounds)
+        except BrowserPoolError as e:
+            print(f"❌ Browser pool unavailable: {e}")
+            sys.exit(1)
+        for name, passed in result["checks"].items():
+            print(f"{'✅' if passed else '❌'} {name}")
+        for name, seconds in result["timings"].items():
+            print(f"⏱️  {name}: {seconds * 1000:.0f} ms")
+        result["success"] = result["passed"]
+
     else:
         print(f"Error: Unknown command: {command}")
         sys.exit(1)
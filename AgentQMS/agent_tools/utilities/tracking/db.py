@@ -24,8 +24,12 @@ def _ensure_parent_dir(path: Path) -> None:
 
 def get_connection(readonly: bool = False) -> sqlite3.Connection:
     dsn = DB_PATH
-    if readonly and not dsn.exists():
-        raise FileNotFoundError(f"Tracking DB not found: {dsn}")
+    if readonly:
+        if not dsn.exists():
+            raise FileNotFoundError(f"Tracking DB not found: {dsn}")
+        conn = sqlite3.connect(f"{dsn.resolve().as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
     _ensure_parent_dir(dsn)
     conn = sqlite3.connect(str(dsn))
     conn.row_factory = sqlite3.Row
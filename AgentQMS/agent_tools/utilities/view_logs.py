@@ -2,17 +2,37 @@
 """
 View log files in a human-readable format.
 Automatically strips ANSI escape codes and formats output nicely.
+
+Logs are streamed rather than loaded: the last N lines are read by seeking
+backwards from the end, ``--follow`` tails a live log, and ``--since`` /
+``--until`` / ``--grep`` use a sidecar timestamp index (``<log>.idx``) to
+scan only the relevant part of large logs.
 """
 
-import re
+import argparse
 import sys
+from collections import deque
 from pathlib import Path
 
+from AgentQMS.agent_tools.utils.runtime import ensure_project_root_on_sys_path
+
+ensure_project_root_on_sys_path()
+
+from AgentQMS.agent_tools.utils.log_stream import (
+    LogIndex,
+    check_index,
+    decode,
+    follow,
+    iter_lines,
+    query,
+    strip_ansi,
+    tail_lines,
+)
+
 
 def strip_ansi_codes(text: str) -> str:
     """Remove ANSI escape codes from text."""
-    ansi_pattern = re.compile(r"\x1b\[[0-9;]*[mK]")
-    return ansi_pattern.sub("", text)
+    return strip_ansi(text)
 
 
 def view_log_file(file_path: Path, lines: int | None = None) -> None:
@@ -24,23 +44,82 @@ def view_log_file(file_path: Path, lines: int | None = None) -> None:
     print(f"📄 Viewing log file: {file_path}")
     print("=" * 80)
 
-    try:
-        with file_path.open("r", encoding="utf-8") as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        with file_path.open("r", encoding="latin-1") as f:
-            content = f.read()
+    if lines:
+        for line in tail_lines(file_path, lines):
+            print(line)
+    else:
+        for _, line in iter_lines(file_path):
+            print(decode(line))
 
-    # Strip ANSI codes
-    cleaned_content = strip_ansi_codes(content)
+    print("=" * 80)
+
+
+def follow_log_file(file_path: Path, lines: int = 10) -> None:
+    """Print the last lines of a log, then new lines as they arrive."""
+    print(f"📄 Following log file: {file_path} (Ctrl+C to stop)")
+    if file_path.exists():
+        for line in tail_lines(file_path, lines):
+            print(line)
+    try:
+        for line in follow(file_path):
+            print(line, flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+def search_log_file(
+    file_path: Path,
+    since: str | None = None,
+    until: str | None = None,
+    pattern: str | None = None,
+    ignore_case: bool = False,
+    lines: int | None = None,
+) -> None:
+    """Print lines in a time range and/or matching a regex."""
+    if not file_path.exists():
+        print(f"❌ File not found: {file_path}")
+        return
 
-    # Show last N lines if specified
+    matches = query(file_path, since=since, until=until, pattern=pattern, ignore_case=ignore_case)
     if lines:
-        lines_list = cleaned_content.split("\n")
-        cleaned_content = "\n".join(lines_list[-lines:])
+        # Only the last N matches are kept in memory
+        matches = deque(matches, maxlen=lines)
+    count = 0
+    for line in matches:
+        print(line)
+        count += 1
+    print(f"🔍 {count} matching lines", file=sys.stderr)
 
-    print(cleaned_content)
-    print("=" * 80)
+
+def build_index(file_path: Path) -> None:
+    """Create or extend the sidecar timestamp index for a log."""
+    if not file_path.exists():
+        print(f"❌ File not found: {file_path}")
+        return
+    index = LogIndex(file_path)
+    scanned = index.update()
+    print(
+        f"✅ Indexed {file_path}: {len(index.entries)} entries, "
+        f"{scanned:,} new bytes scanned -> {index.index_path}"
+    )
+
+
+def verify_index(
+    file_path: Path, since: str | None = None, until: str | None = None, pattern: str | None = None
+) -> bool:
+    """Check that an indexed query returns the same lines as a full scan."""
+    if not file_path.exists():
+        print(f"❌ File not found: {file_path}")
+        return False
+    result = check_index(file_path, since=since, until=until, pattern=pattern)
+    if result["mismatched"]:
+        print(
+            f"❌ Index mismatch: {result['indexed']} lines via index, "
+            f"{result['scanned']} via full scan ({result['mismatched']} differ)"
+        )
+        return False
+    print(f"✅ Index consistent: {result['indexed']} matching lines either way")
+    return True
 
 
 def list_log_files(logs_dir: Path) -> None:
@@ -59,32 +138,59 @@ def list_log_files(logs_dir: Path) -> None:
     for i, log_file in enumerate(log_files, 1):
         rel_path = log_file.relative_to(logs_dir)
         size = log_file.stat().st_size
-        print(f"  {i:2d}. {rel_path} ({size:,} bytes)")
+        indexed = " [indexed]" if LogIndex(log_file).is_current() else ""
+        print(f"  {i:2d}. {rel_path} ({size:,} bytes){indexed}")
 
 
 def main() -> None:
     """Main function."""
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python scripts/agent_tools/view_logs.py <log_file> [lines]")
-        print("  python scripts/agent_tools/view_logs.py --list")
-        print()
-        print("Examples:")
-        print("  python scripts/agent_tools/view_logs.py logs/streamlit/app.out")
-        print("  python scripts/agent_tools/view_logs.py logs/streamlit/app.out 50")
-        print("  python scripts/agent_tools/view_logs.py --list")
-        return
-
-    if sys.argv[1] == "--list":
+    parser = argparse.ArgumentParser(
+        description="View log files with ANSI codes stripped",
+        epilog=(
+            "Examples:\n"
+            "  view_logs.py logs/streamlit/app.out 50\n"
+            "  view_logs.py logs/streamlit/app.out --follow\n"
+            "  view_logs.py logs/streamlit/app.out --since '2024-05-01 12:00' --grep Traceback\n"
+            "  view_logs.py --list"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("file", nargs="?", type=Path, help="Log file to view")
+    parser.add_argument("lines", nargs="?", type=int, help="Show only the last N lines")
+    parser.add_argument("--list", action="store_true", help="List available log files")
+    parser.add_argument("-f", "--follow", action="store_true", help="Keep printing new lines")
+    parser.add_argument("--since", help="Only lines at or after this ISO timestamp")
+    parser.add_argument("--until", help="Only lines at or before this ISO timestamp")
+    parser.add_argument("--grep", metavar="REGEX", help="Only lines matching this regex")
+    parser.add_argument("-i", "--ignore-case", action="store_true", help="Case-insensitive --grep")
+    parser.add_argument("--index", action="store_true", help="Build/update the sidecar timestamp index")
+    parser.add_argument(
+        "--check-index",
+        action="store_true",
+        help="Compare an indexed --since/--until/--grep query against a full scan",
+    )
+    args = parser.parse_intermixed_args()
+
+    if args.list:
         project_root = Path(__file__).resolve().parents[2]
         logs_dir = project_root / "logs"
         list_log_files(logs_dir)
         return
+    if args.file is None:
+        parser.print_help()
+        return
 
-    file_path = Path(sys.argv[1])
-    lines = int(sys.argv[2]) if len(sys.argv) > 2 else None
-
-    view_log_file(file_path, lines)
+    if args.check_index:
+        if not verify_index(args.file, args.since, args.until, args.grep):
+            sys.exit(1)
+    elif args.index:
+        build_index(args.file)
+    elif args.follow:
+        follow_log_file(args.file, args.lines or 10)
+    elif args.since or args.until or args.grep:
+        search_log_file(args.file, args.since, args.until, args.grep, args.ignore_case, args.lines)
+    else:
+        view_log_file(args.file, args.lines)
 
 
 if __name__ == "__main__":
@@ -4,22 +4,51 @@ This module consolidates configuration data from the framework defaults,
 framework-level configuration, project-level overrides, and environment
 variables. The loader exposes helpers the rest of the toolchain can reuse,
 ensuring every component resolves paths the same way.
+
+Validators resolve paths in tight loops, so the merged configuration is
+also kept as a frozen view (``MappingProxyType`` for mappings, tuples for
+lists) that is shared without copying, and resolved paths are memoized
+until ``reload()``. ``load()`` still returns a private mutable copy for
+callers that edit the result.
+
+Parsing the YAML layers dominates tool start-up, so the merged file layers
+are compiled into ``.agentqms/cache/config_snapshot.pickle`` together with
+the mtime, size and hash of every source file. Later loads use the snapshot
+when no layer changed and fall back to the full merge otherwise; environment
+overrides are always applied on top. ``python -m
+AgentQMS.agent_tools.utils.config build`` rebuilds it and reports the saving.
 """
 
 from __future__ import annotations
 
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import json
 from pathlib import Path
-from typing import Any, Dict, Optional, Iterable
+import pickle
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Iterable, Mapping
 import os
+import time
 
 import yaml
 
 
 
 _DEFAULT_CONFIG: Dict[str, Any] = {}
+# Bump when the merge logic changes so stale snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+_LAYER_FILES = ("framework.yaml", "interface.yaml", "paths.yaml")
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only version of a config value (recursively)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
 
 
 class ConfigLoader:
@@ -27,37 +56,105 @@ class ConfigLoader:
 
     def __init__(self) -> None:
         self._config_cache: Optional[Dict[str, Any]] = None
+        self._frozen: Optional[Mapping[str, Any]] = None
+        self._path_cache: Dict[tuple[str, str], Path] = {}
         self.framework_root = self._detect_framework_root()
         self.project_root = self._detect_project_root(self.framework_root)
+        self.snapshot_path = self.project_root / ".agentqms" / "cache" / "config_snapshot.pickle"
+        # How the last load was served: {"source": "snapshot"|"yaml", "elapsed_ms": ...}
+        self.load_stats: Dict[str, Any] = {}
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
     def load(self, force: bool = False) -> Dict[str, Any]:
-        """Load configuration following the precedence hierarchy."""
+        """Load configuration following the precedence hierarchy.
+
+        Args:
+            force: Re-read every layer, bypassing the in-memory cache and the
+                compiled snapshot (which is rebuilt).
+        """
         if self._config_cache is not None and not force:
             return deepcopy(self._config_cache)
 
-        config = deepcopy(_DEFAULT_CONFIG)
-        config = self._merge_config(config, self._load_framework_defaults())
-        config = self._merge_config(config, self._load_project_overrides())
-        config = self._merge_config(config, self._load_environment_overrides())
-        self._write_runtime_snapshot(config)
+        start = time.perf_counter()
+        snapshot = None if force else self._read_snapshot()
+        if snapshot is not None:
+            layers = snapshot["layers"]
+            source = "snapshot"
+        else:
+            # Fingerprint before reading so a concurrent edit invalidates it
+            snapshot = {"sources": [self._fingerprint(path) for path in self._layer_sources()]}
+            layers = deepcopy(_DEFAULT_CONFIG)
+            layers = self._merge_config(layers, self._load_framework_defaults())
+            layers = self._merge_config(layers, self._load_project_overrides())
+            snapshot["layers"] = layers
+            source = "yaml"
+        config = self._merge_config(layers, self._load_environment_overrides())
+
+        # effective.yaml only changes when the resolved config does
+        resolved_hash = hashlib.sha256(pickle.dumps(config)).hexdigest()
+        effective = self.project_root / ".agentqms" / "effective.yaml"
+        if snapshot.get("resolved_hash") != resolved_hash or not effective.exists():
+            self._write_runtime_snapshot(config)
+            snapshot["resolved_hash"] = resolved_hash
+            snapshot["dirty"] = True
+        if snapshot.get("dirty"):
+            self._write_snapshot(snapshot)
+        self.load_stats = {
+            "source": source,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
 
         self._config_cache = config
+        self._frozen = freeze(config)
+        self._path_cache.clear()
         return deepcopy(config)
 
+    def view(self) -> Mapping[str, Any]:
+        """Return the merged configuration as a shared, read-only view.
+
+        Nested mappings are ``MappingProxyType`` and lists are tuples, so the
+        view can be handed out without copying.
+        """
+        if self._frozen is None:
+            self.load()
+        return self._frozen
+
+    def reload(self) -> Mapping[str, Any]:
+        """Re-read every configuration layer and drop memoized paths."""
+        self.load(force=True)
+        return self._frozen
+
     def get_path(self, key: str) -> Path:
         """Return a project-relative path resolved from configuration."""
-        config = self.load()
-        value = config.get("paths", {}).get(key)
+        cached = self._path_cache.get(("project", key))
+        if cached is not None:
+            return cached
+
+        value = self.view().get("paths", {}).get(key)
         if not value:
             raise KeyError(f"No path configured for '{key}'")
 
         candidate = Path(value)
-        if candidate.is_absolute():
-            return candidate
-        return self.project_root / candidate
+        if not candidate.is_absolute():
+            candidate = self.project_root / candidate
+        self._path_cache[("project", key)] = candidate
+        return candidate
+
+    def get_container_path(self, key: str) -> Path:
+        """Return a framework-relative path resolved from configuration."""
+        cached = self._path_cache.get(("framework", key))
+        if cached is not None:
+            return cached
+
+        relative = self.view().get("paths", {}).get(key)
+        if not relative:
+            raise KeyError(f"Unknown framework path key: {key}")
+
+        resolved = (self.framework_root / relative).resolve()
+        self._path_cache[("framework", key)] = resolved
+        return resolved
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -74,6 +171,80 @@ class ConfigLoader:
             return framework_root.parent
         return framework_root
 
+    def _project_config_dir(self) -> Path:
+        # Consuming projects use config/; the framework's own project config
+        # lives in .agentqms/project_config/ (see _load_project_overrides)
+        config_dir = self.project_root / "config"
+        if config_dir.exists():
+            return config_dir
+        return self.project_root / ".agentqms" / "project_config"
+
+    def _layer_sources(self) -> list[Path]:
+        """Every file the YAML merge reads (or would read if it existed)."""
+        defaults_dir = self.framework_root / "config_defaults"
+        project_dir = self._project_config_dir()
+        sources = [defaults_dir / name for name in _LAYER_FILES]
+        sources.append(defaults_dir / "tool_mappings.json")
+        sources.extend(project_dir / name for name in _LAYER_FILES)
+        for subdir in ("environments", "overrides"):
+            sources.extend(sorted((project_dir / subdir).glob("*.yaml")))
+        return sources
+
+    @staticmethod
+    def _fingerprint(path: Path, previous: Optional[list] = None) -> list:
+        """``[path, mtime_ns, size, sha256]`` (``None`` fields when missing).
+
+        The file is only hashed when its mtime or size differ from
+        *previous*, so a touched-but-identical layer keeps the snapshot valid.
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return [str(path), None, None, None]
+        if previous and previous[1] == stat.st_mtime_ns and previous[2] == stat.st_size:
+            return previous
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        return [str(path), stat.st_mtime_ns, stat.st_size, digest]
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Return the compiled snapshot if no source layer changed."""
+        try:
+            with self.snapshot_path.open("rb") as handle:
+                snapshot = pickle.load(handle)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        recorded = snapshot.get("sources") or []
+        sources = self._layer_sources()
+        if [entry[0] for entry in recorded] != [str(path) for path in sources]:
+            return None
+
+        current = [self._fingerprint(path, entry) for path, entry in zip(sources, recorded)]
+        if any(now[3] != entry[3] for now, entry in zip(current, recorded)):
+            return None
+        # Touched but identical files: store the new mtimes to skip rehashing
+        snapshot["dirty"] = any(now is not entry for now, entry in zip(current, recorded))
+        snapshot["sources"] = current
+        return snapshot
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "sources": snapshot["sources"],
+            "layers": snapshot["layers"],
+            "resolved_hash": snapshot.get("resolved_hash"),
+        }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+            with tmp_path.open("wb") as handle:
+                pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            # Read-only checkouts simply merge the YAML every time
+            pass
+
     def _load_framework_defaults(self) -> Dict[str, Any]:
         defaults_dir = self.framework_root / "config_defaults"
         config: Dict[str, Any] = {}
@@ -222,3 +393,122 @@ def get_config_loader() -> ConfigLoader:
 def load_config(force: bool = False) -> Dict[str, Any]:
     """Convenience helper for callers that only need the merged config."""
     return get_config_loader().load(force=force)
+
+
+def config_view() -> Mapping[str, Any]:
+    """Read-only merged config, shared between callers without copying."""
+    return get_config_loader().view()
+
+
+def reload_config() -> Mapping[str, Any]:
+    """Re-read the configuration layers and invalidate memoized paths."""
+    return get_config_loader().reload()
+
+
+def benchmark_path_resolution(iterations: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-*repeat* seconds for *iterations* path lookups.
+
+    Compares the previous strategy (deep-copy the merged config on every
+    lookup) with the frozen view and the memoized path helpers.
+    """
+    loader = get_config_loader()
+    loader.view()
+
+    def copy_lookup() -> None:
+        for _ in range(iterations):
+            config = deepcopy(loader._config_cache)
+            Path(config.get("paths", {}).get("artifacts"))
+
+    def view_lookup() -> None:
+        for _ in range(iterations):
+            Path(loader.view().get("paths", {}).get("artifacts"))
+
+    def memoized_lookup() -> None:
+        for _ in range(iterations):
+            loader.get_path("artifacts")
+
+    def best(func) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    return {
+        "iterations": iterations,
+        "deepcopy_s": best(copy_lookup),
+        "view_s": best(view_lookup),
+        "get_path_s": best(memoized_lookup),
+    }
+
+
+def build_snapshot(repeat: int = 5) -> Dict[str, Any]:
+    """Rebuild the compiled snapshot and time cold loads with and without it.
+
+    Each timing uses a fresh ``ConfigLoader`` (as a new process would) and
+    keeps the best of *repeat* runs.
+    """
+    loader = ConfigLoader()
+    loader.load(force=True)
+
+    def best(force: bool) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ConfigLoader().load(force=force)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    yaml_s = best(force=True)
+    snapshot_s = best(force=False)
+    return {
+        "snapshot": str(loader.snapshot_path),
+        "sources": len(loader._layer_sources()),
+        "yaml_s": yaml_s,
+        "snapshot_s": snapshot_s,
+        "saved_s": yaml_s - snapshot_s,
+    }
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the merged AgentQMS configuration")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("show", "build"),
+        default="show",
+        help="show: print the merged config; build: rebuild the compiled snapshot",
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true", help="Time path resolution strategies"
+    )
+    parser.add_argument("--iterations", type=int, default=10000, help="Lookups per timing")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        report = build_snapshot()
+        print(f"✅ Compiled {report['sources']} config sources -> {report['snapshot']}")
+        print("⏱️  Cold config load (best of 5):")
+        print(f"   yaml merge  {report['yaml_s'] * 1000:8.1f} ms")
+        print(f"   snapshot    {report['snapshot_s'] * 1000:8.1f} ms")
+        print(f"   saved       {report['saved_s'] * 1000:8.1f} ms per tool start-up")
+        return 0
+
+    if not args.benchmark:
+        print(yaml.safe_dump(load_config(), sort_keys=False), end="")
+        return 0
+
+    timings = benchmark_path_resolution(args.iterations)
+    n = timings["iterations"]
+    print(f"⏱️  {n} path lookups (best of 5):")
+    for key in ("deepcopy_s", "view_s", "get_path_s"):
+        seconds = timings[key]
+        print(f"   {key[:-2]:<10} {seconds * 1000:8.1f} ms  ({seconds / n * 1e6:.2f} µs each)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""Content-hash keyed result cache shared by AgentQMS validators.
+
+Tools that derive a result purely from a file's content (validation
+findings, token counts, extracted metadata) can store it here keyed by a
+hash of that content, and skip the work entirely on the next run when the
+file is unchanged. Each tool uses its own namespace file under
+``.agentqms/cache/`` and a version string that invalidates old entries when
+the tool's rules change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .paths import get_project_root
+
+
+def content_hash(*parts: str | bytes) -> str:
+    """Return a stable SHA-256 hex digest over one or more strings/bytes."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ContentHashCache:
+    """Persistent ``hash -> JSON value`` store for one tool namespace."""
+
+    def __init__(
+        self,
+        namespace: str,
+        version: str = "1",
+        max_entries: int = 50_000,
+        cache_dir: Path | str | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self.version = version
+        self.max_entries = max_entries
+        cache_root = Path(cache_dir) if cache_dir else get_project_root() / ".agentqms" / "cache"
+        self.path = cache_root / f"{namespace}.json"
+        self._entries: dict[str, Any] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        # Re-insert so the most recently used entries survive trimming
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        self._dirty = True
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self) -> None:
+        """Atomically persist the cache if anything changed."""
+        if not self._dirty:
+            return
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            for key in list(self._entries)[:overflow]:
+                del self._entries[key]
+        payload = {"version": self.version, "entries": self._entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            # Read-only checkouts simply run uncached
+            pass
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.version:
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                self._entries = entries
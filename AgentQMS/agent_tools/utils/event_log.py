@@ -0,0 +1,471 @@
+"""Append-only JSONL event log for AgentQMS history files.
+
+Alert, feedback and violation history used to be stored as one JSON array
+that was loaded, extended and rewritten for every event. ``EventLog`` stores
+one JSON object per line instead so appends are O(1):
+
+- the active segment (``name.jsonl``) is only ever appended to;
+- it is atomically renamed to a timestamped segment once it exceeds
+  ``max_bytes`` or ``max_age_seconds``, at which point retention limits are
+  applied by compacting the rotated segments;
+- ``retain_age`` is also enforced when the log is first written to (the
+  active segment included) and on every read, so a log that rarely reaches
+  ``max_bytes`` does not keep or return stale records;
+- a sparse sidecar index (``<segment>.idx``) maps record timestamps to byte
+  offsets so time-range reads seek instead of scanning from the start.
+
+Legacy JSON array files are converted with :func:`migrate_json_array`, or in
+bulk via ``python -m AgentQMS.agent_tools.utils.event_log convert``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_NEVER = "never"
+
+# Write an index entry at most once per this many bytes of log data
+DEFAULT_INDEX_STRIDE = 64 * 1024
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+class EventLog:
+    """Append-only JSONL log with rotation, compaction and a time index."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        timestamp_field: str = "timestamp",
+        fsync: str = FSYNC_NEVER,
+        fsync_interval: float = 1.0,
+        max_bytes: int | None = 10 * 1024 * 1024,
+        max_age_seconds: float | None = None,
+        retain_records: int | None = None,
+        retain_age: timedelta | None = None,
+        index_stride: int = DEFAULT_INDEX_STRIDE,
+    ) -> None:
+        if fsync not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = Path(path)
+        self.timestamp_field = timestamp_field
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.retain_records = retain_records
+        self.retain_age = retain_age
+        self.index_stride = index_stride
+
+        self._lock = threading.Lock()
+        self._last_fsync = 0.0
+        self._last_indexed_offset: int | None = None
+        self._segment_started: datetime | None = None
+        self._retention_checked = False
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def append(self, record: dict[str, Any]) -> None:
+        """Append a single record."""
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[dict[str, Any]]) -> None:
+        """Append records in order with a single open/flush."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._enforce_age_retention()
+            self._rotate_if_needed()
+            with self.path.open("ab") as handle:
+                index_entries = []
+                for record in records:
+                    offset = handle.tell()
+                    handle.write(_encode(record))
+                    index_entries.extend(self._index_entry(record, offset))
+                handle.flush()
+                self._maybe_fsync(handle)
+            if index_entries:
+                self._append_index(self.path, index_entries)
+
+    def rotate(self) -> Path | None:
+        """Atomically move the active segment aside and apply retention."""
+        with self._lock:
+            return self._rotate()
+
+    def compact(
+        self,
+        keep: Callable[[dict[str, Any]], bool] | None = None,
+        *,
+        max_records: int | None = None,
+        since: datetime | None = None,
+        include_active: bool = True,
+    ) -> int:
+        """Rewrite segments into one, dropping records outside the limits.
+
+        Returns the number of records kept.
+        """
+        with self._lock:
+            return self._compact(keep, max_records, since, include_active)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def segments(self) -> list[Path]:
+        """Return all segment files, oldest first, active segment last."""
+        pattern = f"{self.path.stem}.*{self.path.suffix}"
+        rotated = sorted(p for p in self.path.parent.glob(pattern) if p != self.path)
+        if self.path.exists():
+            rotated.append(self.path)
+        return rotated
+
+    def read(
+        self,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream records, optionally limited to ``start <= timestamp <= end``.
+
+        Records are assumed to be appended in timestamp order, which lets the
+        reader seek via the sidecar index and stop as soon as ``end`` passes.
+        """
+        start_dt = _parse_timestamp(start)
+        end_dt = _parse_timestamp(end)
+        cutoff = self._retention_cutoff()
+        if cutoff is not None and (start_dt is None or start_dt < cutoff):
+            start_dt = cutoff
+        for segment in self.segments():
+            index = self._load_index(segment)
+            if start_dt is not None and index:
+                last_ts = _parse_timestamp(index[-1][0])
+                if last_ts is not None and last_ts < start_dt:
+                    # Records past the last index entry may still be in range
+                    offset = index[-1][1]
+                else:
+                    offset = self._seek_offset(index, start_dt)
+            else:
+                offset = 0
+            if end_dt is not None and index:
+                first_ts = _parse_timestamp(index[0][0])
+                if first_ts is not None and first_ts > end_dt:
+                    return
+
+            for record in _iter_lines(segment, offset):
+                ts = _parse_timestamp(record.get(self.timestamp_field))
+                if ts is not None:
+                    if start_dt is not None and ts < start_dt:
+                        continue
+                    if end_dt is not None and ts > end_dt:
+                        return
+                yield record
+
+    def read_all(self) -> list[dict[str, Any]]:
+        """Return every record as a list (for small logs and reports)."""
+        return list(self.read())
+
+    def tail(self, n: int) -> list[dict[str, Any]]:
+        """Return the last ``n`` records."""
+        if n <= 0:
+            return []
+        cutoff = self._retention_cutoff()
+        collected: deque[dict[str, Any]] = deque(maxlen=n)
+        for segment in reversed(self.segments()):
+            records = list(_iter_lines(segment, 0))
+            for record in reversed(records):
+                if cutoff is not None:
+                    ts = _parse_timestamp(record.get(self.timestamp_field))
+                    if ts is not None and ts < cutoff:
+                        return list(collected)
+                collected.appendleft(record)
+                if len(collected) == n:
+                    return list(collected)
+        return list(collected)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _maybe_fsync(self, handle) -> None:
+        if self.fsync == FSYNC_ALWAYS:
+            os.fsync(handle.fileno())
+        elif self.fsync == FSYNC_INTERVAL:
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(handle.fileno())
+                self._last_fsync = now
+
+    def _retention_cutoff(self) -> datetime | None:
+        return datetime.now() - self.retain_age if self.retain_age else None
+
+    def _enforce_age_retention(self) -> None:
+        """Once per instance, compact away records older than ``retain_age``.
+
+        Only the oldest record is inspected, so the common case costs one
+        line read.
+        """
+        if self._retention_checked:
+            return
+        self._retention_checked = True
+        cutoff = self._retention_cutoff()
+        segments = self.segments()
+        if cutoff is None or not segments:
+            return
+        oldest = next(_iter_lines(segments[0], 0), None)
+        ts = _parse_timestamp(oldest.get(self.timestamp_field)) if oldest else None
+        if ts is not None and ts < cutoff:
+            self._compact(None, self.retain_records, cutoff, include_active=True)
+
+    def _load_segment_state(self) -> None:
+        """Restore index bookkeeping for the active segment from its sidecar."""
+        if self._last_indexed_offset is not None:
+            return
+        index = self._load_index(self.path)
+        self._last_indexed_offset = index[-1][1] if index else -1
+        self._segment_started = _parse_timestamp(index[0][0]) if index else None
+
+    def _index_entry(self, record: dict[str, Any], offset: int) -> list[tuple[str, int]]:
+        self._load_segment_state()
+        ts = record.get(self.timestamp_field)
+        if not isinstance(ts, str):
+            return []
+        if (
+            self._last_indexed_offset >= 0
+            and offset - self._last_indexed_offset < self.index_stride
+        ):
+            return []
+        self._last_indexed_offset = offset
+        if self._segment_started is None:
+            self._segment_started = _parse_timestamp(ts)
+        return [(ts, offset)]
+
+    def _append_index(self, segment: Path, entries: list[tuple[str, int]]) -> None:
+        with _index_path(segment).open("a", encoding="utf-8") as handle:
+            for ts, offset in entries:
+                handle.write(json.dumps([ts, offset]) + "\n")
+
+    def _load_index(self, segment: Path) -> list[tuple[str, int]]:
+        index_path = _index_path(segment)
+        if not index_path.exists():
+            return []
+        entries = []
+        with index_path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    ts, offset = json.loads(line)
+                except (ValueError, TypeError):
+                    continue
+                entries.append((ts, offset))
+        return entries
+
+    def _seek_offset(self, index: list[tuple[str, int]], start: datetime) -> int:
+        stamps = [_parse_timestamp(ts) or datetime.min for ts, _ in index]
+        position = bisect_right(stamps, start) - 1
+        return index[position][1] if position >= 0 else 0
+
+    def _rotate_if_needed(self) -> None:
+        if not self.path.exists():
+            return
+        size = self.path.stat().st_size
+        if self.max_bytes is not None and size >= self.max_bytes:
+            self._rotate()
+            return
+        if self.max_age_seconds is not None:
+            self._load_segment_state()
+            started = self._segment_started
+            if started is not None and (
+                datetime.now() - started
+            ).total_seconds() >= self.max_age_seconds:
+                self._rotate()
+
+    def _rotate(self) -> Path | None:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        os.replace(self.path, target)
+        if _index_path(self.path).exists():
+            os.replace(_index_path(self.path), _index_path(target))
+        self._last_indexed_offset = None
+        self._segment_started = None
+
+        if self.retain_records is not None or self.retain_age is not None:
+            self._compact(
+                None, self.retain_records, self._retention_cutoff(), include_active=False
+            )
+        return target
+
+    def _compact(
+        self,
+        keep: Callable[[dict[str, Any]], bool] | None,
+        max_records: int | None,
+        since: datetime | None,
+        include_active: bool,
+    ) -> int:
+        segments = self.segments()
+        if not include_active:
+            segments = [segment for segment in segments if segment != self.path]
+        if not segments:
+            return 0
+
+        def selected() -> Iterator[dict[str, Any]]:
+            for segment in segments:
+                for record in _iter_lines(segment, 0):
+                    if keep is not None and not keep(record):
+                        continue
+                    if since is not None:
+                        ts = _parse_timestamp(record.get(self.timestamp_field))
+                        if ts is not None and ts < since:
+                            continue
+                    yield record
+
+        records: Iterable[dict[str, Any]] = selected()
+        if max_records is not None:
+            records = deque(records, maxlen=max_records)
+
+        # Compacted data lands in the newest input segment's name so ordering
+        # across segments is preserved.
+        target = segments[-1]
+        tmp_path = target.with_name(target.name + ".tmp")
+        tmp_index = _index_path(tmp_path)
+        kept = 0
+        last_indexed = -1
+        index_entries = []
+        with tmp_path.open("wb") as handle:
+            for record in records:
+                offset = handle.tell()
+                handle.write(_encode(record))
+                ts = record.get(self.timestamp_field)
+                if isinstance(ts, str) and (
+                    last_indexed < 0 or offset - last_indexed >= self.index_stride
+                ):
+                    index_entries.append((ts, offset))
+                    last_indexed = offset
+                kept += 1
+            handle.flush()
+            os.fsync(handle.fileno())
+        with tmp_index.open("w", encoding="utf-8") as handle:
+            for ts, offset in index_entries:
+                handle.write(json.dumps([ts, offset]) + "\n")
+
+        os.replace(tmp_path, target)
+        os.replace(tmp_index, _index_path(target))
+        for segment in segments[:-1]:
+            segment.unlink(missing_ok=True)
+            _index_path(segment).unlink(missing_ok=True)
+        if target == self.path:
+            self._last_indexed_offset = None
+            self._segment_started = None
+        return kept
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + ".idx")
+
+
+def _iter_lines(segment: Path, offset: int) -> Iterator[dict[str, Any]]:
+    try:
+        handle = segment.open("rb")
+    except FileNotFoundError:
+        return
+    with handle:
+        handle.seek(offset)
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crashed writer; skip it
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def migrate_json_array(
+    json_path: str | Path, log: EventLog, *, remove: bool = False
+) -> int:
+    """Convert a legacy JSON array file into ``log``.
+
+    The legacy file is renamed to ``<name>.migrated`` (or removed) afterwards
+    so the conversion only ever runs once. Returns the number of records moved.
+    """
+    json_path = Path(json_path)
+    if not json_path.exists():
+        return 0
+    try:
+        with json_path.open(encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return 0
+    if not isinstance(data, list):
+        return 0
+
+    records = [record for record in data if isinstance(record, dict)]
+    log.append_many(records)
+    if remove:
+        json_path.unlink()
+    else:
+        os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+    return len(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AgentQMS JSONL event log tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser(
+        "convert", help="Convert a legacy JSON array file into a JSONL event log"
+    )
+    convert.add_argument("source", help="Legacy .json file")
+    convert.add_argument(
+        "target", nargs="?", help="Target .jsonl file (default: source with .jsonl)"
+    )
+    convert.add_argument(
+        "--remove", action="store_true", help="Delete the source after converting"
+    )
+
+    compact = subparsers.add_parser("compact", help="Compact a JSONL event log")
+    compact.add_argument("log", help="Active .jsonl file")
+    compact.add_argument("--max-records", type=int, help="Keep only the last N records")
+    compact.add_argument("--days", type=int, help="Keep only the last N days")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        source = Path(args.source)
+        target = Path(args.target) if args.target else source.with_suffix(".jsonl")
+        count = migrate_json_array(source, EventLog(target), remove=args.remove)
+        print(f"Converted {count} records: {source} -> {target}")
+    elif args.command == "compact":
+        since = datetime.now() - timedelta(days=args.days) if args.days else None
+        kept = EventLog(args.log).compact(max_records=args.max_records, since=since)
+        print(f"Compacted {args.log}: {kept} records kept")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Git-history-aware freshness lookups for AgentQMS.
+
+Filesystem mtimes are reset by every clone or checkout, so in CI every doc
+looks fresh while on long-lived laptops everything looks stale. This module
+builds a ``path -> last commit timestamp`` map from a single streaming
+``git log --name-only`` pass, caches it under ``.agentqms/cache/`` keyed by
+HEAD, and extends it incrementally (``old_head..HEAD``) when HEAD moves.
+
+Files with uncommitted changes, untracked files and trees without git fall
+back to the filesystem mtime. In a shallow clone the boundary commit lists
+every file that existed at that point, so files whose newest visible commit
+is a boundary commit are treated as unknown and also fall back to mtime.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterable
+
+from .paths import get_project_root
+
+CACHE_VERSION = 2
+_COMMIT_MARKER = "\x00"  # emitted by --format=%x00
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class GitFreshnessProvider:
+    """Answers "when did this file last change?" in O(1) per file."""
+
+    def __init__(
+        self, repo_root: Path | str | None = None, cache_file: Path | str | None = None
+    ) -> None:
+        start = Path(repo_root) if repo_root else get_project_root()
+        self.repo_root = self._git_toplevel(start)
+        self.cache_file = Path(
+            cache_file or get_project_root() / ".agentqms" / "cache" / "git_freshness.json"
+        )
+        self.head: str | None = None
+        self.shallow = False
+        # Boundary commits of a shallow clone; their file lists are not real changes
+        self._boundary: set[str] = set()
+        self._timestamps: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        if self.repo_root is not None:
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def available(self) -> bool:
+        """True when git history backs the lookups."""
+        return self.repo_root is not None and self.head is not None
+
+    def last_modified(self, path: Path | str) -> float | None:
+        """Return the last-change timestamp of *path* (epoch seconds)."""
+        path_obj = Path(path)
+        if self.available:
+            rel = self._relpath(path_obj)
+            if rel is not None and rel not in self._dirty:
+                timestamp = self._timestamps.get(rel)
+                if timestamp is not None:
+                    return timestamp
+        try:
+            return path_obj.stat().st_mtime
+        except OSError:
+            return None
+
+    def age_days(self, path: Path | str, now: float | None = None) -> float | None:
+        timestamp = self.last_modified(path)
+        if timestamp is None:
+            return None
+        return ((now or time.time()) - timestamp) / _SECONDS_PER_DAY
+
+    def is_fresh(self, path: Path | str, days: int = 30) -> bool:
+        age = self.age_days(path)
+        return age is not None and age <= days
+
+    def bulk_last_modified(self, paths: Iterable[Path | str]) -> dict[str, float | None]:
+        """Return last-change timestamps for many paths at once."""
+        return {str(path): self.last_modified(path) for path in paths}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _git(self, *args: str, cwd: Path | None = None) -> str | None:
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=cwd or self.repo_root,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    def _git_toplevel(self, start: Path) -> Path | None:
+        output = self._git("rev-parse", "--show-toplevel", cwd=start)
+        return Path(output.strip()) if output else None
+
+    def _relpath(self, path: Path) -> str | None:
+        if not path.is_absolute():
+            path = Path.cwd() / path
+        try:
+            return Path(os.path.normpath(path)).relative_to(self.repo_root).as_posix()
+        except ValueError:
+            return None
+
+    def _load(self) -> None:
+        head = self._git("rev-parse", "HEAD")
+        if not head:
+            return
+        head = head.strip()
+        self._boundary = self._shallow_boundary()
+        self.shallow = bool(self._boundary)
+        if self.shallow:
+            logger.warning(
+                "Shallow git clone at %s: files last changed beyond the clone depth "
+                "fall back to filesystem mtime; fetch full history (git fetch --unshallow) "
+                "for accurate freshness",
+                self.repo_root,
+            )
+
+        cached = self._read_cache()
+        if cached and cached.get("boundary", []) != sorted(self._boundary):
+            cached = None
+        if cached and cached.get("head") == head:
+            self._timestamps = cached["timestamps"]
+        elif cached and self._is_ancestor(cached.get("head"), head):
+            self._timestamps = cached["timestamps"]
+            self._scan_log(f"{cached['head']}..{head}")
+            self._write_cache(head)
+        else:
+            self._timestamps = {}
+            self._scan_log(head)
+            self._write_cache(head)
+        self.head = head
+        self._dirty = self._dirty_paths()
+
+    def _is_ancestor(self, old_head: str | None, head: str) -> bool:
+        if not old_head:
+            return False
+        return self._git("merge-base", "--is-ancestor", old_head, head) is not None
+
+    def _shallow_boundary(self) -> set[str]:
+        """Boundary commits of a shallow clone (empty for full clones)."""
+        if (self._git("rev-parse", "--is-shallow-repository") or "").strip() != "true":
+            return set()
+        shallow_file = (self._git("rev-parse", "--git-path", "shallow") or "").strip()
+        if not shallow_file:
+            return set()
+        try:
+            return set((self.repo_root / shallow_file).read_text().split())
+        except OSError:
+            return set()
+
+    def _scan_log(self, revision_range: str) -> None:
+        """Stream ``git log`` newest-first, keeping each path's newest commit."""
+        seen: set[str] = set()
+        try:
+            process = subprocess.Popen(
+                [
+                    "git",
+                    "-c",
+                    "core.quotePath=false",
+                    "log",
+                    "--name-only",
+                    "--no-renames",
+                    "--format=%x00%ct %H",
+                    revision_range,
+                ],
+                cwd=self.repo_root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError:
+            return
+
+        timestamp = 0.0
+        boundary = False
+        assert process.stdout is not None
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            if line.startswith(_COMMIT_MARKER):
+                stamp, _, sha = line[1:].partition(" ")
+                timestamp = float(stamp)
+                boundary = sha in self._boundary
+            elif line not in seen:
+                seen.add(line)
+                if boundary:
+                    # Unknown: the file may be years older than this commit
+                    self._timestamps.pop(line, None)
+                else:
+                    # Incremental scans overwrite: every commit in the range
+                    # is newer than anything already cached.
+                    self._timestamps[line] = timestamp
+        process.wait()
+
+    def _dirty_paths(self) -> set[str]:
+        output = self._git("status", "--porcelain", "-z", "--untracked-files=no")
+        if not output:
+            return set()
+        dirty: set[str] = set()
+        entries = iter(output.split("\0"))
+        for entry in entries:
+            if len(entry) <= 3:
+                continue
+            dirty.add(entry[3:])
+            if entry[0] in "RC":
+                # Renames and copies are followed by the original path
+                next(entries, None)
+        return dirty
+
+    def _read_cache(self) -> dict | None:
+        if not self.cache_file.exists():
+            return None
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_VERSION
+            or data.get("repo_root") != str(self.repo_root)
+        ):
+            return None
+        return data
+
+    def _write_cache(self, head: str) -> None:
+        payload = {
+            "version": CACHE_VERSION,
+            "repo_root": str(self.repo_root),
+            "head": head,
+            "boundary": sorted(self._boundary),
+            "timestamps": self._timestamps,
+        }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            tmp_file.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            # A read-only checkout still gets correct answers, just uncached
+            pass
+
+
+_DEFAULT_PROVIDER: GitFreshnessProvider | None = None
+
+
+def get_freshness_provider() -> GitFreshnessProvider:
+    """Return a singleton freshness provider for the project repository."""
+    global _DEFAULT_PROVIDER
+    if _DEFAULT_PROVIDER is None:
+        _DEFAULT_PROVIDER = GitFreshnessProvider()
+    return _DEFAULT_PROVIDER
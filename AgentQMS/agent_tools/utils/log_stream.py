@@ -0,0 +1,435 @@
+"""Streaming primitives for large plain-text logs.
+
+Streamlit logs grow to gigabytes, so nothing here reads a whole file:
+
+- ``tail_lines`` seeks backwards from the end in fixed-size blocks until it
+  has N lines
+- ``strip_ansi_chunks`` removes ANSI escape sequences from a byte stream,
+  holding back a sequence split across a chunk boundary
+- ``follow`` yields lines as they are appended, surviving truncation and
+  rotation
+- ``LogIndex`` keeps a sparse sidecar index (``<log>.idx``) of timestamp to
+  byte offset, updated incrementally as the log grows, so time-range and
+  grep queries seek straight to the relevant region
+- ``clean_in_place`` strips ANSI codes by compacting the file onto itself
+  (read ahead, write behind), so memory stays bounded by the chunk size and
+  no second copy is needed on disk
+
+Timestamps are recognised at the start of a line in the usual logging forms
+(``2024-05-01 12:00:00,123``, ``2024-05-01T12:00:00.123``); lines without
+one (tracebacks, continuation lines) belong to the preceding entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+BLOCK_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Write an index entry at most once per this many bytes of log data
+DEFAULT_INDEX_STRIDE = 64 * 1024
+INDEX_VERSION = 1
+# Bytes hashed to detect that a log was replaced or rewritten
+_HEAD_BYTES = 4096
+# An escape sequence longer than this is not held back across chunks
+_MAX_ESCAPE_LEN = 64
+
+# CSI sequences (colours, cursor movement, erase) and OSC titles/links
+ANSI_PATTERN = re.compile(rb"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)")
+_ANSI_TEXT_PATTERN = re.compile(ANSI_PATTERN.pattern.decode("latin-1"))
+_TIMESTAMP_PATTERN = re.compile(
+    rb"^\s*\[?(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})(?:[.,](\d{1,6}))?"
+)
+
+
+def strip_ansi(text: str) -> str:
+    """Remove ANSI escape sequences from a string."""
+    return _ANSI_TEXT_PATTERN.sub("", text)
+
+
+def decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace")
+
+
+def strip_ansi_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Strip ANSI sequences from a stream of byte chunks.
+
+    A trailing ``ESC`` that may begin a sequence continued in the next chunk
+    is carried over rather than emitted half-stripped.
+    """
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk
+        carry = b""
+        cut = data.rfind(b"\x1b", max(0, len(data) - _MAX_ESCAPE_LEN))
+        if cut != -1 and not ANSI_PATTERN.match(data, cut):
+            data, carry = data[:cut], data[cut:]
+        if data:
+            yield ANSI_PATTERN.sub(b"", data)
+    if carry:
+        yield ANSI_PATTERN.sub(b"", carry)
+
+
+def iter_chunks(path: Path, start: int = 0, end: int | None = None,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Raw bytes of ``path[start:end]`` in chunks."""
+    with path.open("rb") as handle:
+        handle.seek(start)
+        remaining = None if end is None else max(0, end - start)
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = handle.read(size)
+            if not chunk:
+                return
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def iter_lines(path: Path, start: int = 0, end: int | None = None,
+               strip: bool = True) -> Iterator[tuple[int, bytes]]:
+    """``(offset, line)`` pairs for ``path[start:end]``, newline removed.
+
+    *start* should be a line start; ANSI stripping happens per line, which is
+    streaming-safe because escape sequences never span lines.
+    """
+    with path.open("rb") as handle:
+        handle.seek(start)
+        offset = start
+        for line in handle:
+            if end is not None and offset >= end:
+                return
+            next_offset = offset + len(line)
+            line = line.rstrip(b"\r\n")
+            yield offset, ANSI_PATTERN.sub(b"", line) if strip else line
+            offset = next_offset
+
+
+def tail_lines(path: Path, n: int, block_size: int = BLOCK_SIZE,
+               strip: bool = True) -> list[str]:
+    """Last *n* lines of *path*, reading backwards block by block."""
+    if n <= 0:
+        return []
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        data = b""
+        # n lines need n newlines before them, plus the file's trailing one
+        while position > 0 and data.count(b"\n") <= n:
+            step = min(block_size, position)
+            position -= step
+            handle.seek(position)
+            data = handle.read(step) + data
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()
+    selected = lines[-n:]
+    if strip:
+        selected = [ANSI_PATTERN.sub(b"", line) for line in selected]
+    return [decode(line.rstrip(b"\r")) for line in selected]
+
+
+def follow(path: Path, from_end: bool = True, poll_interval: float = 0.25,
+           strip: bool = True, stop_after: float | None = None) -> Iterator[str]:
+    """Yield lines appended to *path* (like ``tail -F``).
+
+    Reopens the file when it is truncated or replaced (log rotation).
+    ``stop_after`` ends the generator after that many idle seconds.
+    """
+    handle = None
+    inode = None
+    partial = b""
+    idle_since = time.monotonic()
+    try:
+        while True:
+            if handle is None:
+                try:
+                    handle = path.open("rb")
+                except FileNotFoundError:
+                    handle = None
+                else:
+                    inode = os.fstat(handle.fileno()).st_ino
+                    if from_end:
+                        handle.seek(0, os.SEEK_END)
+                    from_end = False  # a replacement file is read from its start
+
+            line = handle.readline() if handle else b""
+            if line:
+                idle_since = time.monotonic()
+                partial += line
+                if partial.endswith(b"\n"):
+                    text = partial.rstrip(b"\r\n")
+                    partial = b""
+                    yield decode(ANSI_PATTERN.sub(b"", text) if strip else text)
+                continue
+
+            if handle is not None:
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    stat = None
+                if stat is None or stat.st_ino != inode or stat.st_size < handle.tell():
+                    handle.close()
+                    handle = None
+                    partial = b""
+                    continue
+            if stop_after is not None and time.monotonic() - idle_since >= stop_after:
+                return
+            time.sleep(poll_interval)
+    finally:
+        if handle is not None:
+            handle.close()
+
+
+def parse_line_timestamp(line: bytes) -> float | None:
+    """Epoch seconds of a timestamp at the start of *line*, if any."""
+    match = _TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    try:
+        stamp = datetime.fromisoformat(match.group(1).decode("ascii").replace("T", " "))
+    except ValueError:
+        return None
+    fraction = match.group(2)
+    seconds = stamp.timestamp()
+    if fraction:
+        seconds += int(fraction) / 10 ** len(fraction)
+    return seconds
+
+
+def parse_time(value: str | datetime | float) -> float:
+    """Epoch seconds from a CLI/API time bound (ISO string, datetime or epoch)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value.strip()).timestamp()
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _head_hash(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.sha1(handle.read(_HEAD_BYTES)).hexdigest()
+
+
+class LogIndex:
+    """Sparse timestamp -> byte offset sidecar for one log file.
+
+    The sidecar records how many bytes it covers and a hash of the log's
+    first bytes. ``update`` indexes only what was appended since; a log that
+    shrank or whose head changed (rotation, cleaning) is re-indexed.
+    """
+
+    def __init__(self, path: Path | str, stride: int = DEFAULT_INDEX_STRIDE):
+        self.path = Path(path)
+        self.stride = stride
+        self.index_path = _index_path(self.path)
+        self.entries: list[tuple[float, int]] = []
+        self.size = 0
+        self.head = ""
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("stride") != self.stride:
+            return
+        self.entries = [(float(ts), int(offset)) for ts, offset in data.get("entries", [])]
+        self.size = int(data.get("size", 0))
+        self.head = data.get("head", "")
+
+    def _save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "stride": self.stride,
+            "size": self.size,
+            "head": self.head,
+            "entries": self.entries,
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+
+    def is_current(self) -> bool:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return False
+        return size == self.size and (size == 0 or _head_hash(self.path) == self.head)
+
+    def update(self) -> int:
+        """Index bytes appended since the last update; returns bytes scanned."""
+        size = self.path.stat().st_size
+        head = _head_hash(self.path) if size else ""
+        if size < self.size or head != self.head and self.size:
+            self.entries, self.size = [], 0
+        if size == self.size and head == self.head:
+            return 0
+
+        # self.size always ends on a line boundary, so resume from there
+        start = offset = self.size
+        last_indexed = self.entries[-1][1] if self.entries else -self.stride
+        with self.path.open("rb") as handle:
+            handle.seek(start)
+            while offset < size:
+                line = handle.readline()
+                if not line.endswith(b"\n"):
+                    break  # torn last line: indexed once it is complete
+                if offset - last_indexed >= self.stride:
+                    stamp = parse_line_timestamp(line)
+                    if stamp is not None:
+                        self.entries.append((stamp, offset))
+                        last_indexed = offset
+                offset += len(line)
+        self.size = offset
+        self.head = head
+        self._save()
+        return self.size - start
+
+    def offset_for(self, start: float) -> int:
+        """A line-start offset before every line stamped *start* or later.
+
+        The last entry strictly earlier than *start*: with second-resolution
+        stamps many entries can share *start*, and lines before the first of
+        them must not be skipped.
+        """
+        stamps = [ts for ts, _ in self.entries]
+        position = bisect_left(stamps, start) - 1
+        return self.entries[position][1] if position >= 0 else 0
+
+    def end_offset_for(self, end: float) -> int | None:
+        """An offset past every entry at or before *end* (None: end of file)."""
+        stamps = [ts for ts, _ in self.entries]
+        position = bisect_right(stamps, end)
+        return self.entries[position][1] if position < len(self.entries) else None
+
+
+def query(
+    path: Path | str,
+    since: str | datetime | float | None = None,
+    until: str | datetime | float | None = None,
+    pattern: str | None = None,
+    ignore_case: bool = False,
+    use_index: bool = True,
+) -> Iterator[str]:
+    """Lines in a time range and/or matching a regex, ANSI stripped.
+
+    With an index the scan starts at the entry just before *since* and stops
+    at the first entry after *until*, instead of reading the whole log.
+    Lines without a timestamp inherit the previous line's.
+    """
+    path = Path(path)
+    start_ts = parse_time(since) if since is not None else None
+    end_ts = parse_time(until) if until is not None else None
+    start, end = 0, None
+    if use_index and (start_ts is not None or end_ts is not None):
+        index = LogIndex(path)
+        index.update()
+        if start_ts is not None:
+            start = index.offset_for(start_ts)
+        if end_ts is not None:
+            end = index.end_offset_for(end_ts)
+
+    regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE if ignore_case else 0) \
+        if pattern else None
+    current = None
+    for _, line in iter_lines(path, start, end):
+        stamp = parse_line_timestamp(line)
+        if stamp is not None:
+            current = stamp
+        if start_ts is not None and (current is None or current < start_ts):
+            continue
+        if end_ts is not None and current is not None and current > end_ts:
+            if stamp is not None:
+                break
+            continue
+        if regex is not None and not regex.search(line):
+            continue
+        yield decode(line)
+
+
+def check_index(
+    path: Path | str,
+    since: str | datetime | float | None = None,
+    until: str | datetime | float | None = None,
+    pattern: str | None = None,
+) -> dict[str, int]:
+    """Run a query with and without the index and compare the results.
+
+    Returns line counts for both and the number of lines that differ; a
+    non-zero ``mismatched`` means the index narrowed the scan incorrectly.
+    """
+    indexed = list(query(path, since=since, until=until, pattern=pattern, use_index=True))
+    scanned = list(query(path, since=since, until=until, pattern=pattern, use_index=False))
+    mismatched = sum(a != b for a, b in zip(indexed, scanned)) + abs(len(indexed) - len(scanned))
+    return {"indexed": len(indexed), "scanned": len(scanned), "mismatched": mismatched}
+
+
+def clean_copy(source: Path | str, destination: Path | str,
+               chunk_size: int = CHUNK_SIZE) -> tuple[int, int]:
+    """Stream an ANSI-stripped copy of *source* into *destination*.
+
+    Returns (bytes read, bytes written).
+    """
+    read = written = 0
+
+    def chunks() -> Iterator[bytes]:
+        nonlocal read
+        for chunk in iter_chunks(Path(source), chunk_size=chunk_size):
+            read += len(chunk)
+            yield chunk
+
+    with Path(destination).open("wb") as out:
+        for cleaned in strip_ansi_chunks(chunks()):
+            out.write(cleaned)
+            written += len(cleaned)
+    return read, written
+
+
+def clean_in_place(path: Path | str, chunk_size: int = CHUNK_SIZE) -> tuple[int, int]:
+    """Strip ANSI codes from *path* without loading it or copying it.
+
+    Stripping only shrinks data, so the cleaned bytes are written behind the
+    read position in the same file, which is then truncated. Memory use is
+    bounded by *chunk_size*. Bytes appended by a live writer while cleaning
+    runs are picked up until the final read. Returns (old size, new size).
+    """
+    path = Path(path)
+    with path.open("r+b") as handle:
+        read_pos = write_pos = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal read_pos
+            while True:
+                handle.seek(read_pos)
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    return
+                read_pos += len(chunk)
+                yield chunk
+
+        for cleaned in strip_ansi_chunks(chunks()):
+            handle.seek(write_pos)
+            handle.write(cleaned)
+            write_pos += len(cleaned)
+        handle.truncate(write_pos)
+    drop_index(path)
+    return read_pos, write_pos
+
+
+def drop_index(path: Path | str) -> None:
+    """Remove the sidecar index of a log whose contents were rewritten."""
+    _index_path(Path(path)).unlink(missing_ok=True)
@@ -0,0 +1,324 @@
+"""Concurrent JSON-RPC loop shared by the AgentQMS MCP servers.
+
+The MCP servers speak line-delimited JSON-RPC over stdio. A plain
+``for line in sys.stdin`` loop handles one request at a time, so a 30 s page
+capture or audio playback stalls every other request, ``tools/list``
+included. ``MCPRunner`` keeps reading while requests are in flight:
+
+- Blocking requests (``tools/call`` by default) run on a bounded thread
+  pool; cheap ones (``initialize``, ``tools/list``) are answered inline
+- One writer task emits whole response lines, so concurrent responses
+  never interleave; each carries its request ``id`` and, unless
+  ``preserve_order`` is set, is written as soon as it completes
+- ``notifications/cancelled`` (and ``$/cancelRequest``) cancel pending work
+  and suppress the response; JSON-RPC batch arrays are supported
+- Per-method latency histograms are served by ``server/stats`` and printed
+  to stderr on shutdown
+
+Servers keep their synchronous ``handle_request(request) -> response``:
+
+    serve_stdio(server.handle_request, max_workers=4)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TextIO
+
+Handler = Callable[[dict[str, Any]], dict[str, Any] | None]
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+INTERNAL_ERROR = -32603
+CANCEL_METHODS = ("notifications/cancelled", "$/cancelRequest")
+STATS_METHOD = "server/stats"
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+def default_is_blocking(request: dict[str, Any]) -> bool:
+    return request.get("method") == "tools/call"
+
+
+def error_response(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets; cheap to update and to serialize."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Upper bucket bound containing the given fraction of samples."""
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return float(LATENCY_BUCKETS_MS[index]) if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets_ms": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class MCPRunner:
+    """Pipelined stdio JSON-RPC loop around a synchronous request handler."""
+
+    def __init__(
+        self,
+        handle_request: Handler,
+        *,
+        is_blocking: Callable[[dict[str, Any]], bool] = default_is_blocking,
+        max_workers: int = 4,
+        max_pending: int | None = None,
+        preserve_order: bool = False,
+    ) -> None:
+        self.handle_request = handle_request
+        self.is_blocking = is_blocking
+        self.max_workers = max_workers
+        # Stop reading new requests while this many are still in flight
+        self.max_pending = max_pending or max_workers * 8
+        self.preserve_order = preserve_order
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._tasks: dict[Any, asyncio.Task] = {}
+        self._cancelled: set[Any] = set()
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    async def dispatch(self, message: Any) -> dict[str, Any] | list[dict[str, Any]] | None:
+        """Handle one parsed message (request, notification or batch)."""
+        if isinstance(message, list):
+            if not message:
+                return error_response(None, INVALID_REQUEST, "Invalid Request: empty batch")
+            results = await asyncio.gather(*(self._dispatch_one(item) for item in message))
+            responses = [r for r in results if r is not None]
+            return responses or None
+        return await self._dispatch_one(message)
+
+    async def _dispatch_one(self, request: Any) -> dict[str, Any] | None:
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return error_response(None, INVALID_REQUEST, "Invalid Request")
+        method = request["method"]
+        is_notification = "id" not in request
+        request_id = request.get("id")
+
+        if method in CANCEL_METHODS:
+            params = request.get("params") or {}
+            self.cancel(params.get("requestId", params.get("id")))
+            return None
+        if method == STATS_METHOD:
+            return {"jsonrpc": "2.0", "id": request_id, "result": self.stats()}
+
+        start = time.perf_counter()
+        try:
+            if self.is_blocking(request):
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(
+                    self._get_executor(), self.handle_request, request
+                )
+            else:
+                response = self.handle_request(request)
+        except asyncio.CancelledError:
+            # Not timed: the latency of abandoned work is meaningless
+            self._cancelled.add(request_id)
+            response = None
+        except Exception as e:
+            response = error_response(request_id, INTERNAL_ERROR, f"Internal error: {e!s}")
+        if request_id not in self._cancelled:
+            self._observe(request, (time.perf_counter() - start) * 1000)
+
+        # Cancelled requests and notifications get no response
+        if is_notification or request_id in self._cancelled:
+            self._cancelled.discard(request_id)
+            return None
+        return response
+
+    def cancel(self, request_id: Any) -> bool:
+        """Cancel a pending request; its response is suppressed.
+
+        Work already running on a thread finishes, but its result is dropped.
+        """
+        task = self._tasks.get(request_id)
+        if task is None or task.done():
+            return False
+        self._cancelled.add(request_id)
+        task.cancel()
+        return True
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    def _observe(self, request: dict[str, Any], elapsed_ms: float) -> None:
+        key = request.get("method", "?")
+        if key == "tools/call":
+            key = f"tools/call:{(request.get('params') or {}).get('name', '?')}"
+        self.histograms.setdefault(key, LatencyHistogram()).observe(elapsed_ms)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._tasks),
+            "methods": {key: h.to_dict() for key, h in sorted(self.histograms.items())},
+        }
+
+    def print_stats(self, stream: TextIO = sys.stderr) -> None:
+        for key, histogram in sorted(self.histograms.items()):
+            data = histogram.to_dict()
+            print(
+                f"[mcp] {key}: n={data['count']} mean={data['mean_ms']}ms "
+                f"p50<={data['p50_ms']}ms p95<={data['p95_ms']}ms max={data['max_ms']}ms",
+                file=stream,
+            )
+
+    # ------------------------------------------------------------------
+    # Stdio loop
+    # ------------------------------------------------------------------
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="mcp-tool"
+            )
+        return self._executor
+
+    async def run(self, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout) -> None:
+        loop = asyncio.get_running_loop()
+        lines: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        outbox: asyncio.Queue = asyncio.Queue()
+        pending = asyncio.Semaphore(self.max_pending)
+        inflight: set[asyncio.Task] = set()
+        writer = asyncio.create_task(self._write_responses(outbox, stdout))
+        _start_reader(stdin, loop, lines)
+        sequence = 0
+
+        async def process(seq: int, message: Any) -> None:
+            try:
+                response = await self.dispatch(message)
+            except Exception as e:
+                response = error_response(None, INTERNAL_ERROR, f"Internal error: {e!s}")
+            finally:
+                pending.release()
+            await outbox.put((seq, response))
+
+        try:
+            while (line := await lines.get()) is not None:
+                line = line.strip()
+                if not line:
+                    continue
+                seq, sequence = sequence, sequence + 1
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await outbox.put((seq, error_response(None, PARSE_ERROR, f"Parse error: {e!s}")))
+                    continue
+
+                await pending.acquire()
+                task = asyncio.create_task(process(seq, message))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+                request_id = message.get("id") if isinstance(message, dict) else None
+                if request_id is not None:
+                    self._tasks[request_id] = task
+                    task.add_done_callback(lambda _t, rid=request_id: self._tasks.pop(rid, None))
+
+            # EOF: let in-flight requests finish, then flush
+            if inflight:
+                await asyncio.gather(*inflight, return_exceptions=True)
+            await outbox.put(None)
+            await writer
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _write_responses(self, outbox: asyncio.Queue, stdout: TextIO) -> None:
+        """Single writer: whole lines only, optionally in request order."""
+        held: dict[int, Any] = {}
+        next_seq = 0
+        while True:
+            item = await outbox.get()
+            if item is None:
+                break
+            seq, response = item
+            if not self.preserve_order:
+                self._emit(response, stdout)
+                continue
+            held[seq] = response
+            while next_seq in held:
+                self._emit(held.pop(next_seq), stdout)
+                next_seq += 1
+        for seq in sorted(held):
+            self._emit(held[seq], stdout)
+
+    @staticmethod
+    def _emit(response: Any, stdout: TextIO) -> None:
+        if response is None:
+            return
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def _start_reader(stdin: TextIO, loop: asyncio.AbstractEventLoop, lines: asyncio.Queue) -> None:
+    """Feed stdin lines into *lines* from a daemon thread (None marks EOF).
+
+    A daemon thread (rather than the loop's executor) means a blocked read
+    never holds up interpreter shutdown.
+    """
+
+    def put(item: str | None) -> None:
+        asyncio.run_coroutine_threadsafe(lines.put(item), loop).result()
+
+    def read() -> None:
+        try:
+            for line in stdin:
+                put(line)
+        except (OSError, ValueError, RuntimeError):
+            # stdin closed or the loop already stopped
+            pass
+        try:
+            put(None)
+        except RuntimeError:
+            pass
+
+    threading.Thread(target=read, name="mcp-stdin", daemon=True).start()
+
+
+def serve_stdio(handle_request: Handler, **options: Any) -> MCPRunner:
+    """Run an MCP server's request handler on stdio until EOF."""
+    runner = MCPRunner(handle_request, **options)
+    try:
+        asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.print_stats()
+    return runner
@@ -9,7 +9,7 @@ from __future__ import annotations
 from functools import lru_cache
 from pathlib import Path
 
-from .config import get_config_loader, load_config
+from .config import get_config_loader
 
 
 def get_framework_root() -> Path:
@@ -24,12 +24,7 @@ def get_project_root() -> Path:
 
 def get_container_path(component_key: str) -> Path:
     """Return the path to a framework component defined in config."""
-    config = load_config()
-    relative = config.get("paths", {}).get(component_key)
-    if not relative:
-        raise KeyError(f"Unknown framework path key: {component_key}")
-
-    return (get_framework_root() / relative).resolve()
+    return get_config_loader().get_container_path(component_key)
 
 
 def get_artifacts_dir() -> Path:
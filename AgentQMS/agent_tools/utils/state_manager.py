@@ -3,11 +3,34 @@
 The v002_b release only needs a simple JSON-backed store, but the interface is
 designed so we can swap in SQLite or an external database later without
 changing downstream callers.
+
+Several agents may share one state directory, so storage is pluggable:
+
+- ``SqliteStateBackend`` (default) keeps one row per key in a WAL-mode
+  database; every write is a single-row upsert, so its cost does not grow
+  with the total state and concurrent writers never lose each other's keys
+- ``JsonStateBackend`` keeps the original ``agent_state.json`` file, buffering
+  writes until ``save()``, which merges the changed keys into the file under
+  a lock and replaces it atomically (temp file + rename)
+
+Every key lives in a namespace, carries a version that increases on each
+write (for optimistic ``compare_and_set``) and may have a TTL after which it
+reads as missing. Deleting or purging a key leaves a tombstone that keeps its
+version, so a recreated key continues numbering instead of restarting at 1.
+Select the backend with ``AGENTQMS_STATE_BACKEND`` (``sqlite`` or ``json``).
 """
 
 from __future__ import annotations
 
+import fcntl
 import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Dict
 
@@ -17,43 +40,523 @@ ensure_project_root_on_sys_path()
 
 STATE_DIR = Path(".agentqms/state")
 STATE_FILE = STATE_DIR / "agent_state.json"
+STATE_DB = STATE_DIR / "agent_state.db"
+DEFAULT_NAMESPACE = "default"
+JSON_FORMAT_VERSION = 2
 
 
-class StateManager:
-    """JSON-backed state manager with a future-proof interface."""
+def _expires_at(ttl: float | None) -> float | None:
+    return time.time() + ttl if ttl is not None else None
+
+
+def _is_live(expires_at: float | None, now: float | None = None) -> bool:
+    return expires_at is None or expires_at > (now if now is not None else time.time())
+
+
+class StateBackend(ABC):
+    """Storage interface used by ``StateManager``.
+
+    Versions start at 1 for a new key and increase by one per write; a
+    missing, deleted or expired key has version 0. Deletes are writes too:
+    the stored version keeps increasing so a key that is deleted and
+    recreated never reuses a version a reader may still hold.
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> tuple[Any, int] | None:
+        """Return ``(value, version)`` for a live key, else ``None``."""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl: float | None = None) -> int:
+        """Store *value* and return its new version."""
+
+    @abstractmethod
+    def compare_and_set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        expected_version: int,
+        ttl: float | None = None,
+    ) -> int | None:
+        """Store *value* only if the key is at *expected_version*.
+
+        Returns the new version, or ``None`` when another writer got there
+        first.
+        """
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> bool:
+        """Delete *key*, leaving a tombstone; returns whether it had a value."""
+
+    @abstractmethod
+    def keys(self, namespace: str) -> list[str]:
+        """Live keys in *namespace*."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Drop the values of expired keys, keeping their versions; returns how many."""
+
+    def flush(self) -> None:
+        """Persist buffered writes (no-op for backends that write through)."""
+
+    def close(self) -> None:
+        self.flush()
 
-    def __init__(self) -> None:
-        STATE_DIR.mkdir(parents=True, exist_ok=True)
-        self._state: Dict[str, Any] = {}
-        self._load()
+
+class SqliteStateBackend(StateBackend):
+    """One row per (namespace, key) in a WAL-mode SQLite database."""
+
+    def __init__(self, path: Path | str = STATE_DB, legacy_json: Path | str | None = STATE_FILE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; multi-statement operations open their own transaction
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT,
+                version INTEGER NOT NULL,
+                expires_at REAL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS state_expiry ON state(expires_at) WHERE expires_at IS NOT NULL"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._migrate_nullable_value()
+        if legacy_json is not None:
+            self._import_json(Path(legacy_json))
 
     # ------------------------------------------------------------------
-    # Public API
+    # StateBackend API
     # ------------------------------------------------------------------
-    def get(self, key: str, default: Any = None) -> Any:
-        return self._state.get(key, default)
+    def get(self, namespace: str, key: str) -> tuple[Any, int] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, version, expires_at FROM state WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        # A NULL value is a tombstone left by delete()
+        if row is None or row[0] is None or not _is_live(row[2]):
+            return None
+        return json.loads(row[0]), row[1]
 
-    def set(self, key: str, value: Any) -> None:
-        self._state[key] = value
+    def set(self, namespace: str, key: str, value: Any, ttl: float | None = None) -> int:
+        with self._transaction() as conn:
+            return self._upsert(conn, namespace, key, value, ttl)
 
-    def delete(self, key: str) -> None:
-        self._state.pop(key, None)
+    def compare_and_set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        expected_version: int,
+        ttl: float | None = None,
+    ) -> int | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT version, expires_at, value IS NULL FROM state WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            current = row[0] if row is not None and not row[2] and _is_live(row[1]) else 0
+            if current != expected_version:
+                return None
+            return self._upsert(conn, namespace, key, value, ttl)
 
-    def save(self) -> None:
-        STATE_FILE.write_text(json.dumps(self._state, indent=2), encoding="utf-8")
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE state SET value = NULL, version = version + 1, expires_at = NULL,
+                    updated_at = ?
+                WHERE namespace = ? AND key = ? AND value IS NOT NULL
+                """,
+                (time.time(), namespace, key),
+            )
+        return cursor.rowcount > 0
+
+    def keys(self, namespace: str) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM state WHERE namespace = ? AND value IS NOT NULL "
+                "AND (expires_at IS NULL OR expires_at > ?) ORDER BY key",
+                (namespace, time.time()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        # Expired keys already read as version 0; only their values are dropped
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE state SET value = NULL, expires_at = NULL, updated_at = ?
+                WHERE expires_at IS NOT NULL AND expires_at <= ?
+                """,
+                (now, now),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so read-then-write
+        # sequences cannot interleave with another process
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _upsert(
+        conn: sqlite3.Connection, namespace: str, key: str, value: Any, ttl: float | None
+    ) -> int:
+        # Versions keep increasing across expiry so a stale CAS cannot succeed
+        conn.execute(
+            """
+            INSERT INTO state (namespace, key, value, version, expires_at, updated_at)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT (namespace, key) DO UPDATE SET
+                value = excluded.value,
+                version = state.version + 1,
+                expires_at = excluded.expires_at,
+                updated_at = excluded.updated_at
+            """,
+            (namespace, key, json.dumps(value), _expires_at(ttl), time.time()),
+        )
+        return conn.execute(
+            "SELECT version FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()[0]
+
+    def _migrate_nullable_value(self) -> None:
+        """Rebuild a pre-tombstone table whose ``value`` column is NOT NULL."""
+        columns = {row[1]: row for row in self._conn.execute("PRAGMA table_info(state)")}
+        if not columns["value"][3]:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE state_new (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    version INTEGER NOT NULL,
+                    expires_at REAL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("INSERT INTO state_new SELECT * FROM state")
+            conn.execute("DROP TABLE state")
+            conn.execute("ALTER TABLE state_new RENAME TO state")
+            conn.execute(
+                "CREATE INDEX state_expiry ON state(expires_at) WHERE expires_at IS NOT NULL"
+            )
+
+    def _import_json(self, legacy: Path) -> None:
+        """One-time import of an existing ``agent_state.json``."""
+        if not legacy.exists():
+            return
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'imported_json'").fetchone():
+                return
+            for (namespace, key), entry in _read_json_state(legacy).items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO state VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        namespace,
+                        key,
+                        None if entry["deleted"] else json.dumps(entry["value"]),
+                        entry["version"],
+                        entry["expires_at"],
+                        time.time(),
+                    ),
+                )
+            conn.execute("INSERT INTO meta VALUES ('imported_json', ?)", (str(legacy),))
+
+
+class JsonStateBackend(StateBackend):
+    """State in a single JSON file, rewritten atomically on ``flush()``.
+
+    Writes are buffered per key; ``flush()`` re-reads the file under an
+    exclusive lock and applies only the keys this process changed, so
+    concurrent savers no longer overwrite each other's keys.
+    """
+
+    def __init__(self, path: Path | str = STATE_FILE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._entries: Dict[tuple[str, str], dict[str, Any]] = _read_json_state(self.path)
+        # Pending changes (deletes are tombstone entries)
+        self._dirty: Dict[tuple[str, str], dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # StateBackend API
+    # ------------------------------------------------------------------
+    def get(self, namespace: str, key: str) -> tuple[Any, int] | None:
+        entry = self._entries.get((namespace, key))
+        if entry is None or not _is_present(entry):
+            return None
+        return entry["value"], entry["version"]
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float | None = None) -> int:
+        with self._lock:
+            previous = self._entries.get((namespace, key))
+            entry = {
+                "value": value,
+                "version": (previous["version"] if previous else 0) + 1,
+                "expires_at": _expires_at(ttl),
+                "deleted": False,
+            }
+            self._entries[(namespace, key)] = self._dirty[(namespace, key)] = entry
+            return entry["version"]
+
+    def compare_and_set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        expected_version: int,
+        ttl: float | None = None,
+    ) -> int | None:
+        # Checked against the file, not the local copy, so it has to write through
+        with self._lock, self._locked_file():
+            pending = bool(self._dirty)
+            entries = self._merge_pending()
+            current = entries.get((namespace, key))
+            version = current["version"] if current and _is_present(current) else 0
+            if version != expected_version:
+                if pending:
+                    self._write(entries)
+                self._entries = entries
+                return None
+            entry = {
+                "value": value,
+                "version": (current["version"] if current else 0) + 1,
+                "expires_at": _expires_at(ttl),
+                "deleted": False,
+            }
+            entries[(namespace, key)] = entry
+            self._write(entries)
+            self._entries = entries
+            return entry["version"]
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            previous = self._entries.get((namespace, key))
+            if previous is not None and previous["deleted"]:
+                return False
+            # Written even for a key unknown here: another process may have stored it
+            tombstone = _tombstone((previous["version"] if previous else 0) + 1)
+            self._entries[(namespace, key)] = self._dirty[(namespace, key)] = tombstone
+            return previous is not None
+
+    def keys(self, namespace: str) -> list[str]:
+        now = time.time()
+        return sorted(
+            key
+            for (ns, key), entry in self._entries.items()
+            if ns == namespace and _is_present(entry, now)
+        )
+
+    def purge_expired(self) -> int:
+        # Checked against the file so a key another process refreshed survives
+        with self._lock, self._locked_file():
+            entries = self._merge_pending()
+            now = time.time()
+            expired = [
+                namespace_key
+                for namespace_key, entry in entries.items()
+                if not entry["deleted"] and not _is_live(entry["expires_at"], now)
+            ]
+            for namespace_key in expired:
+                entries[namespace_key] = _tombstone(entries[namespace_key]["version"])
+            if expired:
+                self._write(entries)
+            self._entries = entries
+            return len(expired)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            with self._locked_file():
+                entries = self._merge_pending()
+                self._write(entries)
+                self._entries = entries
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _load(self) -> None:
-        if STATE_FILE.exists():
+    @contextmanager
+    def _locked_file(self) -> Iterator[None]:
+        lock_file = self.path.with_suffix(".lock")
+        with open(lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
             try:
-                data = json.loads(STATE_FILE.read_text(encoding="utf-8"))
-                if isinstance(data, dict):
-                    self._state = data
-            except json.JSONDecodeError:
-                # Leave state empty; future versions could log telemetry
-                self._state = {}
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _merge_pending(self) -> Dict[tuple[str, str], dict[str, Any]]:
+        """Current file contents with this process's pending changes applied."""
+        entries = _read_json_state(self.path)
+        for namespace_key, entry in self._dirty.items():
+            on_disk = entries.get(namespace_key)
+            # Number after whatever another writer stored meanwhile
+            entry["version"] = max(entry["version"], (on_disk["version"] if on_disk else 0) + 1)
+            entries[namespace_key] = entry
+        self._dirty = {}
+        return entries
+
+    def _write(self, entries: Dict[tuple[str, str], dict[str, Any]]) -> None:
+        namespaces: Dict[str, Dict[str, Any]] = {}
+        for (namespace, key), entry in sorted(entries.items()):
+            if not entry["deleted"]:
+                entry = {name: value for name, value in entry.items() if name != "deleted"}
+            namespaces.setdefault(namespace, {})[key] = entry
+        payload = {"format": JSON_FORMAT_VERSION, "namespaces": namespaces}
+        tmp_file = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with tmp_file.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_file, self.path)
+
+
+def _tombstone(version: int) -> dict[str, Any]:
+    return {"value": None, "version": version, "expires_at": None, "deleted": True}
+
+
+def _is_present(entry: dict[str, Any], now: float | None = None) -> bool:
+    return not entry["deleted"] and _is_live(entry["expires_at"], now)
+
+
+def _read_json_state(path: Path) -> Dict[tuple[str, str], dict[str, Any]]:
+    """Parse ``agent_state.json``; the original flat format maps to the default namespace."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        # Leave state empty; future versions could log telemetry
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if data.get("format") != JSON_FORMAT_VERSION:
+        return {
+            (DEFAULT_NAMESPACE, key): {
+                "value": value,
+                "version": 1,
+                "expires_at": None,
+                "deleted": False,
+            }
+            for key, value in data.items()
+        }
+    entries = {}
+    for namespace, keys in (data.get("namespaces") or {}).items():
+        for key, entry in keys.items():
+            entries[(namespace, key)] = {
+                "value": entry.get("value"),
+                "version": int(entry.get("version", 1)),
+                "expires_at": entry.get("expires_at"),
+                "deleted": bool(entry.get("deleted", False)),
+            }
+    return entries
+
+
+def create_backend(name: str | None = None) -> StateBackend:
+    """Build the backend named by *name* or ``AGENTQMS_STATE_BACKEND``."""
+    name = (name or os.getenv("AGENTQMS_STATE_BACKEND") or "sqlite").lower()
+    if name == "sqlite":
+        return SqliteStateBackend()
+    if name == "json":
+        return JsonStateBackend()
+    raise ValueError(f"Unknown state backend: {name}")
+
+
+class StateManager:
+    """Namespaced, versioned key-value state over a pluggable backend."""
+
+    def __init__(
+        self, backend: StateBackend | str | None = None, namespace: str = DEFAULT_NAMESPACE
+    ) -> None:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        self.backend = backend if isinstance(backend, StateBackend) else create_backend(backend)
+        self.namespace = namespace
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, key: str, default: Any = None, namespace: str | None = None) -> Any:
+        found = self.backend.get(namespace or self.namespace, key)
+        return found[0] if found is not None else default
+
+    def get_versioned(self, key: str, namespace: str | None = None) -> tuple[Any, int]:
+        """Return ``(value, version)``; a missing key is ``(None, 0)``."""
+        found = self.backend.get(namespace or self.namespace, key)
+        return found if found is not None else (None, 0)
+
+    def set(self, key: str, value: Any, ttl: float | None = None, namespace: str | None = None) -> int:
+        """Store *value* (expiring after *ttl* seconds) and return its version."""
+        return self.backend.set(namespace or self.namespace, key, value, ttl)
+
+    def compare_and_set(
+        self,
+        key: str,
+        value: Any,
+        expected_version: int,
+        ttl: float | None = None,
+        namespace: str | None = None,
+    ) -> bool:
+        """Store *value* only if nobody wrote the key since *expected_version*.
+
+        Use the version from ``get_versioned`` (0 to create a new key) and
+        retry on ``False``.
+        """
+        return (
+            self.backend.compare_and_set(namespace or self.namespace, key, value, expected_version, ttl)
+            is not None
+        )
+
+    def delete(self, key: str, namespace: str | None = None) -> bool:
+        return self.backend.delete(namespace or self.namespace, key)
+
+    def keys(self, namespace: str | None = None) -> list[str]:
+        return self.backend.keys(namespace or self.namespace)
+
+    def purge_expired(self) -> int:
+        return self.backend.purge_expired()
+
+    def save(self) -> None:
+        self.backend.flush()
+
+    def close(self) -> None:
+        self.backend.close()
 
 
 _DEFAULT_MANAGER: StateManager | None = None